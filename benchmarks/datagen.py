@@ -0,0 +1,91 @@
+'''
+@File    :   datagen.py
+@Time    :   2025/05/15 20:31:50
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Synthetic tables for benchmarks
+'''
+
+
+import datetime
+import random
+
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+# name -> (SQL type, value generator)
+TYPES: Dict[str, Tuple[str, Callable[[random.Random], Any]]] = {
+    "int": ("BIGINT", lambda rnd: rnd.randint(-2 ** 40, 2 ** 40)),
+    "float": ("DOUBLE", lambda rnd: rnd.uniform(-1e6, 1e6)),
+    "decimal": ("DECIMAL(18,4)", lambda rnd: Decimal(rnd.randint(-10 ** 12, 10 ** 12)) / 10000),
+    "str": ("VARCHAR(64)", lambda rnd: "".join(rnd.choices("abcdefghijklmnopqrstuvwxyz", k=rnd.randint(4, 32)))),
+    "datetime": ("DATETIME", lambda rnd: datetime.datetime(2020, 1, 1) + datetime.timedelta(seconds=rnd.randint(0, 10 ** 8)))
+}
+
+DEFAULT_MIX = ("int", "float", "decimal", "str", "datetime")
+
+
+class SyntheticTable():
+    def __init__(self,
+                 name: str,
+                 rows: int,
+                 width: int = 8,
+                 mix: Sequence[str] = DEFAULT_MIX,
+                 seed: int = 0
+                 ):
+
+        unknown = set(mix) - TYPES.keys()
+        if (unknown):
+            raise ValueError(f"Unknown column types: {unknown}")
+
+        self.name = name
+        self.rows = rows
+        self.seed = seed
+
+        # The type mix is cycled over the columns, `id` is always the primary key
+        self.columns: List[Tuple[str, str]] = [(f"c{i}_{mix[i % len(mix)]}", mix[i % len(mix)]) for i in range(width)]
+
+    @property
+    def column_names(self) -> List[str]:
+        return ["id"] + [name for name, _ in self.columns]
+
+    def ddl(self) -> str:
+        columns = ", ".join(f"`{name}` {TYPES[kind][0]}" for name, kind in self.columns)
+        return f"CREATE TABLE `{self.name}` (`id` BIGINT PRIMARY KEY, {columns})"
+
+    def generate(self, batch_size: int = 10000):
+        rnd = random.Random(self.seed)
+        generators = [TYPES[kind][1] for _, kind in self.columns]
+
+        batch = []
+        for i in range(self.rows):
+            batch.append((i, ) + tuple(gen(rnd) for gen in generators))
+
+            if (len(batch) == batch_size):
+                yield batch
+                batch = []
+
+        if (batch):
+            yield batch
+
+    def rows_in_memory(self) -> List[Tuple]:
+        return [row for batch in self.generate() for row in batch]
+
+    def load(self, cursor, paramstyle: str = "format") -> None:
+        """Create and fill the table through a raw DB-API cursor, bypassing datapy on purpose."""
+
+        cursor.execute(f"DROP TABLE IF EXISTS `{self.name}`")
+        cursor.execute(self.ddl())
+
+        holder = "?" if paramstyle == "qmark" else "%s"
+        holders = ", ".join([holder] * (len(self.columns) + 1))
+        columns = ", ".join(f"`{name}`" for name in self.column_names)
+        sql = f"INSERT INTO `{self.name}` ({columns}) VALUES ({holders})"
+
+        for batch in self.generate():
+            if (paramstyle == "qmark"):
+                # sqlite3 has no Decimal adapter
+                batch = [tuple(float(value) if isinstance(value, Decimal) else value for value in row) for row in batch]
+
+            cursor.executemany(sql, batch)
@@ -0,0 +1,232 @@
+'''
+@File    :   runner.py
+@Time    :   2025/05/15 21:02:17
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Benchmark cases and JSON reports
+'''
+
+
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import Any, Callable, Dict, List, Optional
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(func: Callable[[], Any], items: int, repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Time `func` `repeat` times, `items` is the unit of work of one call (rows, queries...)."""
+
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    median = statistics.median(latencies)
+
+    return {
+        "repeat": repeat,
+        "items": items,
+        "throughput": items / median if median > 0 else float("inf"),
+        "latency": {
+            "min": min(latencies),
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies)
+        },
+        # Process wide high-water mark, read right after the case
+        "peak_rss_kb": peak_rss_kb()
+    }
+
+
+def bench_offline(rows: List[tuple], columns: List[str], repeat: int) -> Dict[str, Dict[str, Any]]:
+    from datapy.connections.connecter import rows2df
+    from datapy.query_builder import DataField, DataSelecter
+
+    results = {}
+
+    def build():
+        for i in range(1000):
+            condition = (DataField("a") >= i) & (DataField("b").is_in([1, 2, 3]) | ~(DataField("c") == "x")) \
+                & DataField("d").between("2024-01-01", "2024-12-31")
+            DataSelecter().select("*").from_table("t").where(condition).order_by("a").limit(100).build()
+
+    results["select_builder.build"] = measure(build, 1000, repeat)
+    results["sql2df"] = measure(lambda: rows2df(rows, columns), len(rows), repeat)
+    results["import"] = bench_import(repeat)
+
+    return results
+
+
+IMPORT_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import datapy
+cond = (datapy.DataField("a") > 1) & datapy.DataField("b").is_in([1, 2])
+cond.compile()
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "heavy": sorted(m for m in ("pandas", "numpy", "pymysql") if m in sys.modules)
+}))
+"""
+
+
+def bench_import(repeat: int) -> Dict[str, Any]:
+    """`import datapy` plus building a condition, each run in a fresh interpreter."""
+
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+
+    latencies = []
+    heavy: List[str] = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        probe = json.loads(output)
+        latencies.append(probe["seconds"])
+        heavy = probe["heavy"]
+
+    median = statistics.median(latencies)
+
+    return {
+        "repeat": repeat,
+        "items": 1,
+        "throughput": 1 / median if median > 0 else float("inf"),
+        "latency": {
+            "min": min(latencies),
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies)
+        },
+        # Heavy modules that got imported, should stay empty
+        "heavy_modules": heavy
+    }
+
+
+def bench_backend(url: str, table, repeat: int, insert_rows: int) -> Dict[str, Dict[str, Any]]:
+    import datapy
+
+    from datapy.getter import DataGetter
+
+    group = "datapy_bench"
+    results = {}
+
+    datapy.connect(url=url)
+
+    try:
+        db = DataGetter.conn.db
+        db.create_database(group)
+        db.switch_database(group)
+
+        # Load through the raw DB-API cursor, datapy is what gets measured, not the loader
+        if (url.startswith("sqlite")):
+            table.load(db.db.cursor(), paramstyle="qmark")
+        else:
+            table.load(db.cursor)
+
+        results["get"] = measure(lambda: datapy.get(group, [table.name]), table.rows, repeat)
+        results["show"] = measure(lambda: datapy.show(group), 1, repeat)
+
+        sample = next(table.generate(batch_size=insert_rows))
+        names = table.column_names
+
+        def insert():
+            db.switch_database(group)
+            db.execute("DROP TABLE IF EXISTS `bench_insert`")
+            db.execute(table.ddl().replace(f"`{table.name}`", "`bench_insert`", 1))
+            for row in sample:
+                db.insert("bench_insert", dict(zip(names, row)))
+
+        results["mysql.insert"] = measure(insert, len(sample), repeat)
+
+        if (url.startswith("mysql")):
+            results.update(bench_drivers(db.conn_params, group, table, repeat))
+
+        db.drop_database(group)
+
+    finally:
+        datapy.disconnect()
+
+    return results
+
+
+def bench_drivers(params: Dict[str, Any], group: str, table, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Full table fetch rows/sec for every installed MySQL driver."""
+
+    from datapy.connections.mysql import MySQL, available_drivers
+
+    results = {}
+
+    for driver in available_drivers():
+        db = MySQL(host=params["host"], port=params["port"], user=params["user"], password=params["password"],
+                   driver=driver)
+        db.switch_database(group)
+
+        results[f"driver.{driver}"] = measure(lambda: db.execute(f"SELECT * FROM `{table.name}`"), table.rows, repeat)
+
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    import datapy
+
+    return {
+        "datapy": datapy.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """Throughput ratio `head / base` per case, flagged when it dropped more than `threshold`."""
+
+    rows = []
+    for case, result in head["cases"].items():
+        if (case not in base["cases"]):
+            continue
+
+        ratio = result["throughput"] / base["cases"][case]["throughput"]
+        rows.append({
+            "case": case,
+            "base": base["cases"][case]["throughput"],
+            "head": result["throughput"],
+            "ratio": ratio,
+            "regressed": ratio < 1 - threshold
+        })
+
+    return rows
+
+
+def dump(report: Dict[str, Any], output: Optional[str]) -> None:
+    text = json.dumps(report, indent=2, default=str)
+
+    if (output is None):
+        print(text)
+        return
+
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(text)
@@ -0,0 +1,103 @@
+'''
+@File    :   server.py
+@Time    :   2025/05/15 20:07:33
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Throwaway local MySQL/MariaDB server for benchmarks
+'''
+
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+
+from typing import Dict, List, Optional
+
+
+class LocalServer():
+    """Initialize an empty datadir in a temp directory and run `mysqld`/`mariadbd` on it.
+
+    The root account has no password, the server is gone (with its data) after `stop`.
+    """
+    def __init__(self, binary: Optional[str] = None, port: Optional[int] = None):
+        self.binary = binary or shutil.which("mariadbd") or shutil.which("mysqld")
+        if (self.binary is None):
+            raise FileNotFoundError("Neither `mariadbd` nor `mysqld` found in PATH, pass `--mysqld` or `--dsn`.")
+
+        self.port = port or self.__free_port()
+        self.base_dir = tempfile.mkdtemp(prefix="datapy-bench-")
+        self.data_dir = os.path.join(self.base_dir, "data")
+        self.socket = os.path.join(self.base_dir, "mysql.sock")
+        self.process: Optional[subprocess.Popen] = None
+
+    @staticmethod
+    def __free_port() -> int:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+    def __initialize(self) -> None:
+        install_db = shutil.which("mariadb-install-db") or shutil.which("mysql_install_db")
+
+        if ("mariadb" in os.path.basename(self.binary) and install_db):
+            cmd = [install_db, f"--datadir={self.data_dir}", "--auth-root-authentication-method=normal"]
+        else:
+            cmd = [self.binary, "--initialize-insecure", f"--datadir={self.data_dir}"]
+
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def start(self, timeout: float = 60) -> Dict[str, object]:
+        self.__initialize()
+
+        cmd: List[str] = [
+            self.binary,
+            "--no-defaults",
+            f"--datadir={self.data_dir}",
+            f"--socket={self.socket}",
+            f"--port={self.port}",
+            "--bind-address=127.0.0.1",
+            "--skip-log-bin"
+        ]
+        if (os.geteuid() == 0):
+            cmd.append("--user=root")
+
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if (self.process.poll() is not None):
+                raise RuntimeError(f"Benchmark server exited with code {self.process.returncode}")
+
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    return self.params()
+
+            except OSError:
+                time.sleep(0.2)
+
+        self.stop()
+        raise TimeoutError("Benchmark server did not come up in time")
+
+    def params(self) -> Dict[str, object]:
+        return {"host": "127.0.0.1", "port": self.port, "user": "root", "password": ""}
+
+    def stop(self) -> None:
+        if (self.process is not None and self.process.poll() is None):
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def __enter__(self) -> 'LocalServer':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -10,5 +10,10 @@ setuptools.setup(
         'pandas',
         'pymysql',
         'cryptography'
-    ]
+    ],
+    entry_points={
+        'console_scripts': [
+            'datapy = datapy.__main__:main'
+        ]
+    }
 )
@@ -1,11 +1,60 @@
-from .getter import connect, disconnect, show, get
+from importlib import import_module
+
 from .query_builder import DataField, DataCondition
 
 
+# Everything reaching pandas/pymysql is imported on first access (PEP 562),
+# so `import datapy` and building conditions stay cheap.
+_LAZY_ATTRS = {
+    "connect": ".getter",
+    "disconnect": ".getter",
+    "show": ".getter",
+    "catalog": ".getter",
+    "get": ".getter",
+    "estimate": ".getter",
+    "export": ".getter",
+    "paginate": ".getter",
+    "inserter": ".getter",
+    "sync": ".getter",
+    "create_table_from_dataframe": ".getter",
+    "partition": ".getter",
+    "rollup": ".getter",
+    "refresh_rollup": ".getter",
+    "query_rollup": ".getter",
+    "schedule": ".getter",
+    "slow_queries": ".getter",
+    "stats": ".getter",
+    "memory": ".getter",
+    "Deadline": ".connections.deadline",
+    "QueryTimeout": ".connections.deadline",
+    "MemoryBudget": ".connections.budget"
+}
+
+
 __all__ = [
-    connect, disconnect, show, get,
-    DataCondition,
-    DataField
+    "connect", "disconnect", "show", "get", "estimate", "export", "paginate", "inserter", "sync", "slow_queries", "stats",
+    "create_table_from_dataframe", "partition", "rollup", "refresh_rollup", "query_rollup", "schedule", "memory",
+    "catalog",
+    "DataCondition",
+    "DataField",
+    "Deadline",
+    "QueryTimeout",
+    "MemoryBudget"
 ]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    if (name not in _LAZY_ATTRS):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+
+    # Cache it, later lookups never reach `__getattr__` again
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,124 @@
+'''
+@File    :   __main__.py
+@Time    :   2025/06/12 22:30:18
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Command line entry point
+'''
+
+
+import argparse
+import json
+import logging
+import re
+import signal
+import sys
+
+from typing import List, Optional
+
+
+RE_SIZE = re.compile(r"^(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?$", re.IGNORECASE)
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(text: str) -> int:
+    """`1073741824`, `512M`, `1.5GiB`... as bytes"""
+
+    match = RE_SIZE.match(text.strip())
+    if (match is None):
+        raise argparse.ArgumentTypeError(f"Invalid size: {text}")
+
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def warm(args: argparse.Namespace) -> int:
+    from . import getter
+    from .scheduler import Scheduler, load_spec
+
+    connect, jobs, options = load_spec(args.spec)
+
+    # Warming is pointless without a cache to keep the results
+    connect.setdefault("result_cache", True)
+    getter.connect(**connect)
+
+    scheduler = Scheduler(
+        getter.DataGetter.conn,
+        jobs,
+        concurrency=args.concurrency or options.get("concurrency", 2),
+        jitter=args.jitter if args.jitter is not None else options.get("jitter", 0.0)
+    )
+
+    if (not args.daemon):
+        results = scheduler.run_once()
+        scheduler.stop()
+        print(json.dumps(results, indent=2, default=str))
+
+        return 1 if any("error" in result for result in results) else 0
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop(wait=False))
+
+    try:
+        scheduler.start().join()
+
+    except KeyboardInterrupt:
+        scheduler.stop(wait=False)
+
+    return 0
+
+
+def cache_stats(args: argparse.Namespace) -> int:
+    from .cache import Cacher
+
+    print(json.dumps(Cacher(args.cache_dir).stats(), indent=2, default=str))
+
+    return 0
+
+
+def cache_gc(args: argparse.Namespace) -> int:
+    from .cache import Cacher
+
+    print(json.dumps(Cacher(args.cache_dir).gc(args.max_bytes, args.policy), indent=2))
+
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="datapy", description="DataPy command line")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every warmed job")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    warm_parser = commands.add_parser("warm", help="Prefetch the jobs of a JSON spec into the local cache")
+    warm_parser.add_argument("spec", help="Path to the warm spec, see `datapy.scheduler.load_spec`")
+    warm_parser.add_argument("--daemon", action="store_true", help="Keep running the jobs on their schedule")
+    warm_parser.add_argument("--concurrency", type=int, default=None, help="Jobs fetching at the same time")
+    warm_parser.add_argument("--jitter", type=float, default=None, help="Max random delay of each run in seconds")
+    warm_parser.set_defaults(func=warm)
+
+    cache_parser = commands.add_parser("cache", help="Inspect or trim the local cache")
+    cache_parser.add_argument("--cache-dir", default=None, help="Cache directory (default: ~/.cache/datapy)")
+    cache_commands = cache_parser.add_subparsers(dest="cache_command", required=True)
+
+    stats_parser = cache_commands.add_parser("stats", help="Entries and bytes of the cache")
+    stats_parser.set_defaults(func=cache_stats)
+
+    gc_parser = cache_commands.add_parser("gc", help="Evict entries down to a disk quota")
+    gc_parser.add_argument("--max-bytes", type=parse_size, required=True, help="Quota, e.g. `512M` or `2G`")
+    gc_parser.add_argument(
+        "--policy", choices=("lru", "size"), default="lru", help="Evict least recently used or largest first"
+    )
+    gc_parser.set_defaults(func=cache_gc)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+from .cacher import Cacher, SpilledFrame
+from .catalog import Catalog
+from .partition import TimePartition
+from .rollup import Rollup
+
+
+__all__ = [
+    "Cacher",
+    "Catalog",
+    "SpilledFrame",
+    "TimePartition",
+    "Rollup"
+]
@@ -5,3 +5,345 @@
 @Version :   1.0
 @Desc    :   Store datasets into local cache
 '''
+
+
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import uuid
+import weakref
+import zlib
+
+import pandas as pd
+
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+from .manifest import Manifest
+
+
+try:
+    import zstandard
+
+except ImportError:     # pragma: no cover
+    zstandard = None
+
+try:
+    import lz4.frame
+
+except ImportError:     # pragma: no cover
+    lz4 = None
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "DATAPY_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "datapy")
+)
+
+GC_POLICIES = ("lru", "size")
+
+# Known even when the codec is not installed, its entries can still be evicted
+EXTENSIONS = {
+    "none": ".pkl",
+    "zlib": ".pkl.z",
+    "lz4": ".pkl.lz4",
+    "zstd": ".pkl.zst"
+}
+
+# Codec recorded for spill directories, they count against `max_bytes` like any entry
+SPILL = "spill"
+
+
+def _codecs() -> Dict[str, Tuple[int, Callable[[bytes, int], bytes], Callable[[bytes], bytes]]]:
+    # codec -> (default level, compress, decompress), only the installed ones
+    codecs = {
+        "none": (0, lambda data, level: data, lambda data: data),
+        "zlib": (1, lambda data, level: zlib.compress(data, level), zlib.decompress)
+    }
+
+    if (lz4 is not None):
+        codecs["lz4"] = (
+            0, lambda data, level: lz4.frame.compress(data, compression_level=level), lz4.frame.decompress
+        )
+
+    if (zstandard is not None):
+        codecs["zstd"] = (
+            3,
+            lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data)
+        )
+
+    return codecs
+
+
+CODECS = _codecs()
+
+
+def best_codec() -> str:
+    # Fastest decompression first, zlib is always there
+    return next(codec for codec in ("zstd", "lz4", "zlib") if codec in CODECS)
+
+
+class Cacher():
+    """Pickled entries under `cache_dir`, compressed by `codec` and indexed by the SQLite manifest
+    `<cache_dir>/manifest.db` (key, size, created/last-access time, source version, codec).
+
+    `codec="auto"` takes zstd, then lz4 (when `zstandard`/`lz4` are installed), then zlib.
+    Spill directories are indexed too, with the bytes of their chunks. With `max_bytes` a `put` or spilled
+    chunk taking the running total over it evicts by `gc` until the entries fit again, spills still in use
+    by this process are never evicted. The total is kept in memory and synced with the manifest on `gc`,
+    entries written by other processes are noticed then.
+    """
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 codec: str = "auto",
+                 level: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 policy: str = "lru"
+                 ):
+
+        codec = best_codec() if codec == "auto" else codec
+        if (codec not in CODECS):
+            raise ValueError(f"Unsupported or not installed codec: {codec}, expected one of {tuple(CODECS)}")
+
+        if (policy not in GC_POLICIES):
+            raise ValueError(f"Unsupported gc policy: {policy}, expected one of {GC_POLICIES}")
+
+        self.cache_dir = cache_dir if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.codec = codec
+        self.level = level if level is not None else CODECS[codec][0]
+        self.max_bytes = max_bytes
+        self.policy = policy
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.manifest = Manifest(os.path.join(self.cache_dir, "manifest.db"))
+
+        self.__lock = threading.Lock()
+        self.__total = self.manifest.total()
+        # Keys of the spills not dropped yet
+        self.__pinned: Set[str] = set()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+    def path(self, key: str, codec: Optional[str] = None) -> str:
+        # Shard by prefix to keep directories small
+        return os.path.join(self.cache_dir, key[:2], f"{key}{EXTENSIONS[codec or self.codec]}")
+
+    def exists(self, key: str, version: Optional[str] = None) -> bool:
+        entry = self.manifest.lookup(key)
+
+        return entry is not None and (version is None or entry["version"] == version)
+
+    def put(self, key: str, value: Any, version: Optional[str] = None) -> None:
+        """Store `value`, `version` is the version of its source a later `get` must match"""
+
+        previous = self.manifest.lookup(key)
+
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        data = CODECS[self.codec][1](pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.level)
+
+        # Write then rename, readers never see a half written entry
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        os.replace(tmp_path, path)
+        self.manifest.record(key, len(data), self.codec, version)
+
+        if (previous is not None and previous["codec"] != self.codec):
+            # Stored before under another codec
+            self.__remove_file(key, previous["codec"])
+
+        self.__grow(len(data) - (previous["size"] if previous is not None else 0))
+
+    def get(self, key: str, version: Optional[str] = None) -> Optional[Any]:
+        """The stored value, None when missing or stored for another `version` of its source"""
+
+        entry = self.manifest.lookup(key)
+        if (entry is None or (version is not None and entry["version"] != version)):
+            return None
+
+        if (entry["codec"] not in CODECS):
+            # Written by a process having the codec installed
+            return None
+
+        try:
+            with open(self.path(key, entry["codec"]), "rb") as f:
+                data = f.read()
+
+        except FileNotFoundError:
+            # Removed behind the manifest
+            self.manifest.remove(key)
+            return None
+
+        self.manifest.touch(key)
+
+        return pickle.loads(CODECS[entry["codec"]][2](data))
+
+    def delete(self, key: str) -> None:
+        entry = self.manifest.lookup(key)
+        if (entry is None):
+            return
+
+        self.__remove_file(key, entry["codec"])
+        self.manifest.remove(key)
+        self.__grow(-entry["size"])
+
+    def __grow(self, nbytes: int) -> None:
+        with self.__lock:
+            self.__total += nbytes
+            over = self.max_bytes is not None and self.__total > self.max_bytes
+
+        # Only over quota, the victim scan reads the whole manifest
+        if (over):
+            self.gc(self.max_bytes)
+
+    def gc(self, max_bytes: Optional[int] = None, policy: Optional[str] = None) -> Dict[str, int]:
+        """Evict entries, least recently used (`"lru"`) or largest (`"size"`) first, until at most `max_bytes` are left
+
+        Returns:
+            Dict[str, int]: {"removed", "freed", "bytes"}, entries and bytes evicted and bytes left.
+        """
+
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        policy = policy or self.policy
+
+        if (policy not in GC_POLICIES):
+            raise ValueError(f"Unsupported gc policy: {policy}, expected one of {GC_POLICIES}")
+
+        total = self.manifest.total()
+        removed, freed = 0, 0
+
+        if (max_bytes is not None and total > max_bytes):
+            with self.__lock:
+                pinned = set(self.__pinned)
+
+            for key, size, codec in self.manifest.victims(policy):
+                if (total - freed <= max_bytes):
+                    break
+
+                if (key in pinned):
+                    continue
+
+                self.__remove_file(key, codec)
+                self.manifest.remove(key)
+
+                removed += 1
+                freed += size
+
+        with self.__lock:
+            self.__total = total - freed
+
+        return {"removed": removed, "freed": freed, "bytes": total - freed}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache_dir": self.cache_dir,
+            "codec": self.codec,
+            "level": self.level,
+            "max_bytes": self.max_bytes,
+            **self.manifest.stats()
+        }
+
+    def __remove_file(self, key: str, codec: str) -> None:
+        if (codec == SPILL):
+            shutil.rmtree(self.spill_dir(key), ignore_errors=True)
+            return
+
+        try:
+            os.remove(self.path(key, codec))
+
+        except FileNotFoundError:
+            pass
+
+    def spill_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, SPILL, key)
+
+    def spill(self, columns: Sequence[str]) -> 'SpilledFrame':
+        key = uuid.uuid4().hex
+
+        with self.__lock:
+            self.__pinned.add(key)
+
+        self.manifest.record(key, 0, SPILL)
+
+        return SpilledFrame(self.spill_dir(key), columns, cacher=self, key=key)
+
+    def _spilled(self, key: str, nbytes: int) -> None:
+        # A chunk of `nbytes` was written into the spill `key`
+        self.manifest.grow(key, nbytes)
+        self.__grow(nbytes)
+
+    def _unspill(self, key: str) -> None:
+        with self.__lock:
+            self.__pinned.discard(key)
+
+        self.delete(key)
+
+
+class SpilledFrame():
+    """A result set written to the local cache chunk by chunk instead of being held in memory.
+
+    Iterate it to get the chunks back one DataFrame at a time, or call `to_pandas`
+    if it turns out to fit after all. The chunks are accounted in the manifest of `cacher`,
+    `drop` (or garbage collecting the frame) removes them, spills left behind by a crashed process are evicted by `gc`.
+    """
+    def __init__(self,
+                 spill_dir: str,
+                 columns: Sequence[str],
+                 cacher: Optional[Cacher] = None,
+                 key: Optional[str] = None
+                 ):
+
+        self.spill_dir = spill_dir
+        self.columns = list(columns)
+        self.chunks = 0
+        self.rows = 0
+
+        self.cacher = cacher
+        self.key = key
+        self.__finalizer = weakref.finalize(self, cacher._unspill, key) if (cacher is not None) else None
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for i in range(self.chunks):
+            with open(self.__chunk_path(i), "rb") as f:
+                yield pickle.load(f)
+
+    def __chunk_path(self, index: int) -> str:
+        return os.path.join(self.spill_dir, f"{index:08d}.pkl")
+
+    def append(self, df: pd.DataFrame) -> None:
+        path = self.__chunk_path(self.chunks)
+        with open(path, "wb") as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.chunks += 1
+        self.rows += len(df)
+
+        if (self.cacher is not None):
+            self.cacher._spilled(self.key, os.path.getsize(path))
+
+    def to_pandas(self) -> pd.DataFrame:
+        if (self.chunks == 0):
+            return pd.DataFrame(columns=self.columns)
+
+        return pd.concat(list(self), ignore_index=True)
+
+    def drop(self) -> None:
+        if (self.__finalizer is not None):
+            # Runs once, also when the frame is collected later
+            self.__finalizer()
+
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        self.chunks = 0
+        self.rows = 0
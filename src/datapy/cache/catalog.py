@@ -0,0 +1,162 @@
+'''
+@File    :   catalog.py
+@Time    :   2025/06/22 16:38:05
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Schemata, tables, columns, indexes and table stats kept in the local cache
+'''
+
+
+import copy
+import threading
+import time
+
+from typing import Any, Dict, List, Optional, Set
+
+from .cacher import Cacher
+
+
+# Fields of `summary`, "columns" is the number of columns
+SUMMARY = ("Dataset_Item", "rows", "avg_row_length", "data_length", "index_length", "update_time", "columns")
+
+
+class Catalog():
+    """What a backend holds, loaded in bulk and kept in the local cache between processes.
+
+    Every dataset_group is loaded with one stats query over all its tables plus one describe of the
+    tables whose `version` (`UPDATE_TIME` on MySQL, the DDL on SQLite) moved since the last refresh,
+    the columns and indexes of unchanged tables are kept (`db` is the `IDBCommon` to read from).
+    Entries older than `ttl` seconds are stale. Groups `invalidate`d by a change made here stay `dirty`
+    until refreshed, and should be refreshed from the primary, a lagging replica may not have the change yet.
+    """
+    def __init__(self, source: str, ttl: Optional[float] = 300.0) -> None:
+        self.source = source
+        self.ttl = ttl
+
+        self.databases: Optional[List[str]] = None
+        # dataset_group -> dataset_item -> {"rows", ..., "version", "columns", "indexes"}
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # dataset_group (None for the list of groups) -> time of its last refresh
+        self.refreshed_at: Dict[Optional[str], float] = {}
+        # Invalidated and not refreshed since
+        self.dirty: Set[Optional[str]] = set()
+
+        self.lock = threading.RLock()
+
+    @property
+    def key(self) -> str:
+        return Cacher.make_key("catalog", self.source)
+
+    def load(self, cacher: Cacher) -> None:
+        stored = cacher.get(self.key)
+
+        if (stored is not None):
+            with self.lock:
+                self.databases, self.tables, self.refreshed_at = (
+                    stored["databases"], stored["tables"], stored["refreshed_at"]
+                )
+                self.dirty = set(stored.get("dirty", ()))
+
+    def save(self, cacher: Cacher) -> None:
+        with self.lock:
+            cacher.put(self.key, {
+                "databases": self.databases, "tables": self.tables, "refreshed_at": self.refreshed_at, "dirty": self.dirty
+            })
+
+    def stale(self, dataset_group: Optional[str] = None) -> bool:
+        with self.lock:
+            refreshed_at = self.refreshed_at.get(dataset_group)
+
+        if (refreshed_at is None):
+            return True
+
+        return self.ttl is not None and time.time() - refreshed_at > self.ttl
+
+    def invalidate(self, dataset_group: Optional[str] = None) -> None:
+        """Refresh `dataset_group` (and the list of groups) on the next access, e.g. after a DDL"""
+
+        with self.lock:
+            self.refreshed_at.pop(None, None)
+            self.dirty.add(None)
+
+            if (dataset_group is not None):
+                self.refreshed_at.pop(dataset_group, None)
+                self.dirty.add(dataset_group)
+
+    def is_dirty(self, dataset_group: Optional[str] = None) -> bool:
+        with self.lock:
+            return dataset_group in self.dirty
+
+    def refresh_databases(self, db: Any) -> List[str]:
+        databases = db.list_databases()
+
+        with self.lock:
+            self.databases = databases
+            self.refreshed_at[None] = time.time()
+            self.dirty.discard(None)
+
+            # Dropped groups leave the catalog
+            for dataset_group in set(self.tables).difference(databases):
+                self.tables.pop(dataset_group)
+                self.refreshed_at.pop(dataset_group, None)
+                self.dirty.discard(dataset_group)
+
+        return databases
+
+    def refresh(self, db: Any, dataset_group: str, full: bool = False) -> Dict[str, int]:
+        """Reload the stats of every table of `dataset_group` and describe the changed ones again
+        (all of them with `full`). Returns how many tables there are, were described and were dropped.
+        """
+
+        stats = db.table_stats(dataset_group)
+
+        with self.lock:
+            known = self.tables.get(dataset_group, {})
+
+        changed = [
+            dataset_item for dataset_item, item_stats in stats.items()
+            if full or dataset_item not in known or known[dataset_item]["version"] != item_stats["version"]
+        ]
+        described = db.describe_tables(dataset_group, changed)
+
+        tables = {}
+        for dataset_item, item_stats in stats.items():
+            if (dataset_item in described):
+                tables[dataset_item] = dict(described[dataset_item], **item_stats)
+            else:
+                # Same schema, only the stats moved
+                tables[dataset_item] = dict(known[dataset_item], **item_stats)
+
+        with self.lock:
+            self.tables[dataset_group] = tables
+            self.refreshed_at[dataset_group] = time.time()
+            self.dirty.discard(dataset_group)
+
+        return {"tables": len(tables), "described": len(changed), "dropped": len(set(known).difference(stats))}
+
+    def items(self, dataset_group: str) -> List[str]:
+        with self.lock:
+            return sorted(self.tables.get(dataset_group, {}))
+
+    def describe(self, dataset_group: str, dataset_item: str) -> Dict[str, Any]:
+        with self.lock:
+            entry = self.tables.get(dataset_group, {}).get(dataset_item)
+
+            if (entry is None):
+                raise ValueError(f"Unknown dataset_item: {dataset_group}.{dataset_item}")
+
+            # Callers never edit the catalog
+            return copy.deepcopy(entry)
+
+    def summary(self, dataset_group: str) -> List[Dict[str, Any]]:
+        """One row per dataset_item, its stats and number of columns"""
+
+        with self.lock:
+            return [
+                dict(
+                    {field: entry.get(field) for field in SUMMARY[1:-1]},
+                    Dataset_Item=dataset_item,
+                    columns=len(entry["columns"])
+                )
+                for dataset_item, entry in sorted(self.tables.get(dataset_group, {}).items())
+            ]
@@ -0,0 +1,105 @@
+'''
+@File    :   manifest.py
+@Time    :   2025/06/10 20:41:05
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   SQLite index of the local cache entries
+'''
+
+
+import sqlite3
+import threading
+import time
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class Manifest():
+    """Key, size, created/last-access time, source version and codec of every cache entry.
+
+    Lookups go through the primary key, eviction order through the `accessed` index.
+    """
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "key TEXT PRIMARY KEY, size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, "
+        "version TEXT, codec TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+    )
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # Several processes may share one cache directory
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        for statement in self.SCHEMA:
+            self.db.execute(statement)
+
+        self.lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT key, size, created, accessed, version, codec FROM entries WHERE key = ?", (key, )
+            ).fetchone()
+
+        if (row is None):
+            return None
+
+        return dict(zip(("key", "size", "created", "accessed", "version", "codec"), row))
+
+    def record(self, key: str, size: int, codec: str, version: Optional[str] = None) -> None:
+        now = time.time()
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (key, size, created, accessed, version, codec) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, size, now, now, version, codec)
+            )
+
+    def grow(self, key: str, nbytes: int) -> None:
+        with self.lock:
+            self.db.execute(
+                "UPDATE entries SET size = size + ?, accessed = ? WHERE key = ?", (nbytes, time.time(), key)
+            )
+
+    def touch(self, key: str) -> None:
+        with self.lock:
+            self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+
+    def remove(self, key: str) -> None:
+        with self.lock:
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key, ))
+
+    def total(self) -> int:
+        with self.lock:
+            return int(self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0])
+
+    def victims(self, policy: str = "lru") -> Iterator[Tuple[str, int, str]]:
+        """`(key, size, codec)` in eviction order, least recently used or largest first"""
+
+        order = {"lru": "accessed ASC", "size": "size DESC"}[policy]
+
+        with self.lock:
+            rows = self.db.execute(f"SELECT key, size, codec FROM entries ORDER BY {order}").fetchall()
+
+        return iter(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            entries, size, oldest = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(accessed) FROM entries"
+            ).fetchone()
+            codecs = self.db.execute("SELECT codec, COUNT(*), SUM(size) FROM entries GROUP BY codec").fetchall()
+
+        return {
+            "entries": entries,
+            "bytes": size,
+            "oldest_access": oldest,
+            "codecs": {codec: {"entries": count, "bytes": total} for codec, count, total in codecs}
+        }
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
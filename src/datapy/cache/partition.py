@@ -0,0 +1,165 @@
+'''
+@File    :   partition.py
+@Time    :   2025/06/05 21:33:14
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Cache range queries per fixed time bucket
+'''
+
+
+import pandas as pd
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cacher import Cacher
+from ..query_builder import DataCondition, DataField
+from ..query_builder.builder import OPBetweenNode, OPLogicalNode
+
+
+BUCKETS = {
+    "day": pd.Timedelta(days=1),
+    "hour": pd.Timedelta(hours=1)
+}
+
+# BETWEEN is inclusive, a bucket ends one tick before the next one starts
+TICK = pd.Timedelta(microseconds=1)
+
+
+class TimePartition():
+    """Cache layout of one dataset_item, whose range queries are stored per `bucket` of `column`.
+
+    Only conditions being `column BETWEEN low AND high`, optionally AND-ed with other conditions,
+    are served from the buckets. Buckets that are not over for `settle` seconds yet are always fetched again,
+    settled ones are only served while their own checksum (e.g. COUNT and MAX of `column`) is unchanged,
+    so a late row, an insert or a delete only refetches the bucket it falls into.
+    """
+    def __init__(self,
+                 dataset_group: str,
+                 dataset_item: str,
+                 column: str,
+                 bucket: str = "day",
+                 settle: float = 0
+                 ):
+
+        if (bucket not in BUCKETS):
+            raise ValueError(f"Unsupported bucket: {bucket}, expected one of {tuple(BUCKETS)}")
+
+        self.dataset_group = dataset_group
+        self.dataset_item = dataset_item
+        self.column = column
+        self.bucket = bucket
+        self.width = BUCKETS[bucket]
+        self.settle = pd.Timedelta(seconds=settle)
+
+    def split(self, condition: Optional[DataCondition]) -> Optional[Tuple[Any, Any, Optional[DataCondition]]]:
+        """`(low, high, rest)` of a condition on the bucket column, None when it cannot be bucketed"""
+
+        if (isinstance(condition, OPBetweenNode) and condition.field.name == self.column):
+            return (*condition.val_range, None)
+
+        if (isinstance(condition, OPLogicalNode) and condition.operator == "AND"):
+            ranges = [
+                node for node in condition.child_nodes
+                if isinstance(node, OPBetweenNode) and node.field.name == self.column
+            ]
+
+            if (len(ranges) == 1):
+                others = [node for node in condition.child_nodes if node is not ranges[0]]
+                rest = others[0] if len(others) == 1 else OPLogicalNode("AND", others)
+
+                return (*ranges[0].val_range, rest)
+
+        return None
+
+    def floor(self, value: Any) -> pd.Timestamp:
+        return pd.Timestamp(value).floor(self.width)
+
+    def buckets(self, low: Any, high: Any) -> List[pd.Timestamp]:
+        return list(pd.date_range(self.floor(low), self.floor(high), freq=self.width))
+
+    def key(self, start: pd.Timestamp, rest: Optional[DataCondition]) -> str:
+        return Cacher.make_key(
+            "partition", self.dataset_group, self.dataset_item, self.column, self.bucket,
+            start.isoformat(), rest.compile() if rest is not None else None
+        )
+
+    def condition(self, start: pd.Timestamp, end: pd.Timestamp, rest: Optional[DataCondition]) -> DataCondition:
+        # A run of consecutive buckets [start, end) as one BETWEEN
+        between = DataField(self.column).between(start.to_pydatetime(), (end - TICK).to_pydatetime())
+
+        return between if rest is None else between & rest
+
+    def fetch(self,
+              cacher: Cacher,
+              low: Any,
+              high: Any,
+              rest: Optional[DataCondition],
+              fetch: Callable[[DataCondition], pd.DataFrame],
+              checksum: Optional[Callable[[DataCondition], Optional[str]]] = None,
+              refresh: bool = False,
+              now: Optional[pd.Timestamp] = None
+              ) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """Assemble `low <= column <= high` from cached buckets, fetching only the missing ones.
+        Every settled bucket is stored with its `checksum`, None (or no checksum) stores nothing.
+
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, int]]: The rows in range and {"hits", "misses"} in buckets.
+        """
+
+        now = now if now is not None else pd.Timestamp.now()
+
+        buckets = self.buckets(low, high)
+        if (len(buckets) == 0):
+            # Empty range, nothing worth caching
+            between = DataField(self.column).between(low, high)
+            return fetch(between if rest is None else between & rest), {"hits": 0, "misses": 0}
+
+        frames: Dict[pd.Timestamp, pd.DataFrame] = {}
+        missing: List[pd.Timestamp] = []
+        # Settled buckets to the checksum they are valid for, the open and unsettled ones keep receiving rows
+        checksums: Dict[pd.Timestamp, str] = {}
+
+        for start in buckets:
+            if (checksum is not None and start + self.width + self.settle <= now):
+                version = checksum(self.condition(start, start + self.width, rest))
+                if (version is not None):
+                    checksums[start] = version
+
+            cached = cacher.get(self.key(start, rest), checksums[start]) if (not refresh and start in checksums) else None
+
+            if (cached is None):
+                missing.append(start)
+            else:
+                frames[start] = cached
+
+        for first, last in self.__runs(missing):
+            df = fetch(self.condition(first, last + self.width, rest))
+            starts = pd.to_datetime(df[self.column]).dt.floor(self.width)
+
+            for start in pd.date_range(first, last, freq=self.width):
+                part = df[(starts == start).values].reset_index(drop=True)
+                frames[start] = part
+
+                if (start in checksums):
+                    cacher.put(self.key(start, rest), part, checksums[start])
+
+        # Empty buckets only carry the columns
+        parts = [frames[start] for start in sorted(frames) if len(frames[start]) != 0] or [frames[buckets[0]]]
+        df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+        # The first and last buckets may stick out of the requested range
+        values = pd.to_datetime(df[self.column])
+        df = df[((values >= pd.Timestamp(low)) & (values <= pd.Timestamp(high))).values].reset_index(drop=True)
+
+        return df, {"hits": len(frames) - len(missing), "misses": len(missing)}
+
+    def __runs(self, starts: List[pd.Timestamp]) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        runs: List[Tuple[pd.Timestamp, pd.Timestamp]] = []
+
+        for start in starts:
+            if (runs and runs[-1][1] + self.width == start):
+                runs[-1] = (runs[-1][0], start)
+            else:
+                runs.append((start, start))
+
+        return runs
@@ -0,0 +1,211 @@
+'''
+@File    :   rollup.py
+@Time    :   2025/06/08 14:52:27
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Locally materialized group-by rollups refreshed past a watermark
+'''
+
+
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .cacher import Cacher
+from ..query_builder import DataCondition, DataField
+
+
+# aggregate -> [(partial suffix, function over the rows, function merging partials)]
+PARTIALS = {
+    "sum": [("", "sum", "sum")],
+    "count": [("", "count", "sum")],
+    "min": [("", "min", "min")],
+    "max": [("", "max", "max")],
+    "mean": [("__sum", "sum", "sum"), ("__count", "count", "sum")]
+}
+
+
+def native(value: Any) -> Any:
+    # Watermarks are bound as query parameters, drivers only take python values
+    if (isinstance(value, pd.Timestamp)):
+        return value.to_pydatetime()
+
+    if (isinstance(value, np.generic)):
+        return value.item()
+
+    return value
+
+
+def fingerprint(row: Tuple) -> str:
+    """Identity of a row however its batch was typed, NULL/NaN and integral floats (ints widened by NULLs)"""
+
+    values = []
+    for value in row:
+        value = native(value)
+
+        if (value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT):
+            value = None
+        elif (isinstance(value, float) and value.is_integer()):
+            value = int(value)
+
+        values.append(value)
+
+    return Cacher.make_key(*values)
+
+
+class Rollup():
+    """Group-by aggregates of a dataset_item, kept as mergeable partials in the local cache.
+
+    `aggregates` maps an output column to `(source column, "sum"|"count"|"min"|"max"|"mean")`.
+    `refresh` only reads the rows whose `time_column` is at or past the watermark of the previous refresh,
+    so the source is expected to be append-only in `time_column`. Rows at the watermark itself are read
+    again, as rows with that time may commit after a refresh, and the ones already merged are skipped
+    by their fingerprints kept in `boundary`.
+    """
+    def __init__(self,
+                 name: str,
+                 dataset_group: str,
+                 dataset_item: str,
+                 by: Sequence[str],
+                 aggregates: Dict[str, Tuple[str, str]],
+                 time_column: str,
+                 condition: Optional[DataCondition] = None
+                 ):
+
+        for output, (column, func) in aggregates.items():
+            if (func not in PARTIALS):
+                raise ValueError(f"Unsupported aggregate `{func}` of `{output}`, expected one of {tuple(PARTIALS)}")
+
+        self.name = name
+        self.dataset_group = dataset_group
+        self.dataset_item = dataset_item
+        self.by = list(by)
+        self.aggregates = dict(aggregates)
+        self.time_column = time_column
+        self.condition = condition
+
+        self.partials: Dict[str, Tuple[str, str, str]] = {
+            f"{output}{suffix}": (column, func, merge)
+            for output, (column, aggregate) in self.aggregates.items()
+            for suffix, func, merge in PARTIALS[aggregate]
+        }
+
+        self.watermark: Any = None
+        self.state: Optional[pd.DataFrame] = None
+        # fingerprint -> number of merged rows at the watermark
+        self.boundary: Counter = Counter()
+
+        # One refresh at a time, a second one would merge the same rows twice
+        self.lock = threading.Lock()
+
+    @property
+    def key(self) -> str:
+        # A changed definition never picks up the state of the old one
+        return Cacher.make_key(
+            "rollup", self.name, self.dataset_group, self.dataset_item, self.by, sorted(self.aggregates.items()),
+            self.time_column, self.condition.compile() if self.condition is not None else None
+        )
+
+    def load(self, cacher: Cacher) -> None:
+        stored = cacher.get(self.key)
+
+        if (stored is not None):
+            self.watermark, self.state = stored["watermark"], stored["state"]
+            self.boundary = Counter(stored.get("boundary", {}))
+
+    def save(self, cacher: Cacher) -> None:
+        cacher.put(self.key, {"watermark": self.watermark, "state": self.state, "boundary": dict(self.boundary)})
+
+    def pending(self) -> Optional[DataCondition]:
+        """Condition of the rows not merged yet"""
+
+        condition = self.condition
+        if (self.watermark is not None):
+            past = DataField(self.time_column) >= native(self.watermark)
+            condition = past if condition is None else condition & past
+
+        return condition
+
+    def aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.groupby(self.by, dropna=False, sort=False).agg(
+            **{partial: (column, func) for partial, (column, func, _) in self.partials.items()}
+        ).reset_index()
+
+    def __fingerprints(self, df: pd.DataFrame) -> List[str]:
+        return [fingerprint(row) for row in df.itertuples(index=False, name=None)]
+
+    def merge(self, batches: Iterable[pd.DataFrame]) -> int:
+        """Fold new rows into the partials, returns the number of rows merged"""
+
+        rows = 0
+        watermark = self.watermark
+        parts: List[pd.DataFrame] = [] if self.state is None else [self.state]
+
+        # Merged by the previous refreshes, consumed as they are read again
+        merged = Counter(self.boundary)
+        boundary = Counter(self.boundary)
+
+        for df in batches:
+            if (len(df) != 0 and self.watermark is not None):
+                at = (df[self.time_column] == self.watermark).values
+
+                if (at.any()):
+                    keep = np.ones(len(df), dtype=bool)
+
+                    for i, key in zip(np.flatnonzero(at), self.__fingerprints(df[at])):
+                        if (merged[key] > 0):
+                            merged[key] -= 1
+                            keep[i] = False
+
+                    df = df[keep]
+
+            if (len(df) == 0):
+                continue
+
+            rows += len(df)
+            parts.append(self.aggregate(df))
+
+            latest = df[self.time_column].max()
+            if (watermark is None or latest > watermark):
+                watermark, boundary = latest, Counter()
+
+            if (latest == watermark):
+                boundary.update(self.__fingerprints(df[(df[self.time_column] == watermark).values]))
+
+            # Keep at most the state and one batch around
+            if (len(parts) > 1):
+                parts = [self.__combine(parts)]
+
+        # Published together, a failed refresh leaves the previous state untouched
+        if (rows != 0):
+            self.state, self.watermark, self.boundary = self.__combine(parts), watermark, boundary
+
+        return rows
+
+    def __combine(self, parts: List[pd.DataFrame]) -> pd.DataFrame:
+        if (len(parts) == 1):
+            return parts[0]
+
+        return pd.concat(parts, ignore_index=True).groupby(self.by, dropna=False, sort=False).agg(
+            **{partial: (partial, merge) for partial, (_, _, merge) in self.partials.items()}
+        ).reset_index()
+
+    def result(self) -> pd.DataFrame:
+        """The aggregates of every group, `mean` resolved from its sum and count"""
+
+        if (self.state is None):
+            return pd.DataFrame(columns=self.by + list(self.aggregates))
+
+        df = self.state[self.by].copy()
+        for output, (_, aggregate) in self.aggregates.items():
+            if (aggregate == "mean"):
+                df[output] = self.state[f"{output}__sum"] / self.state[f"{output}__count"]
+            else:
+                df[output] = self.state[output]
+
+        return df.sort_values(self.by, ignore_index=True)
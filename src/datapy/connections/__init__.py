@@ -1,6 +1,20 @@
-from .connecter import DataConnecter
+from importlib import import_module
+
+
+_LAZY_ATTRS = {
+    "DataConnecter": ".connecter"
+}
 
 
 __all__ = [
     "DataConnecter"
 ]
+
+
+def __getattr__(name: str):
+    if (name not in _LAZY_ATTRS):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
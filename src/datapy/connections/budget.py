@@ -0,0 +1,181 @@
+'''
+@File    :   budget.py
+@Time    :   2025/06/20 21:12:45
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Process-wide memory budget shared by in-flight fetches and cached DataFrames
+'''
+
+
+import threading
+import time
+
+import pandas as pd
+
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Hashable, Iterator, Optional, Tuple, Union
+
+from .deadline import Deadline
+from .. import instrument
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    # Deep, a cached frame keeps its python objects alive too
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class MemoryBudget():
+    """Bytes the fetches of the process may hold at the same time.
+
+    A fetch `reserve`s its estimated size before executing and releases it when done,
+    a fetch not fitting next to the running ones queues (first come, first served) until they finish.
+    Cached DataFrames count against the same bytes and the least recently used are evicted
+    whenever a reservation needs the room, they never make a fetch wait.
+    Several `DataConnecter`s may share one budget.
+    """
+    def __init__(self, limit: int) -> None:
+        if (limit <= 0):
+            raise ValueError(f"Memory budget must be positive, got {limit}")
+
+        self.limit = limit
+        self.reserved = 0
+        self.cached = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> (version, frame, bytes), least recently used first
+        self.__frames: 'OrderedDict[Hashable, Tuple[Any, pd.DataFrame, int]]' = OrderedDict()
+        self.__waiting: Deque[object] = deque()
+        self.__condition = threading.Condition()
+
+    @classmethod
+    def of(cls, budget: Union[None, int, 'MemoryBudget']) -> Optional['MemoryBudget']:
+        if (budget is None or isinstance(budget, MemoryBudget)):
+            return budget
+
+        return cls(budget)
+
+    def __evict(self, nbytes: int) -> None:
+        # Caller holds the condition
+        while (nbytes > 0 and self.__frames):
+            _, (_, _, size) = self.__frames.popitem(last=False)
+
+            self.cached -= size
+            self.evictions += 1
+            nbytes -= size
+
+    def __wake(self) -> None:
+        with self.__condition:
+            self.__condition.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes: int, deadline: Optional[Deadline] = None) -> Iterator[None]:
+        """Hold `nbytes` (at most the whole budget) while the block runs, queueing until they are free.
+        Waiting past `deadline` raises `QueryTimeout`.
+        """
+
+        nbytes = max(0, min(nbytes, self.limit))
+        ticket = object()
+        start = time.perf_counter()
+
+        remove = deadline.on_cancel(self.__wake) if deadline is not None else None
+
+        try:
+            with self.__condition:
+                self.__waiting.append(ticket)
+
+                try:
+                    while True:
+                        # Only the head of the queue is admitted, a large fetch is not starved by small ones.
+                        # Cached frames are only dropped once the running fetches leave enough room
+                        if (self.__waiting[0] is ticket and self.reserved + nbytes <= self.limit):
+                            self.__evict(self.reserved + self.cached + nbytes - self.limit)
+                            self.reserved += nbytes
+                            break
+
+                        if (deadline is not None):
+                            deadline.check()
+                            self.__condition.wait(deadline.remaining())
+                        else:
+                            self.__condition.wait()
+
+                finally:
+                    self.__waiting.remove(ticket)
+                    self.__condition.notify_all()
+
+        finally:
+            if (remove is not None):
+                remove()
+
+        instrument.record("wait", time.perf_counter() - start)
+
+        try:
+            yield
+
+        finally:
+            with self.__condition:
+                self.reserved -= nbytes
+                self.__condition.notify_all()
+
+    def get(self, key: Hashable, version: Any = None) -> Optional[pd.DataFrame]:
+        with self.__condition:
+            entry = self.__frames.get(key)
+
+            if (entry is None or entry[0] != version):
+                self.misses += 1
+                return None
+
+            self.__frames.move_to_end(key)
+            self.hits += 1
+
+            # Callers share the blocks, copy-on-write keeps the cached frame intact
+            return entry[1].copy(deep=False)
+
+    def put(self, key: Hashable, df: pd.DataFrame, version: Any = None) -> bool:
+        """Keep `df` in memory, False when it does not fit next to the running fetches"""
+
+        size = frame_bytes(df)
+
+        with self.__condition:
+            self.discard(key)
+
+            if (self.reserved + size > self.limit):
+                return False
+
+            self.__evict(self.reserved + self.cached + size - self.limit)
+
+            # Own frame object, the caller may still add or drop columns on its one
+            self.__frames[key] = (version, df.copy(deep=False), size)
+            self.cached += size
+
+        return True
+
+    def discard(self, key: Hashable) -> None:
+        with self.__condition:
+            entry = self.__frames.pop(key, None)
+
+            if (entry is not None):
+                self.cached -= entry[2]
+                self.__condition.notify_all()
+
+    def clear(self) -> None:
+        with self.__condition:
+            self.__frames.clear()
+            self.cached = 0
+            self.__condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.__condition:
+            return {
+                "limit": self.limit,
+                "reserved": self.reserved,
+                "cached": self.cached,
+                "frames": len(self.__frames),
+                "waiting": len(self.__waiting),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,183 @@
+'''
+@File    :   converter.py
+@Time    :   2025/05/21 19:45:30
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Build Arrow record batches straight from fetched rows
+'''
+
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+try:
+    import pyarrow as pa
+
+except ImportError:     # pragma: no cover
+    pa = None
+
+
+def require_pyarrow() -> None:
+    if (pa is None):
+        raise ImportError("Arrow output requires pyarrow, install it by `pip install pyarrow`.")
+
+
+def _mysql_types() -> dict:
+    # MySQL protocol column type codes (`cursor.description[i][1]`), shared by every MySQL driver.
+    # DECIMAL is typed from the precision and scale of the description, BLOB/TEXT (252) lack the charset.
+    return {
+        1: pa.int64(),              # TINY
+        2: pa.int64(),              # SHORT
+        3: pa.int64(),              # LONG
+        4: pa.float64(),            # FLOAT
+        5: pa.float64(),            # DOUBLE
+        7: pa.timestamp("us"),      # TIMESTAMP
+        8: pa.int64(),              # LONGLONG
+        9: pa.int64(),              # INT24
+        10: pa.date32(),            # DATE
+        11: pa.duration("us"),      # TIME, drivers return timedelta
+        12: pa.timestamp("us"),     # DATETIME
+        13: pa.int64(),             # YEAR
+        14: pa.date32(),            # NEWDATE
+        15: pa.string(),            # VARCHAR
+        245: pa.string(),           # JSON
+        247: pa.string(),           # ENUM
+        253: pa.string(),           # VAR_STRING
+        254: pa.string()            # STRING
+    }
+
+
+# DECIMAL and NEWDECIMAL
+DECIMAL_CODES = (0, 246)
+
+
+def decimal_hint(column: Tuple) -> Optional[Any]:
+    # `column[4]` is the display length (digits, sign and point), never below the precision
+    length, scale = column[4], column[5]
+
+    if (not isinstance(length, int) or not isinstance(scale, int) or length <= 0):
+        return None
+
+    if (length <= 38):
+        return pa.decimal128(length, scale)
+
+    return pa.decimal256(min(length, 76), scale)
+
+
+def declared_type(type_str: str) -> Optional[Any]:
+    """Arrow type of a declared column type by the SQLite affinity rules, None where the values decide"""
+
+    upper = type_str.upper()
+
+    if ("INT" in upper):
+        return pa.uint64() if ("BIGINT" in upper and "UNSIGNED" in upper) else pa.int64()
+
+    if (any(word in upper for word in ("CHAR", "CLOB", "TEXT", "JSON", "ENUM"))):
+        return pa.string()
+
+    if ("BLOB" in upper or "BINARY" in upper):
+        return pa.binary()
+
+    if (any(word in upper for word in ("REAL", "FLOA", "DOUB"))):
+        return pa.float64()
+
+    return None
+
+
+def type_hints(description: Sequence[Tuple], declared: Optional[Dict[str, str]] = None) -> List[Optional[Any]]:
+    """Arrow type per column from `cursor.description`, then from the `declared` `{column: SQL type}`
+    of the table where the description has no type (e.g. sqlite3), None where it has to be inferred from the values.
+    """
+
+    require_pyarrow()
+    types = _mysql_types()
+
+    hints = []
+    for column in description:
+        code = column[1]
+        hint = None
+
+        if (isinstance(code, int)):
+            hint = decimal_hint(column) if (code in DECIMAL_CODES) else types.get(code)
+
+        if (hint is None and declared and declared.get(column[0])):
+            hint = declared_type(declared[column[0]])
+
+        hints.append(hint)
+
+    return hints
+
+
+class RecordBatchBuilder():
+    """Convert row batches into `pyarrow.RecordBatch`es column by column, without a DataFrame in between.
+
+    The first non-null type seen for a column wins and every later batch is cast to it,
+    so all batches share one schema.
+    """
+    def __init__(self, description: Sequence[Tuple], declared: Optional[Dict[str, str]] = None):
+        require_pyarrow()
+
+        self.names = [column[0] for column in description]
+        self.types = type_hints(description, declared)
+
+    def __array(self, index: int, values: Sequence[Any]) -> 'pa.Array':
+        hint = self.types[index]
+
+        if (hint is not None):
+            try:
+                return pa.array(values, type=hint)
+
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                # e.g. unsigned BIGINT over int64 or binary strings, fall back to inference
+                pass
+
+        array = pa.array(values)
+
+        if (not pa.types.is_null(array.type)):
+            self.types[index] = array.type
+
+        return array
+
+    def build(self, rows: Sequence[Tuple]) -> 'pa.RecordBatch':
+        columns = list(zip(*rows)) if rows else [()] * len(self.names)
+        return pa.RecordBatch.from_arrays(
+            [self.__array(i, values) for i, values in enumerate(columns)],
+            names=self.names
+        )
+
+    @property
+    def schema(self) -> 'pa.Schema':
+        return pa.schema([(name, type_ or pa.null()) for name, type_ in zip(self.names, self.types)])
+
+
+def batches2table(batches: List['pa.RecordBatch'], schema: Optional['pa.Schema'] = None) -> 'pa.Table':
+    if (not batches):
+        return schema.empty_table() if schema is not None else pa.table({})
+
+    if (all(batch.schema.equals(batches[0].schema) for batch in batches)):
+        return pa.Table.from_batches(batches)
+
+    # Columns that were all null in the first batches, promote them to the final type
+    return pa.concat_tables([pa.Table.from_batches([batch]) for batch in batches], promote_options="default")
+
+
+def table2output(table: 'pa.Table', output: str) -> Any:
+    if (output == "arrow"):
+        return table
+
+    if (output == "polars"):
+        try:
+            import polars
+
+        except ImportError:     # pragma: no cover
+            raise ImportError("Polars output requires polars, install it by `pip install polars`.")
+
+        return polars.from_arrow(table)
+
+    if (output == "pandas_arrow"):
+        import pandas as pd
+
+        # Arrow backed columns, a zero-copy view over the table buffers
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    raise ValueError(f"Unsupported output: {output}")
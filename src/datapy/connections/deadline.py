@@ -0,0 +1,84 @@
+'''
+@File    :   deadline.py
+@Time    :   2025/06/16 20:48:22
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Per-call deadline and cooperative cancellation
+'''
+
+
+import logging
+import threading
+import time
+
+from typing import Callable, List, Optional, Union
+
+
+class QueryTimeout(TimeoutError):
+    pass
+
+
+class Deadline():
+    """A point in time a call has to be done by, or `cancel()`-ed before.
+
+    Backends stop the running statement once it passes (`KILL QUERY` on MySQL, `interrupt()` on SQLite)
+    and streams check it between batches. The same deadline can be shared by several calls.
+    """
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+        self.cancelled = False
+
+        self.__callbacks: List[Callable[[], None]] = []
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def of(cls, timeout: Union[None, float, 'Deadline']) -> Optional['Deadline']:
+        if (timeout is None or isinstance(timeout, Deadline)):
+            return timeout
+
+        return cls(timeout)
+
+    def remaining(self) -> float:
+        if (self.cancelled):
+            return 0.0
+
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.cancelled or time.monotonic() >= self.expires_at
+
+    def describe(self) -> str:
+        return "Cancelled" if self.cancelled else f"Deadline of {self.timeout}s exceeded"
+
+    def check(self) -> None:
+        if (self.expired):
+            raise QueryTimeout(self.describe())
+
+    def cancel(self) -> None:
+        """Expire now, statements running under this deadline are stopped"""
+
+        with self.__lock:
+            self.cancelled = True
+            callbacks = list(self.__callbacks)
+
+        for callback in callbacks:
+            try:
+                callback()
+
+            except Exception as e:
+                logging.warning(f"Cancelling a statement failed: {e}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call `callback` on `cancel()`, returns the function unregistering it"""
+
+        with self.__lock:
+            self.__callbacks.append(callback)
+
+        def remove() -> None:
+            with self.__lock:
+                if (callback in self.__callbacks):
+                    self.__callbacks.remove(callback)
+
+        return remove
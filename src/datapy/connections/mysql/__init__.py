@@ -1,7 +1,26 @@
+from importlib import import_module
+
 from .common import RetIndices
-from .mysql import MySQL
+from .drivers import available_drivers
+
+
+# `MySQL` imports pymysql, only pay for it when a MySQL backend is created
+_LAZY_ATTRS = {
+    "MySQL": ".mysql"
+}
+
 
 __all__ = [
-    RetIndices,
-    MySQL
+    "RetIndices",
+    "MySQL",
+    "available_drivers"
 ]
+
+
+def __getattr__(name: str):
+    if (name not in _LAZY_ATTRS):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
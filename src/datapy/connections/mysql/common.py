@@ -9,14 +9,19 @@
 
 import logging
 import re
+import threading
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from enum import IntEnum
 from decimal import Decimal
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, SupportsInt, Tuple, Type, Union
 
-from .RWLock import WritePriorityReadWriteLock
+from ..deadline import Deadline, QueryTimeout
+
+RE_DATE = re.compile(r"^(?:(?:\d{4}\W\d{2}\W\d{2})|(?:\d{4}\d{2}\d{2}))$")
+RE_DATETIME = re.compile(r"^(?:(\d{4})([^A-Za-z0-9\s])(\d{2})\2(\d{2}))[T\s]([01]\d|2[0-3]):[0-5]\d:[0-5]\d$")
 
 
 def covert_to_sql_type(value: Any) -> str:
@@ -33,10 +38,10 @@ def covert_to_sql_type(value: Any) -> str:
         return "Decimal"
 
     elif (isinstance(value, str)):
-        if (re.match(r"^(?:(?:\d{4}\W\d{2}\W\d{2})|(?:\d{4}\d{2}\d{2}))$", value)):
+        if (RE_DATE.match(value)):
             return "DATE"
 
-        if (re.match(r"^(?:(\d{4})([^A-Za-z0-9\s])(\d{2})\2(\d{2}))[T\s]([01]\d|2[0-3]):[0-5]\d:[0-5]\d$", value)):
+        if (RE_DATETIME.match(value)):
             return "DATETIME"
 
         if (str(value).__len__() > 250):
@@ -54,6 +59,60 @@ def covert_to_sql_type(value: Any) -> str:
         raise TypeError(f"Unsupported value type: {type(value).__name__}")
 
 
+def compare_types(data: Any, type_map: Any, pos: str, err_pairs: List[Dict[str, str]]) -> None:
+    if (isinstance(data, dict) and isinstance(type_map, dict)):
+        for key in data.keys():
+            if key in type_map.keys():
+                compare_types(data[key], type_map[key], f"{pos}.{key}" if pos else key, err_pairs)
+
+            # Fields that do not exist in the type table will be skipped here to prevent them
+            # from not being inserted during the first insertion. If the insertion is successful,
+            # the type table will be automatically updated.
+
+    elif (isinstance(data, list) and isinstance(type_map, list) and len(type_map) > 0):
+        for i, item in enumerate(data):
+            compare_types(item, type_map[0], f"{pos}.{i}" if pos else str(i), err_pairs)
+
+    elif (data is not None and not isinstance(data, type_map)):
+        err_pairs.append({
+            'pos': pos,
+            'datatype': type(data).__name__,
+            'expection': type_map.__name__
+        })
+
+
+class TableValidator():
+    """Expected python type of every known column of one table. Immutable, a new column gives a new validator."""
+
+    __slots__ = ("columns", "types", "nested")
+
+    def __init__(self, columns: Tuple[Tuple[str, Any], ...] = ()) -> None:
+        self.columns = columns
+        self.types: Dict[str, Type] = {name: kind for name, kind in columns if isinstance(kind, type)}
+        # dict/list columns keep the recursive walk
+        self.nested: Dict[str, Any] = {name: kind for name, kind in columns if not isinstance(kind, type)}
+
+    def covers(self, data: Dict[str, Any]) -> bool:
+        return data.keys() <= self.types.keys() | self.nested.keys()
+
+    def validate(self, data: Dict[str, Any]) -> List[Dict[str, str]]:
+        err_pairs: List[Dict[str, str]] = []
+        types = self.types
+
+        for key, value in data.items():
+            expected = types.get(key)
+
+            # NULL fits any column, unknown columns are learnt after the insert
+            if (expected is not None):
+                if (value is not None and not isinstance(value, expected)):
+                    err_pairs.append({'pos': key, 'datatype': type(value).__name__, 'expection': expected.__name__})
+
+            elif (key in self.nested):
+                compare_types(value, self.nested[key], key, err_pairs)
+
+        return err_pairs
+
+
 def check_database_exists(func):
     @wraps(func)
     def wrapper(self: IDBCommon, *args, **kwargs):
@@ -97,7 +156,7 @@ def check_database_exists(func):
             return operation.get("result", None)
 
         if (database_name not in self._type_map_for_tables):
-            self._type_map_for_tables[database_name] = {}
+            self._register_type_map_database(database_name)
 
         return func(self, *args, **kwargs)
 
@@ -150,6 +209,9 @@ def check_table_exists(func):
             }
         }
 
+        # Typed table building behaves exactly like `create_table`
+        operations["create_table_with_types"] = operations["create_table"]
+
         operation = operations.get(func.__name__)
 
         if operation and operation["condition"]:
@@ -184,6 +246,32 @@ def check_data_field_type(func):
     return wrapper
 
 
+def check_rows_field_type(func):
+    @wraps(func)
+    def wrapper(self: IDBCommon, *args, **kwargs):
+        # Check datatype of every row against one snapshot of the table types
+        validator = self._table_validator(args[0])
+        for row in (args[1] if validator is not None else ()):
+            err_pairs = validator.validate(row)
+            status = len(err_pairs) == 0
+            if (not status):
+                if (self._logger is not None):
+                    self._logger.warning(DBWarnings.TypeMismatchedWarning(f"Error pairs info: {err_pairs}"))    # pragma: no cover # noqa E501
+                else:
+                    logging.warning(DBWarnings.TypeMismatchedWarning(f"Error pairs info: {err_pairs}"))
+
+                return status
+
+        status = func(self, *args, **kwargs)
+        if (status and len(args[1]) != 0):
+            # Add mapping table to quick check next data
+            self._append_table_datatype_to_map(args[0], args[1][0])
+
+        return status
+
+    return wrapper
+
+
 class IDBCommon(ABC):
     """ The interface of database. You can inherit and implement interface functions,\n
         then you can call the implemented database in the platform code.
@@ -193,12 +281,20 @@ class IDBCommon(ABC):
 
         self._curr_database_name: str | None = None
 
-        self._type_map_for_tables: Dict[str, Dict] = {}
-        self.__type_map_for_tables_lock = WritePriorityReadWriteLock()
+        # Copy-on-write snapshot {database: {table: TableValidator}}, readers never lock,
+        # writers build a new snapshot under `__type_map_write_lock` and publish it in one assignment
+        self._type_map_for_tables: Dict[str, Dict[str, TableValidator]] = {}
+        self.__type_map_write_lock = threading.Lock()
 
         self._database_exists_func: Callable[[str], bool] | None = None
         self._table_exists_func: Callable[[str], bool] | None = None
 
+        # Called after every statement with the timing of each phase and the row count
+        self._execute_hook: Callable[[Dict[str, float], int], None] | None = None
+        # Called with the record of every statement slower than `_slow_query_threshold` seconds
+        self._slow_query_func: Callable[[Dict[str, Any]], None] | None = None
+        self._slow_query_threshold: float | None = None
+
         self._logger: logging.Logger | None = None
 
     def __get_data_type(
@@ -226,80 +322,66 @@ class IDBCommon(ABC):
 
         return data_type_map                                                        # type: ignore
 
-    def __compare_data_type_maps(
-            self,
-            data: Dict[str, Any],
-            type_map: Dict[str, Type]) -> Tuple[bool, List]:   # pragma: no cover   # type: ignore
-
-        err_pairs = []
-        pos = ""
-
-        def check(data, type_map, pos):
-            if (isinstance(data, dict) and isinstance(type_map, dict)):
-                for key in data.keys():
-                    new_pos = f"{pos}.{key}" if pos else key
-                    if key in type_map.keys():
-                        check(data[key], type_map[key], new_pos)
-                    else:
-                        # Fields that do not exist in the type table will be skipped here to prevent them
-                        # from not being inserted during the first insertion. If the insertion is successful,
-                        # the type table will be automatically updated.
-                        continue
-
-            elif (isinstance(data, list) and isinstance(type_map, list) and len(type_map) > 0):
-                list_item_type = type_map[0]
-                for i, item in enumerate(data):
-                    new_pos = f"{pos}.{i}" if pos else str(i)
-                    check(item, list_item_type, new_pos)
-
-            else:
-                if not isinstance(data, type_map):
-                    err_pairs.append({
-                        'pos': pos,
-                        'datatype': type(data).__name__,
-                        'expection': type_map.__name__
-                    })
-
-        check(data, type_map, pos)
-
-        status = False if len(err_pairs) else True
-
-        return (status, err_pairs)
+    def _table_validator(self, table_name: str) -> Optional[TableValidator]:
+        return self._type_map_for_tables.get(self._curr_database_name, {}).get(table_name)
 
     def _check_datatype_correct(self,
                                 table_name: str,
                                 data: Dict[str, Type]) -> Tuple[bool, Union[List, None]]:
 
-        self.__type_map_for_tables_lock.acquire_read()
-
-        correct_table_type = self._type_map_for_tables[self._curr_database_name][table_name] \
-            if table_name in self._type_map_for_tables[self._curr_database_name].keys() else None
-
-        self.__type_map_for_tables_lock.release_read()
+        validator = self._table_validator(table_name)
 
         # For the first submission, there is no corresponding type in the type mapping table,
         # and it is necessary to return True to obtain the corresponding type table.
-        return self.__compare_data_type_maps(data, correct_table_type) \
-            if correct_table_type is not None else (True, None)
+        if (validator is None):
+            return (True, None)
+
+        err_pairs = validator.validate(data)
+
+        return (len(err_pairs) == 0, err_pairs)
+
+    def __publish_table_validator(self, database_name: str, table_name: str, validator: TableValidator) -> None:
+        # Caller holds `__type_map_write_lock`
+        snapshot = self._type_map_for_tables
+        self._type_map_for_tables = {**snapshot, database_name: {**snapshot.get(database_name, {}), table_name: validator}}
+
+    def _register_type_map_database(self, database_name: str) -> None:
+        with self.__type_map_write_lock:
+            if (database_name not in self._type_map_for_tables):
+                self._type_map_for_tables = {**self._type_map_for_tables, database_name: {}}
+
+    def _forget_type_map(self, database_name: str) -> None:
+        with self.__type_map_write_lock:
+            self._type_map_for_tables = {
+                name: tables for name, tables in self._type_map_for_tables.items() if name != database_name
+            }
 
     def _append_table_datatype_to_map(
             self,
             table_name: str,
             data: Dict[str, Any]) -> None:
 
-        self.__type_map_for_tables_lock.acquire_write()
+        # Lock-free fast path, nothing new to learn
+        current = self._table_validator(table_name)
+        if (current is not None and current.covers(data)):
+            return
 
-        if (table_name not in self._type_map_for_tables[self._curr_database_name]):
-            self._type_map_for_tables[self._curr_database_name][table_name] = {}
+        with self.__type_map_write_lock:
+            current = self._table_validator(table_name) or TableValidator()
 
-        if (self._type_map_for_tables[self._curr_database_name][table_name].keys() != data.keys()):
             # Different keys, update according to the replenishment strategy.
-            diff_keys = data.keys() - self._type_map_for_tables[self._curr_database_name][table_name].keys()
-            dtypes = self.__get_data_type(data)
-            for key in diff_keys:
-                self._type_map_for_tables[self._curr_database_name][table_name][key] = dtypes[key]
+            # NULL tells nothing about the column type, it is learnt from a later row.
+            diff = {
+                key: value for key, value in data.items()
+                if key not in current.types and key not in current.nested and value is not None
+            }
+            if (len(diff) == 0):
+                return
 
-        self.__type_map_for_tables_lock.release_write()
+            self.__publish_table_validator(
+                self._curr_database_name, table_name,
+                TableValidator(current.columns + tuple(self.__get_data_type(diff).items()))
+            )
 
     def _register_database_exists_func(self, func: Callable[[str], bool]) -> None:
         self._database_exists_func = func
@@ -307,6 +389,68 @@ class IDBCommon(ABC):
     def _register_table_exists_func(self, func: Callable[[str], bool]) -> None:
         self._table_exists_func = func
 
+    def _register_execute_hook(self, func: Callable[[Dict[str, float], int], None]) -> None:
+        self._execute_hook = func
+
+    def _register_slow_query_func(self, func: Callable[[Dict[str, Any]], None], threshold: float) -> None:
+        self._slow_query_func = func
+        self._slow_query_threshold = threshold
+
+    def _holds_lock(self) -> bool:
+        """Whether the calling thread already holds `lock_exec`, e.g. inside `transaction()`"""
+
+        return bool(self.lock_exec._is_owned())
+
+    @contextmanager
+    def _acquire(self, deadline: Optional[Deadline]) -> Iterator[None]:
+        """`lock_exec`, waiting for it at most until `deadline`"""
+
+        if (deadline is None):
+            with self.lock_exec:
+                yield
+            return
+
+        if (not self.lock_exec.acquire(timeout=deadline.remaining())):
+            raise QueryTimeout(f"Waited {deadline.timeout}s for the connection")
+
+        try:
+            yield
+
+        finally:
+            self.lock_exec.release()
+
+    @contextmanager
+    def _watchdog(self, deadline: Optional[Deadline]) -> Iterator[threading.Event]:
+        """`cancel()` the running statement once `deadline` passes or is cancelled, the event is set when it did"""
+
+        fired = threading.Event()
+        if (deadline is None):
+            yield fired
+            return
+
+        def fire() -> None:
+            if (fired.is_set()):
+                return
+
+            fired.set()
+            try:
+                self.cancel()
+
+            except Exception as e:
+                logging.warning(f"Cancelling the statement past its deadline failed: {e}")
+
+        timer = threading.Timer(deadline.remaining(), fire)
+        timer.daemon = True
+        timer.start()
+        remove = deadline.on_cancel(fire)
+
+        try:
+            yield fired
+
+        finally:
+            timer.cancel()
+            remove()
+
     @abstractmethod
     # pragma: no cover
     def create_database(self, database_name: str) -> bool:
@@ -327,6 +471,14 @@ class IDBCommon(ABC):
     def create_table(self, table_name: str, column_infos: List[Tuple[str, Any]]) -> bool:
         pass
 
+    @abstractmethod
+    # pragma: no cover
+    def create_table_with_types(self,
+                                table_name: str,
+                                column_types: List[Tuple[str, str]],
+                                primary_key: Sequence[str] = ()) -> bool:
+        pass
+
     @abstractmethod
     # pragma: no cover
     def drop_table(self, table_name: str) -> bool:
@@ -337,11 +489,26 @@ class IDBCommon(ABC):
     def insert(self, table_name: str, data: Dict[str, Any]) -> bool:
         pass
 
+    @abstractmethod
+    # pragma: no cover
+    def insert_many(self, table_name: str, rows: Sequence[Dict[str, Any]]) -> bool:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def upsert_many(self, table_name: str, rows: Sequence[Dict[str, Any]], key_columns: Sequence[str]) -> bool:
+        pass
+
     @abstractmethod
     # pragma: no cover
     def delete(self, table_name: str, condition: str) -> bool:
         pass
 
+    @abstractmethod
+    # pragma: no cover
+    def delete_many(self, table_name: str, key_columns: Sequence[str], keys: Sequence[Tuple]) -> bool:
+        pass
+
     @abstractmethod
     # pragma: no cover
     def select(self, table_name: str, condition: Optional[str] = None) -> Tuple[Tuple, List]:
@@ -354,7 +521,72 @@ class IDBCommon(ABC):
 
     @abstractmethod
     # pragma: no cover
-    def execute(self, sql: str, data: Tuple = ()) -> Tuple:
+    def execute(self, sql: str, data: Tuple = (), timeout: Union[None, float, Deadline] = None) -> Tuple:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def row_hashes(self, table_name: str, key_columns: Sequence[str], columns: Sequence[str]) -> List[Tuple]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def primary_key(self, table_name: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def sample_predicate(self, key_columns: Sequence[str], seed: int, threshold: int) -> Tuple[str, Tuple]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def list_databases(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def list_tables(self, database_name: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def table_stats(self, database_name: str) -> Dict[str, Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def describe_tables(self, database_name: str, table_names: Sequence[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def replication_lag(self) -> Optional[float]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def table_version(self, table_name: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def estimate(self, table_name: str, sql: str, data: Tuple = ()) -> Tuple[int, int]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def execute_stream(self,
+                       sql: str,
+                       data: Tuple = (),
+                       batch_size: SupportsInt = 10000,
+                       timeout: Union[None, float, Deadline] = None
+                       ) -> Iterator[Tuple[Tuple, List]]:
+        pass
+
+    @abstractmethod
+    # pragma: no cover
+    def cancel(self) -> None:
         pass
 
     @abstractmethod
@@ -0,0 +1,200 @@
+'''
+@File    :   drivers.py
+@Time    :   2025/05/24 17:20:08
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   MySQL driver layer, normalize pymysql / mysqlclient / mysql-connector
+'''
+
+
+import importlib
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Tuple, Type
+
+
+# Client errors of a connection dropped by the server or the network: gone away, lost, lost on send
+CONNECTION_LOST = (2006, 2013, 2055)
+
+
+class Driver(ABC):
+    """Everything `MySQL` needs from a DB-API driver beyond `cursor()`, `commit()` and `rollback()`."""
+
+    name = ""
+    module = ""
+
+    def __init__(self) -> None:
+        self.lib = importlib.import_module(self.module)
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            importlib.import_module(cls.module)
+
+        except ImportError:
+            return False
+
+        return True
+
+    @abstractmethod
+    # pragma: no cover
+    def connect(self, params: Dict[str, Any]) -> Any:
+        pass
+
+    def set_autocommit(self, conn: Any, flag: bool) -> None:
+        conn.autocommit(flag)
+
+    def select_db(self, conn: Any, database_name: str) -> None:
+        conn.select_db(database_name)
+
+    def is_open(self, conn: Any) -> bool:
+        """Local state only, a connection the server dropped still looks open until a statement fails on it."""
+        return bool(conn.open)
+
+    def ping(self, conn: Any) -> Any:
+        """Make sure the connection is alive, returns the connection to use from now on."""
+        conn.ping(True)
+        return conn
+
+    @abstractmethod
+    # pragma: no cover
+    def stream_cursor(self, conn: Any) -> Any:
+        pass
+
+    def thread_id(self, conn: Any) -> int:
+        return conn.thread_id()
+
+    @staticmethod
+    def description(cursor: Any) -> Tuple:
+        # (name, type_code, display_size, internal_size, precision, scale, null_ok) whatever the driver adds
+        return tuple(tuple(column[:7]) for column in (cursor.description or ()))
+
+    @staticmethod
+    def error_args(e: Exception) -> Tuple[int, str]:
+        if (len(e.args) >= 2 and isinstance(e.args[0], int)):
+            return (e.args[0], str(e.args[1]))
+
+        return (0, str(e))
+
+    def is_lost(self, e: Exception) -> bool:
+        """Whether `e` says the connection is gone, rather than the statement failed"""
+        return self.error_args(e)[0] in CONNECTION_LOST
+
+
+class PyMySQLDriver(Driver):
+    name = "pymysql"
+    module = "pymysql"
+
+    def connect(self, params: Dict[str, Any]) -> Any:
+        return self.lib.connect(**params)
+
+    def ping(self, conn: Any) -> Any:
+        conn.ping(reconnect=True)
+        return conn
+
+    def stream_cursor(self, conn: Any) -> Any:
+        return conn.cursor(self.lib.cursors.SSCursor)
+
+
+class MySQLdbDriver(Driver):
+    """mysqlclient, C implementation of the protocol decoding."""
+
+    name = "mysqldb"
+    module = "MySQLdb"
+
+    def __init__(self) -> None:
+        super(MySQLdbDriver, self).__init__()
+        importlib.import_module("MySQLdb.cursors")
+
+    def connect(self, params: Dict[str, Any]) -> Any:
+        return self.lib.connect(
+            host=params["host"], port=params["port"], user=params["user"],
+            passwd=params["password"], charset=params["charset"]
+        )
+
+    def ping(self, conn: Any) -> Any:
+        # `ping(True)` reconnect is deprecated in mysqlclient, reconnect by hand
+        try:
+            conn.ping()
+            return conn
+
+        except self.lib.OperationalError:
+            return None
+
+    def stream_cursor(self, conn: Any) -> Any:
+        return conn.cursor(self.lib.cursors.SSCursor)
+
+
+class MySQLConnectorDriver(Driver):
+    """mysql-connector-python with its C extension."""
+
+    name = "mysqlconnector"
+    module = "mysql.connector"
+
+    @classmethod
+    def available(cls) -> bool:
+        if (not super().available()):
+            return False
+
+        # The pure python flavour is no faster than pymysql
+        return bool(getattr(importlib.import_module(cls.module), "HAVE_CEXT", False))
+
+    def connect(self, params: Dict[str, Any]) -> Any:
+        return self.lib.connect(
+            host=params["host"], port=params["port"], user=params["user"],
+            password=params["password"], charset=params["charset"], use_pure=False
+        )
+
+    def set_autocommit(self, conn: Any, flag: bool) -> None:
+        conn.autocommit = flag
+
+    def select_db(self, conn: Any, database_name: str) -> None:
+        conn.database = database_name
+
+    def is_open(self, conn: Any) -> bool:
+        # `is_connected()` pings the server, once per statement, look at the local handle instead
+        cmysql = getattr(conn, "_cmysql", None)
+        if (cmysql is not None):
+            return bool(cmysql.connected())
+
+        return getattr(conn, "_socket", None) is not None
+
+    def ping(self, conn: Any) -> Any:
+        conn.ping(reconnect=True)
+        return conn
+
+    def stream_cursor(self, conn: Any) -> Any:
+        return conn.cursor(buffered=False)
+
+    def thread_id(self, conn: Any) -> int:
+        return conn.connection_id
+
+    @staticmethod
+    def error_args(e: Exception) -> Tuple[int, str]:
+        if (hasattr(e, "errno")):
+            return (e.errno or 0, str(getattr(e, "msg", e)))
+
+        return Driver.error_args(e)
+
+
+# Fastest first, `auto` takes the first installed one
+DRIVERS: List[Type[Driver]] = [MySQLdbDriver, MySQLConnectorDriver, PyMySQLDriver]
+
+
+def available_drivers() -> List[str]:
+    return [driver.name for driver in DRIVERS if driver.available()]
+
+
+def load_driver(name: str = "auto") -> Driver:
+    if (name == "auto"):
+        for driver in DRIVERS:
+            if (driver.available()):
+                return driver()
+
+        raise ImportError("No MySQL driver installed, install one of `mysqlclient`, `mysql-connector-python`, `pymysql`.")
+
+    for driver in DRIVERS:
+        if (driver.name == name):
+            return driver()
+
+    raise ValueError(f"Unknown MySQL driver: {name}, expected one of {[driver.name for driver in DRIVERS]}")
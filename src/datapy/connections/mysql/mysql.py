@@ -7,16 +7,19 @@
 '''
 
 
-import pymysql
 import threading
+import time
 import warnings
 
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Sequence, SupportsInt, Tuple, Union
 
+from .drivers import load_driver
+from ..deadline import Deadline, QueryTimeout
+from ..rowhash import NULL_TOKEN, SEPARATOR
 from .common import \
     IDBCommon, DBWarnings, RetIndices, \
-    covert_to_sql_type, check_database_selected, check_data_field_type, \
+    covert_to_sql_type, check_database_selected, check_data_field_type, check_rows_field_type, \
     check_database_exists, check_table_exists
 
 
@@ -28,25 +31,63 @@ class SQL_FORMATS(Enum):
     CHECK_TABLE_EXISTS = "SELECT TABLE_NAME FROM information_schema.`TABLES` \
                         WHERE TABLE_NAME = '{table_name}' AND TABLE_SCHEMA = '{database_name}'",
 
+    LIST_DATABASES = "SELECT schema_name FROM information_schema.schemata \
+                     WHERE schema_name NOT IN ('information_schema', 'performance_schema')",
+    LIST_TABLES = "SELECT table_name FROM information_schema.tables WHERE table_schema = %s",
+    TABLE_STATS = "SELECT table_rows, avg_row_length FROM information_schema.tables \
+                  WHERE table_schema = %s AND table_name = %s",
+    TABLE_VERSION = "SELECT update_time, table_rows, data_length FROM information_schema.tables \
+                    WHERE table_schema = %s AND table_name = %s",
+    # MySQL 8 caches the table statistics for a day by default
+    STATS_EXPIRY = "SET SESSION information_schema_stats_expiry = 0",
+
     CREATE_TABLE = "CREATE TABLE IF NOT EXISTS `{table_name}` ({columns})",
     DROP_TABLE = "DROP TABLE IF EXISTS `{table_name}`",
 
     INSERT = "INSERT INTO `{table_name}` ({columns}) VALUES ({values})",
+    INSERT_MANY = "INSERT INTO `{table_name}` ({columns}) VALUES {values}",
+    UPSERT_MANY = "INSERT INTO `{table_name}` ({columns}) VALUES {values} ON DUPLICATE KEY UPDATE {updates}",
     DELETE = "DELETE FROM `{table_name}` {condition}",
+    DELETE_MANY = "DELETE FROM `{table_name}` WHERE {keys} IN ({values})",
     UPDATE = "UPDATE `{table_name}` SET {sets} {condition}",
-    SELECT = "SELECT * FROM `{table_name}` {condition}"
+    SELECT = "SELECT * FROM `{table_name}` {condition}",
+
+    # MySQL 8.0.22+ / older servers and MariaDB
+    REPLICA_STATUS = "SHOW REPLICA STATUS",
+    SLAVE_STATUS = "SHOW SLAVE STATUS",
+
+    ROW_HASHES = "SELECT {keys}, MD5(CONCAT_WS(%s, {texts})) FROM `{table_name}`",
+    SAMPLE_PREDICATE = "CRC32(CONCAT_WS(%s, %s, {texts})) < %s",
+    PRIMARY_KEY = "SELECT column_name FROM information_schema.key_column_usage \
+                  WHERE table_schema = %s AND table_name = %s AND constraint_name = 'PRIMARY' ORDER BY ordinal_position",
+
+    # Whole schemata at once, the catalog never asks table by table
+    CATALOG_TABLES = "SELECT table_name, table_rows, avg_row_length, data_length, index_length, create_time, update_time \
+                     FROM information_schema.tables WHERE table_schema = %s",
+    CATALOG_COLUMNS = "SELECT table_name, column_name, data_type, column_type, is_nullable, column_default, column_key \
+                      FROM information_schema.columns WHERE table_schema = %s AND table_name IN ({tables}) \
+                      ORDER BY table_name, ordinal_position",
+    CATALOG_INDEXES = "SELECT table_name, index_name, non_unique, column_name, cardinality \
+                      FROM information_schema.statistics WHERE table_schema = %s AND table_name IN ({tables}) \
+                      ORDER BY table_name, index_name, seq_in_index",
 
 
 class MySQL(IDBCommon):
+    # Rows per multi-row INSERT, keeps a statement well below `max_allowed_packet`
+    MULTI_ROW_LIMIT = 1000
+
     def __init__(self,
                  host: str,
                  port: int,
                  user: str,
-                 password: str
+                 password: str,
+                 driver: str = "auto"
                  ) -> None:
 
         super(MySQL, self).__init__()
 
+        self.driver = load_driver(driver)
+
         self.conn_params = {
             'host': host,
             'port': port,
@@ -55,11 +96,13 @@ class MySQL(IDBCommon):
             'charset': 'utf8mb4'
         }
 
-        self.db = pymysql.connect(**self.conn_params)
-        self.db.autocommit(True)
+        self.db = self.driver.connect(self.conn_params)
+        self.driver.set_autocommit(self.db, True)
         self.cursor = self.db.cursor()
 
         self.lock_exec = threading.RLock()
+        # A statement inside `transaction()` is never run again on a fresh connection
+        self._in_transaction = False
 
         self._register_database_exists_func(self.__is_database_exists)
         self._register_table_exists_func(self.__is_table_exists)
@@ -86,13 +129,32 @@ class MySQL(IDBCommon):
         return False
 
     def reconnect(self) -> None:
-        self.db = pymysql.connect(**self.conn_params)
-        self.db.autocommit(True)
+        self.db = self.driver.connect(self.conn_params)
+        self.driver.set_autocommit(self.db, True)
         self.cursor = self.db.cursor()
 
         if (self._curr_database_name is not None):
             self.switch_database(self._curr_database_name)
 
+    def __ensure_connected(self) -> None:
+        if (self.driver.is_open(self.db)):
+            return
+
+        db = self.driver.ping(self.db)
+        if (db is None):
+            self.reconnect()
+            return
+
+        self.db = db
+        self.cursor = self.db.cursor()
+        if (self._curr_database_name is not None):
+            self.switch_database(self._curr_database_name)
+
+    def __is_lost(self, e: Exception, fired: threading.Event) -> bool:
+        # `is_open` only sees the local socket, a connection the server dropped while idle
+        # fails on its first statement, which runs once more on a fresh connection
+        return self.driver.is_lost(e) and not self._in_transaction and not fired.is_set()
+
     @check_database_exists
     def create_database(self, database_name: str) -> bool:
         sql = SQL_FORMATS.CREATE_DATABASE.value[0].format(
@@ -103,7 +165,7 @@ class MySQL(IDBCommon):
 
     @check_database_exists
     def switch_database(self, database_name: str) -> bool:
-        self.db.select_db(database_name)
+        self.driver.select_db(self.db, database_name)
 
         if (self.cursor):
             self.cursor.close()
@@ -133,6 +195,23 @@ class MySQL(IDBCommon):
             type_str = covert_to_sql_type(value)
             columns.append(f"{name} {type_str}")
 
+        return self.__create_table(table_name, columns)
+
+    @check_database_selected
+    @check_table_exists
+    def create_table_with_types(self,
+                                table_name: str,
+                                column_types: List[Tuple[str, str]],
+                                primary_key: Sequence[str] = ()) -> bool:
+
+        columns = [f"`{name}` {type_str}" for name, type_str in column_types]
+
+        if (len(primary_key) != 0):
+            columns.append("PRIMARY KEY (" + ",".join(f"`{name}`" for name in primary_key) + ")")
+
+        return self.__create_table(table_name, columns)
+
+    def __create_table(self, table_name: str, columns: List[str]) -> bool:
         sql = SQL_FORMATS.CREATE_TABLE.value[0].format(
             table_name=table_name,
             columns=str(",".join(columns))
@@ -183,6 +262,133 @@ class MySQL(IDBCommon):
 
         return exec_ret[RetIndices.STATUS]
 
+    def __insert_rows(self,
+                      sql_format: SQL_FORMATS,
+                      table_name: str,
+                      rows: Sequence[Dict[str, Any]],
+                      **kwargs) -> bool:
+
+        if (len(rows) == 0):
+            return True
+
+        columns = list(rows[0].keys())
+        if (any(row.keys() != rows[0].keys() for row in rows)):
+            raise ValueError("All rows of a multi-row insert must share the same columns")
+
+        holders = "(" + ",".join(["%s" for _ in range(len(columns))]) + ")"
+        per_statement = self.MULTI_ROW_LIMIT
+
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+
+            sql = sql_format.value[0].format(
+                table_name=table_name,
+                columns=",".join(columns),
+                values=",".join([holders] * len(chunk)),
+                **kwargs
+            )
+
+            exec_ret = self.execute(sql, tuple(value for row in chunk for value in row.values()))
+
+            if (not exec_ret[RetIndices.STATUS]):
+                if (exec_ret[RetIndices.ERROR_CODE] in [1366, 1265]):
+                    # Mismatched data type, see `insert`
+                    warnings.warn(DBWarnings.TypeMismatchedWarning(exec_ret[RetIndices.ERROR_MSG]))
+
+                return False
+
+        return True
+
+    @check_database_selected
+    @check_table_exists
+    @check_rows_field_type
+    def insert_many(self,
+                    table_name: str,
+                    rows: Sequence[Dict[str, Any]]) -> bool:
+
+        return self.__insert_rows(SQL_FORMATS.INSERT_MANY, table_name, rows)
+
+    @check_database_selected
+    @check_table_exists
+    @check_rows_field_type
+    def upsert_many(self,
+                    table_name: str,
+                    rows: Sequence[Dict[str, Any]],
+                    key_columns: Sequence[str]) -> bool:
+
+        if (len(rows) == 0):
+            return True
+
+        # Key-only rows have nothing to update, `key=key` keeps the statement valid
+        updates = [column for column in rows[0].keys() if column not in key_columns] or [key_columns[0]]
+
+        return self.__insert_rows(
+            SQL_FORMATS.UPSERT_MANY, table_name, rows,
+            updates=",".join(f"`{column}`=VALUES(`{column}`)" for column in updates)
+        )
+
+    @check_database_selected
+    @check_table_exists
+    def delete_many(self,
+                    table_name: str,
+                    key_columns: Sequence[str],
+                    keys: Sequence[Tuple]) -> bool:
+
+        holder = "(" + ",".join(["%s" for _ in range(len(key_columns))]) + ")"
+        per_statement = self.MULTI_ROW_LIMIT
+
+        for start in range(0, len(keys), per_statement):
+            chunk = keys[start:start + per_statement]
+
+            sql = SQL_FORMATS.DELETE_MANY.value[0].format(
+                table_name=table_name,
+                keys="(" + ",".join(f"`{column}`" for column in key_columns) + ")",
+                values=",".join([holder] * len(chunk))
+            )
+
+            if (not self.execute(sql, tuple(value for key in chunk for value in key))[RetIndices.STATUS]):
+                return False
+
+        return True
+
+    @check_database_selected
+    @check_table_exists
+    def row_hashes(self,
+                   table_name: str,
+                   key_columns: Sequence[str],
+                   columns: Sequence[str]) -> List[Tuple]:
+
+        sql = SQL_FORMATS.ROW_HASHES.value[0].format(
+            table_name=table_name,
+            keys=",".join(f"`{column}`" for column in key_columns),
+            texts=",".join(f"COALESCE(CAST(`{column}` AS CHAR), %s)" for column in columns)
+        )
+
+        exec_ret = self.execute(sql, (SEPARATOR, ) + (NULL_TOKEN, ) * len(columns))
+
+        if (not exec_ret[RetIndices.STATUS]):
+            raise ValueError(f"CODE: {exec_ret[RetIndices.ERROR_CODE]} | MSG: {exec_ret[RetIndices.ERROR_MSG]}")
+
+        return list(exec_ret[RetIndices.RESULT])
+
+    @check_database_selected
+    def primary_key(self, table_name: str) -> List[str]:
+        results = self.execute(SQL_FORMATS.PRIMARY_KEY.value[0], (self._curr_database_name, table_name))
+
+        if (not results[RetIndices.STATUS]):
+            raise ValueError(f"CODE: {results[RetIndices.ERROR_CODE]} | MSG: {results[RetIndices.ERROR_MSG]}")
+
+        return [row[0] for row in results[RetIndices.RESULT]]
+
+    def sample_predicate(self, key_columns: Sequence[str], seed: int, threshold: int) -> Tuple[str, Tuple]:
+        """Rows whose seeded CRC32 of the key is below `threshold` (of 2^32), the same rows for the same seed"""
+
+        sql = SQL_FORMATS.SAMPLE_PREDICATE.value[0].format(
+            texts=",".join(f"COALESCE(CAST(`{column}` AS CHAR), %s)" for column in key_columns)
+        )
+
+        return sql, (SEPARATOR, str(seed)) + (NULL_TOKEN, ) * len(key_columns) + (threshold, )
+
     @check_database_selected
     @check_table_exists
     def delete(self,
@@ -231,28 +437,332 @@ class MySQL(IDBCommon):
 
         return self.execute(sql)[RetIndices.STATUS]
 
-    def execute(self, sql: str, data: Tuple = ()) -> Tuple:
-        with self.lock_exec:
+    def execute(self, sql: str, data: Tuple = (), timeout: Union[None, float, Deadline] = None) -> Tuple:
+        """Run one statement on the buffered cursor. Past `timeout` (seconds or a `Deadline`) the statement
+        is killed by `KILL QUERY` and `QueryTimeout` is raised, a statement done in time keeps its result.
+        """
+        deadline = Deadline.of(timeout)
+        start = time.perf_counter()
+
+        with self._acquire(deadline):
+            acquired = time.perf_counter()
+
             status = False
             err_code = 0
             err_msg = None
 
-            # Ensure connect
-            if (not self.db.open):
-                self.db.ping(reconnect=True)
-                self.switch_database(self._curr_database_name)
+            self.__ensure_connected()
+
+            with self._watchdog(deadline) as fired:
+                try:
+                    try:
+                        self.cursor.execute(sql, data)
+
+                    except Exception as e:
+                        if (not self.__is_lost(e, fired)):
+                            raise
+
+                        self.reconnect()
+                        self.cursor.execute(sql, data)
+
+                    status = True
+
+                except Exception as e:
+                    self.db.rollback()
+                    err_code, err_msg = self.driver.error_args(e)
+
+            if (not status and deadline is not None and (fired.is_set() or deadline.expired)):
+                # Killed, or stopped by the server at MAX_EXECUTION_TIME
+                raise QueryTimeout(f"{deadline.describe()}: {err_msg}")
+
+            executed = time.perf_counter()
+
+            column_name = list(zip(*self.cursor.description))[0] if (self.cursor.description is not None) else None
+            results = self.cursor.fetchall() if (self.cursor.description is not None) else ()
+
+            fetched = time.perf_counter()
+
+            if (self._execute_hook is not None):
+                self._execute_hook({
+                    "wait": acquired - start,
+                    "execute": executed - acquired,
+                    "fetch": fetched - executed
+                }, len(results))
+
+            if (status and self._slow_query_func is not None and fetched - acquired >= self._slow_query_threshold):
+                self.__report_slow_query(sql, data, fetched - acquired, len(results))
+
+            return (status, err_code, column_name, results, err_msg)
+
+    def execute_stream(self,
+                       sql: str,
+                       data: Tuple = (),
+                       batch_size: SupportsInt = 10000,
+                       timeout: Union[None, float, Deadline] = None
+                       ) -> Iterator[Tuple[Tuple, List]]:
+        """Execute on an unbuffered server-side cursor and yield `(description, rows)` batches,
+        `description` is the DB-API `cursor.description`.
+
+        `lock_exec` is held until the generator is exhausted or closed, so consume it promptly.
+        Closing it early, or passing `timeout`, kills the statement instead of draining the rest of the result.
+        """
+        deadline = Deadline.of(timeout)
+        start = time.perf_counter()
+
+        with self._acquire(deadline), self._watchdog(deadline) as fired:
+            acquired = time.perf_counter()
+
+            self.__ensure_connected()
+
+            cursor = self.driver.stream_cursor(self.db)
+            fetched = 0
+            rows_total = 0
+            streaming = False
 
             try:
-                self.cursor.execute(sql, data)
-                status = True
+                try:
+                    cursor.execute(sql, data)
+
+                except Exception as e:
+                    if (not self.__is_lost(e, fired)):
+                        self.db.rollback()
+                        raise
+
+                    self.reconnect()
+                    cursor = self.driver.stream_cursor(self.db)
+                    cursor.execute(sql, data)
+
+                executed = time.perf_counter()
+                streaming = True
+
+                description = self.driver.description(cursor)
+
+                while True:
+                    if (deadline is not None):
+                        deadline.check()
+
+                    batch_start = time.perf_counter()
+                    rows = cursor.fetchmany(int(batch_size))
+                    fetched += time.perf_counter() - batch_start
+
+                    if (not rows):
+                        break
+
+                    rows_total += len(rows)
+                    yield (description, rows)
+
+                streaming = False
+
+                if (self._execute_hook is not None):
+                    self._execute_hook({
+                        "wait": acquired - start,
+                        "execute": executed - acquired,
+                        "fetch": fetched
+                    }, rows_total)
+
+                duration = executed - acquired + fetched
+                if (self._slow_query_func is not None and duration >= self._slow_query_threshold):
+                    # The unbuffered result is fully read, the connection is free for EXPLAIN again
+                    cursor.close()
+                    self.__report_slow_query(sql, data, duration, rows_total)
+
+            except QueryTimeout:
+                raise
 
             except Exception as e:
-                self.db.rollback()
-                err_code, err_msg = e.args
+                if (deadline is not None and (fired.is_set() or deadline.expired)):
+                    raise QueryTimeout(f"{deadline.describe()}: {e}") from e
+                raise
 
-            column_name = list(zip(*self.cursor.description))[0] if (self.cursor.description is not None) else None
+            finally:
+                if (streaming and not fired.is_set()):
+                    # Abandoned mid-result, closing would drain all of the rest
+                    self.cancel()
+
+                try:
+                    cursor.close()
+
+                except Exception:
+                    # The interrupted result ends in an error packet
+                    if (not (streaming or fired.is_set())):
+                        raise
+
+    def list_databases(self) -> List[str]:
+        results = self.execute(SQL_FORMATS.LIST_DATABASES.value[0])
+        return [row[0] for row in results[RetIndices.RESULT]]
+
+    def list_tables(self, database_name: str) -> List[str]:
+        results = self.execute(SQL_FORMATS.LIST_TABLES.value[0], (database_name, ))
+        return [row[0] for row in results[RetIndices.RESULT]]
+
+    def table_stats(self, database_name: str) -> Dict[str, Dict[str, Any]]:
+        """Rows, sizes and times of every table of `database_name` in one query.
+        `version` changes with `UPDATE_TIME` (and `CREATE_TIME` on a rebuild), see `Catalog.refresh`.
+        """
+
+        # Fails on servers without the statistics cache, nothing to turn off there
+        self.execute(SQL_FORMATS.STATS_EXPIRY.value[0])
+
+        results = self.execute(SQL_FORMATS.CATALOG_TABLES.value[0], (database_name, ))
+        if (not results[RetIndices.STATUS]):
+            raise ValueError(f"CODE: {results[RetIndices.ERROR_CODE]} | MSG: {results[RetIndices.ERROR_MSG]}")
+
+        return {
+            table_name: {
+                "rows": table_rows,
+                "avg_row_length": avg_row_length,
+                "data_length": data_length,
+                "index_length": index_length,
+                "update_time": update_time,
+                "version": f"{create_time}|{update_time}"
+            }
+            for table_name, table_rows, avg_row_length, data_length, index_length, create_time, update_time
+            in results[RetIndices.RESULT]
+        }
+
+    def describe_tables(self, database_name: str, table_names: Sequence[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Columns and indexes of `table_names`, two queries whatever their number"""
+
+        tables: Dict[str, Dict[str, List[Dict[str, Any]]]] = {
+            table_name: {"columns": [], "indexes": []} for table_name in table_names
+        }
+        if (len(tables) == 0):
+            return tables
+
+        placeholders = ", ".join(["%s"] * len(tables))
+        data = (database_name, *tables)
+
+        columns = self.execute(SQL_FORMATS.CATALOG_COLUMNS.value[0].format(tables=placeholders), data)
+        indexes = self.execute(SQL_FORMATS.CATALOG_INDEXES.value[0].format(tables=placeholders), data)
+
+        for results in (columns, indexes):
+            if (not results[RetIndices.STATUS]):
+                raise ValueError(f"CODE: {results[RetIndices.ERROR_CODE]} | MSG: {results[RetIndices.ERROR_MSG]}")
 
-            return (status, err_code, column_name, self.cursor.fetchall(), err_msg)
+        for table_name, name, data_type, column_type, nullable, default, key in columns[RetIndices.RESULT]:
+            tables[table_name]["columns"].append({
+                "name": name,
+                "data_type": data_type,
+                "type": column_type,
+                "nullable": nullable == "YES",
+                "default": default,
+                "key": key
+            })
+
+        for table_name, index_name, non_unique, column_name, cardinality in indexes[RetIndices.RESULT]:
+            index_list = tables[table_name]["indexes"]
+
+            # Rows come ordered by index then position, a multi-column index spans several of them
+            if (not index_list or index_list[-1]["name"] != index_name):
+                index_list.append({"name": index_name, "unique": not non_unique, "columns": [], "cardinality": cardinality})
+
+            index_list[-1]["columns"].append(column_name)
+
+        return tables
+
+    def cancel(self) -> None:
+        """`KILL QUERY` the statement of this connection from a side connection, callable from any thread"""
+
+        thread_id = self.driver.thread_id(self.db)
+
+        conn = self.driver.connect(self.conn_params)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"KILL QUERY {int(thread_id)}")
+            cursor.close()
+
+        finally:
+            conn.close()
+
+    def replication_lag(self) -> Optional[float]:
+        """Seconds behind the source, 0 on a server that is not a replica, None when replication is stopped."""
+
+        results = self.execute(SQL_FORMATS.REPLICA_STATUS.value[0])
+        if (not results[RetIndices.STATUS]):
+            results = self.execute(SQL_FORMATS.SLAVE_STATUS.value[0])
+
+        if (not results[RetIndices.STATUS]):
+            raise ValueError(f"CODE: {results[RetIndices.ERROR_CODE]} | MSG: {results[RetIndices.ERROR_MSG]}")
+
+        if (len(results[RetIndices.RESULT]) == 0):
+            return 0.0
+
+        status = dict(zip(results[RetIndices.COLUMN_NAME], results[RetIndices.RESULT][0]))
+        lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+
+        return None if lag is None else float(lag)
+
+    @check_database_selected
+    def table_version(self, table_name: str) -> Optional[str]:
+        """Last `UPDATE_TIME` and size of the table, None when the server does not track it (e.g. since a restart)."""
+
+        # Fails on servers without the statistics cache, nothing to turn off there
+        self.execute(SQL_FORMATS.STATS_EXPIRY.value[0])
+
+        results = self.execute(SQL_FORMATS.TABLE_VERSION.value[0], (self._curr_database_name, table_name))
+        if (not results[RetIndices.STATUS] or len(results[RetIndices.RESULT]) == 0):
+            return None
+
+        update_time, table_rows, data_length = results[RetIndices.RESULT][0]
+        if (update_time is None):
+            return None
+
+        return f"{update_time}|{table_rows}|{data_length}"
+
+    @check_database_selected
+    def estimate(self, table_name: str, sql: str, data: Tuple = ()) -> Tuple[int, int]:
+        """Rows from `EXPLAIN`, bounded by `information_schema.tables`, and the average row length."""
+
+        stats = self.execute(SQL_FORMATS.TABLE_STATS.value[0], (self._curr_database_name, table_name))
+
+        table_rows, avg_row_length = 0, 0
+        if (stats[RetIndices.STATUS] and len(stats[RetIndices.RESULT]) != 0):
+            table_rows, avg_row_length = (int(value or 0) for value in stats[RetIndices.RESULT][0])
+
+        rows = table_rows
+
+        explain = self.execute(f"EXPLAIN {sql}", data)
+        if (explain[RetIndices.STATUS] and len(explain[RetIndices.RESULT]) != 0):
+            columns = [column.lower() for column in explain[RetIndices.COLUMN_NAME]]
+            plan = dict(zip(columns, explain[RetIndices.RESULT][0]))
+
+            if (plan.get("rows") is not None):
+                rows = int(int(plan["rows"]) * float(plan.get("filtered") or 100) / 100)
+
+                # InnoDB statistics are approximate, never trust a plan beyond the table size
+                if (table_rows):
+                    rows = min(rows, table_rows)
+
+        return (rows, avg_row_length)
+
+    def __report_slow_query(self, sql: str, data: Tuple, duration: float, rows: int) -> None:
+        explain = None
+
+        # Only plannable statements, never re-run DDL or writes to explain them
+        if (sql.lstrip()[:6].upper() == "SELECT"):
+            cursor = self.db.cursor()
+            try:
+                cursor.execute(f"EXPLAIN FORMAT=JSON {sql}", data)
+                row = cursor.fetchone()
+                explain = row[0] if row else None
+
+            except Exception as e:
+                explain = f"EXPLAIN failed: {e}"
+
+            finally:
+                cursor.close()
+
+        try:
+            self._slow_query_func({
+                "database": self._curr_database_name,
+                "sql": sql,
+                "duration": duration,
+                "rows": rows,
+                "explain": explain
+            })
+
+        except Exception as e:      # pragma: no cover
+            warnings.warn(f"Slow query log failed: {e}")
 
     def transaction(self):
         class TransactionManager():
@@ -261,7 +771,8 @@ class MySQL(IDBCommon):
 
             def __enter__(self) -> 'MySQL':
                 self.outer.lock_exec.acquire()
-                self.outer.db.autocommit(False)
+                self.outer.driver.set_autocommit(self.outer.db, False)
+                self.outer._in_transaction = True
 
                 return self.outer
 
@@ -269,8 +780,15 @@ class MySQL(IDBCommon):
                 try:
                     if exc_type is None:
                         self.outer.db.commit()
-                        self.outer.db.autocommit(True)
+                    else:
+                        self.outer.db.rollback()
                 finally:
-                    self.outer.lock_exec.release()
+                    self.outer._in_transaction = False
+
+                    # Never leave the shared connection out of autocommit
+                    try:
+                        self.outer.driver.set_autocommit(self.outer.db, True)
+                    finally:
+                        self.outer.lock_exec.release()
 
         return TransactionManager(self)
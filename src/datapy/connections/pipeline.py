@@ -0,0 +1,187 @@
+'''
+@File    :   pipeline.py
+@Time    :   2025/06/14 19:26:03
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Overlap fetching rows with building the DataFrame
+'''
+
+
+import queue
+import threading
+import time
+
+import pandas as pd
+
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from .deadline import Deadline
+from .mysql.common import IDBCommon, RetIndices
+from .. import instrument
+
+
+_DONE = object()
+
+
+class AdaptiveBatchSize():
+    """`fetchmany` size steering every batch towards `target` seconds.
+
+    Starts small so the converter gets its first batch early, then doubles (or halves)
+    within `[minimum, maximum]` as the measured rows per second allow.
+    Backends read it by `int(batch_size)`.
+    """
+    def __init__(self,
+                 initial: int = 1000,
+                 minimum: int = 500,
+                 maximum: int = 50000,
+                 target: float = 0.05
+                 ):
+
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.target = target
+        self.size = min(max(initial, minimum), self.maximum)
+
+    def __int__(self) -> int:
+        return self.size
+
+    def observe(self, rows: int, seconds: float) -> None:
+        if (rows < self.size):
+            # A short batch is the end of the result, it says nothing about the rate
+            return
+
+        if (seconds < self.target / 2):
+            self.size = min(self.size * 2, self.maximum)
+        elif (seconds > self.target * 2):
+            self.size = max(self.size // 2, self.minimum)
+
+
+def unify_dtypes(df: pd.DataFrame, frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    # A batch without a single value of a column infers another dtype than the others (e.g. object
+    # for all None next to int64), infer those columns again over all rows, like one DataFrame would
+    for column in df.columns:
+        if (len({str(frame[column].dtype) for frame in frames}) > 1):
+            df[column] = pd.Series(df[column].tolist(), index=df.index, dtype=None)
+
+    return df
+
+
+class FetchPipeline():
+    """Read `(description, rows)` batches on a reader thread while the calling thread turns
+    the previous ones into DataFrames, then concatenate them.
+
+    At most `depth` fetched batches wait for the converter, the reader blocks beyond that.
+    The reader runs under the span of the caller, so its `wait`/`execute`/`fetch` still count.
+    A caller already holding `lock_exec` (e.g. inside `transaction()`) fetches on its own thread,
+    a reader would wait for that lock forever.
+    """
+    def __init__(self,
+                 db: IDBCommon,
+                 convert: Callable[[Sequence[Tuple], Sequence[str]], pd.DataFrame],
+                 batch_size: Optional[AdaptiveBatchSize] = None,
+                 depth: int = 4,
+                 deadline: Optional[Deadline] = None
+                 ):
+
+        self.db = db
+        self.convert = convert
+        self.batch_size = batch_size if batch_size is not None else AdaptiveBatchSize()
+        self.deadline = deadline
+
+        self.__queue: queue.Queue = queue.Queue(maxsize=depth)
+        self.__stop = threading.Event()
+
+    def __batches(self, sql: str, data: Tuple) -> Iterator[Tuple]:
+        stream = self.db.execute_stream(sql, data, batch_size=self.batch_size, timeout=self.deadline)
+
+        try:
+            while (not self.__stop.is_set()):
+                start = time.perf_counter()
+                batch = next(stream, None)
+
+                if (batch is None):
+                    break
+
+                self.batch_size.observe(len(batch[1]), time.perf_counter() - start)
+                yield batch
+
+        finally:
+            # Releases `lock_exec` of the backend, also when the converter stopped early
+            stream.close()
+
+    def __put(self, item: Any) -> bool:
+        # Never block forever on a converter that gave up
+        while (not self.__stop.is_set()):
+            try:
+                self.__queue.put(item, timeout=0.1)
+                return True
+
+            except queue.Full:
+                continue
+
+        return False
+
+    def __read(self, sql: str, data: Tuple, span: Optional[instrument.Span]) -> None:
+        with instrument.attach(span):
+            try:
+                for batch in self.__batches(sql, data):
+                    if (not self.__put(batch)):
+                        break
+
+                self.__put(_DONE)
+
+            except BaseException as e:
+                self.__put(e)
+
+    def __threaded(self, sql: str, data: Tuple) -> Iterator[Tuple]:
+        reader = threading.Thread(
+            target=self.__read, args=(sql, data, instrument.current_span()), name="datapy-fetch", daemon=True
+        )
+        reader.start()
+
+        try:
+            while True:
+                try:
+                    item = self.__queue.get(timeout=0.1)
+
+                except queue.Empty:
+                    if (not reader.is_alive() and self.__queue.empty()):
+                        raise RuntimeError("The fetch thread stopped without a result")
+                    continue
+
+                if (item is _DONE):
+                    break
+
+                if (isinstance(item, BaseException)):
+                    raise item
+
+                yield item
+
+        finally:
+            self.__stop.set()
+            reader.join()
+
+    def run(self, sql: str, data: Tuple = ()) -> pd.DataFrame:
+        if (self.db._holds_lock()):
+            batches = self.__batches(sql, data)
+        else:
+            batches = self.__threaded(sql, data)
+
+        frames: List[pd.DataFrame] = []
+
+        try:
+            for description, rows in batches:
+                frames.append(self.convert(rows, [column[0] for column in description]))
+
+        finally:
+            batches.close()
+
+        if (len(frames) == 0):
+            # An empty result yields no batch, and so no description
+            results = self.db.execute(f"SELECT * FROM ({sql}) AS empty_result LIMIT 0", data, timeout=self.deadline)
+            return self.convert([], results[RetIndices.COLUMN_NAME] or [])
+
+        if (len(frames) == 1):
+            return frames[0]
+
+        return unify_dtypes(pd.concat(frames, ignore_index=True), frames)
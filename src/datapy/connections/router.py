@@ -0,0 +1,181 @@
+'''
+@File    :   router.py
+@Time    :   2025/06/03 20:17:52
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Route reads across replicas by observed latency
+'''
+
+
+import logging
+import random
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .deadline import QueryTimeout
+from .mysql.common import IDBCommon
+
+
+class _Route():
+    def __init__(self, backend: IDBCommon, name: str) -> None:
+        self.backend = backend
+        self.name = name
+
+        self.latency: Optional[float] = None    # EWMA server seconds of the statements executed
+        self.reads = 0
+        self.errors = 0
+
+        self.lag: Optional[float] = None
+        self.lag_checked = float("-inf")
+        self.down_until = float("-inf")
+
+
+class ReplicaRouter():
+    """Send every read to one of the replicas, picked at random with a weight of `1 / EWMA latency`.
+
+    The latency is the execute time of the statements (see `execute_hook`), the time spent waiting for
+    the connection, fetching large results or converting them does not make a replica look slow.
+    Replicas failing a read are skipped for `retry_after` seconds. With `max_lag` the replication lag
+    is checked at most every `lag_check_interval` seconds, outside of the lock, and lagging replicas are skipped.
+    Without a usable replica reads fall back to the primary.
+    """
+    def __init__(self,
+                 primary: IDBCommon,
+                 replicas: Sequence[IDBCommon] = (),
+                 names: Optional[Sequence[str]] = None,
+                 max_lag: Optional[float] = None,
+                 lag_check_interval: float = 5.0,
+                 decay: float = 0.2,
+                 retry_after: float = 30.0
+                 ):
+
+        self.primary = primary
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.decay = decay
+        self.retry_after = retry_after
+
+        names = names if names is not None else [f"replica-{i}" for i in range(len(replicas))]
+        self.routes = [_Route(backend, name) for backend, name in zip(replicas, names)]
+
+        self.lock = threading.Lock()
+
+    def __check_lags(self, now: float) -> None:
+        with self.lock:
+            due = [
+                route for route in self.routes
+                if now >= route.down_until and now - route.lag_checked >= self.lag_check_interval
+            ]
+
+            # Claimed, concurrent readers keep using the last lag instead of checking too
+            for route in due:
+                route.lag_checked = now
+
+        # A slow or hanging replica only holds up the reader checking it
+        for route in due:
+            try:
+                lag, failed = route.backend.replication_lag(), False
+
+            except Exception as e:
+                logging.warning(f"Replication lag check of `{route.name}` failed: {e}")
+                lag, failed = None, True
+
+            with self.lock:
+                route.lag = lag
+                if (failed):
+                    route.down_until = now + self.retry_after
+
+    def __usable(self, route: _Route, now: float) -> bool:
+        if (now < route.down_until):
+            return False
+
+        # None is a stopped or broken replication
+        return self.max_lag is None or (route.lag is not None and route.lag <= self.max_lag)
+
+    def reader(self) -> IDBCommon:
+        now = time.monotonic()
+
+        if (self.max_lag is not None):
+            self.__check_lags(now)
+
+        with self.lock:
+            routes = [route for route in self.routes if self.__usable(route, now)]
+
+            if (len(routes) == 0):
+                return self.primary
+
+            known = [route.latency for route in routes if route.latency is not None]
+            # Replicas without a read yet get the average weight, so they are tried soon
+            default = sum(known) / len(known) if known else 1.0
+
+            weights = [1.0 / max(route.latency if route.latency is not None else default, 1e-6) for route in routes]
+
+        return random.choices(routes, weights=weights)[0].backend
+
+    def observe(self, backend: IDBCommon, seconds: float, failed: bool = False) -> None:
+        with self.lock:
+            route = next((route for route in self.routes if route.backend is backend), None)
+            if (route is None):
+                # The primary is not routed
+                return
+
+            route.reads += 1
+
+            if (failed):
+                route.errors += 1
+                route.down_until = time.monotonic() + self.retry_after
+                return
+
+            route.latency = seconds if route.latency is None \
+                else self.decay * seconds + (1 - self.decay) * route.latency
+
+    def execute_hook(self,
+                     backend: IDBCommon,
+                     then: Optional[Callable[[Dict[str, float], int], None]] = None
+                     ) -> Callable[[Dict[str, float], int], None]:
+        """The execute hook to register into `backend`, records the execute phase of every statement
+        as its latency and passes the phases on to `then`.
+        """
+
+        def hook(phases: Dict[str, float], rows: int) -> None:
+            if ("execute" in phases):
+                self.observe(backend, phases["execute"])
+
+            if (then is not None):
+                then(phases, rows)
+
+        return hook
+
+    @contextmanager
+    def read(self) -> Iterator[IDBCommon]:
+        """Pick a reader and record the failure of what runs on it, the latency comes from `execute_hook`"""
+
+        backend = self.reader()
+        start = time.perf_counter()
+
+        try:
+            yield backend
+
+        except (ValueError, QueryTimeout):
+            # A statement error reported by the backend or a deadline of the caller, the replica itself is fine
+            raise
+
+        except Exception:
+            self.observe(backend, time.perf_counter() - start, failed=True)
+            raise
+
+    def status(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+
+        with self.lock:
+            return [{
+                "name": route.name,
+                "latency": route.latency,
+                "reads": route.reads,
+                "errors": route.errors,
+                "lag": route.lag,
+                "down": now < route.down_until
+            } for route in self.routes]
@@ -0,0 +1,67 @@
+'''
+@File    :   rowhash.py
+@Time    :   2025/05/29 21:12:08
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Row hash shared by the backends and the DataFrame side of `sync`
+'''
+
+
+import hashlib
+import zlib
+
+from datetime import date, datetime
+from typing import Any, Optional
+
+
+# Joins the column texts, the unit separator never shows up in real data
+SEPARATOR = "\x1f"
+# Stands for NULL, CONCAT_WS would silently skip it otherwise
+NULL_TOKEN = "\\N"
+
+HASH_COLUMN = "__row_hash__"
+
+
+def normalize(value: Any) -> Optional[str]:
+    """Text of a value as the server casts it (`CAST(value AS CHAR)`), None for NULL.
+
+    Values this does not reproduce exactly only cost an extra upsert, never a lost change.
+    """
+
+    # NaN and NaT are the only values unequal to themselves
+    if (value is None or value != value):
+        return None
+
+    if (isinstance(value, bool)):
+        return "1" if value else "0"
+
+    if (isinstance(value, float)):
+        if (value.is_integer() and abs(value) < 1e15):
+            return str(int(value))
+
+        return repr(value).replace("e+", "e")
+
+    if (isinstance(value, (bytes, bytearray))):
+        return bytes(value).decode("utf-8", "replace")
+
+    if (isinstance(value, datetime)):
+        return value.isoformat(sep=" ")
+
+    if (isinstance(value, date)):
+        return value.isoformat()
+
+    return str(value)
+
+
+def join_texts(*texts: Optional[str]) -> str:
+    return SEPARATOR.join(NULL_TOKEN if text is None else text for text in texts)
+
+
+def row_hash(*values: Any) -> str:
+    return hashlib.md5(join_texts(*map(normalize, values)).encode("utf-8")).hexdigest()
+
+
+def sample_hash(seed: Any, *values: Any) -> int:
+    """CRC32 of the seed and the key texts, what MySQL computes by `CRC32(CONCAT_WS(...))`"""
+
+    return zlib.crc32(join_texts(str(seed), *map(normalize, values)).encode("utf-8"))
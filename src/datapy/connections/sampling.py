@@ -0,0 +1,133 @@
+'''
+@File    :   sampling.py
+@Time    :   2025/06/18 20:15:39
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Server-side sampling predicates for exploratory fetches
+'''
+
+
+import math
+import random
+
+from typing import Any, Dict, Optional, Tuple
+
+from .mysql import RetIndices
+from .mysql.common import IDBCommon
+from ..query_builder import DataCondition, DataField, DataSelecter
+from ..query_builder.builder import OPLogicalNode, OPRawNode
+
+
+METHODS = ("auto", "hash", "range")
+
+# The hash predicate keeps rows whose 32 bit CRC is below `fraction * HASH_SPACE`
+HASH_SPACE = 2 ** 32
+# The key range is cut into this many blocks, a sample is a seeded pick of whole blocks
+RANGE_BLOCKS = 1000
+
+
+def hash_sample(db: IDBCommon, key_columns: Any, fraction: float, seed: int) -> Tuple[DataCondition, float]:
+    """Every row with an independent chance of `fraction`, the server still reads the whole (filtered) table"""
+
+    threshold = max(1, min(HASH_SPACE, round(fraction * HASH_SPACE)))
+
+    return OPRawNode(*db.sample_predicate(key_columns, seed, threshold)), threshold / HASH_SPACE
+
+
+def range_sample(low: int, high: int, key: str, fraction: float, seed: int) -> Tuple[DataCondition, float]:
+    """Random blocks of an integer key, read through the key index only.
+    Returns the share of the key range picked, the share of rows depends on how densely the keys are used.
+    """
+
+    span = high - low + 1
+    blocks = min(RANGE_BLOCKS, span)
+    size = math.ceil(span / blocks)
+    blocks = math.ceil(span / size)
+
+    picked = sorted(random.Random(seed).sample(range(blocks), max(1, min(blocks, round(fraction * blocks)))))
+
+    # Neighbouring blocks become one range
+    ranges = []
+    for block in picked:
+        start, end = low + block * size, min(high, low + (block + 1) * size - 1)
+
+        if (ranges and ranges[-1][1] + 1 == start):
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+
+    nodes = [DataField(key).between(start, end) for start, end in ranges]
+    condition = nodes[0] if len(nodes) == 1 else OPLogicalNode("OR", nodes)
+
+    return condition, sum(end - start + 1 for start, end in ranges) / span
+
+
+def key_range(db: IDBCommon,
+              table_name: str,
+              key: str,
+              condition: Optional[DataCondition] = None
+              ) -> Optional[Tuple[int, int]]:
+    """MIN and MAX of `key` over the rows matching `condition`"""
+
+    selecter = DataSelecter().select(f"MIN(`{key}`)", f"MAX(`{key}`)").from_table(table_name)
+
+    if (condition is not None):
+        selecter.where(condition)
+
+    results = db.execute(*selecter.build())
+
+    if (not results[RetIndices.STATUS] or len(results[RetIndices.RESULT]) == 0):
+        return None
+
+    low, high = results[RetIndices.RESULT][0]
+
+    # Only integer keys can be cut into blocks
+    if (not isinstance(low, int) or not isinstance(high, int) or isinstance(low, bool)):
+        return None
+
+    return low, high
+
+
+def sample_condition(db: IDBCommon,
+                     table_name: str,
+                     fraction: float,
+                     seed: Optional[int] = None,
+                     method: str = "auto",
+                     condition: Optional[DataCondition] = None
+                     ) -> Tuple[DataCondition, Dict[str, Any]]:
+    """Predicate keeping about `fraction` of the rows of `table_name` matching `condition`,
+    and its description (method, expected fraction of rows, seed).
+
+    `"hash"` keeps rows by a seeded hash of the primary key, spread evenly but scanning the table.
+    `"range"` picks random blocks of a single integer primary key between its MIN and MAX under `condition`,
+    reading only them through the index. The blocks are clustered by key and hold an unknown share of the rows,
+    its description has `"fraction": None` and the picked share of the key range as `"key_fraction"`.
+    `"auto"` is `"hash"`. The same seed always samples the same rows.
+    """
+
+    if (method not in METHODS):
+        raise ValueError(f"Unsupported sample method: {method}, expected one of {METHODS}")
+
+    if (not 0 < fraction <= 1):
+        raise ValueError(f"Sample fraction must be in (0, 1], got {fraction}")
+
+    seed = seed if seed is not None else random.randrange(2 ** 31)
+
+    key_columns = db.primary_key(table_name)
+    if (len(key_columns) == 0):
+        raise ValueError(f"Sampling `{table_name}` needs a primary key")
+
+    if (method != "range"):
+        predicate, effective = hash_sample(db, key_columns, fraction, seed)
+        return predicate, {"method": "hash", "fraction": effective, "seed": seed}
+
+    bounds = key_range(db, table_name, key_columns[0], condition) if (len(key_columns) == 1) else None
+
+    if (bounds is None):
+        raise ValueError(
+            f"Range sampling needs a single integer primary key and matching rows, `{table_name}` has {key_columns}"
+        )
+
+    predicate, key_fraction = range_sample(*bounds, key_columns[0], fraction, seed)
+
+    return predicate, {"method": "range", "fraction": None, "key_fraction": key_fraction, "seed": seed}
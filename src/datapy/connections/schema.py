@@ -0,0 +1,231 @@
+'''
+@File    :   schema.py
+@Time    :   2025/06/01 16:08:37
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Infer a table schema from a whole DataFrame
+'''
+
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import List, Tuple
+
+import pandas as pd
+
+from .mysql.common import RE_DATE, RE_DATETIME
+
+
+# (type, min, max), the first one holding the whole column range wins
+INTEGER_TYPES = (
+    ("TINYINT", -2 ** 7, 2 ** 7 - 1),
+    ("TINYINT UNSIGNED", 0, 2 ** 8 - 1),
+    ("SMALLINT", -2 ** 15, 2 ** 15 - 1),
+    ("SMALLINT UNSIGNED", 0, 2 ** 16 - 1),
+    ("MEDIUMINT", -2 ** 23, 2 ** 23 - 1),
+    ("MEDIUMINT UNSIGNED", 0, 2 ** 24 - 1),
+    ("INT", -2 ** 31, 2 ** 31 - 1),
+    ("INT UNSIGNED", 0, 2 ** 32 - 1),
+    ("BIGINT", -2 ** 63, 2 ** 63 - 1),
+    ("BIGINT UNSIGNED", 0, 2 ** 64 - 1)
+)
+
+# (type, max length), longer strings/bytes fall back to the last one
+TEXT_TYPES = (
+    ("VARCHAR", 16383),         # 65535 bytes per row / 4 bytes per utf8mb4 char
+    ("MEDIUMTEXT", 2 ** 24 - 1),
+    ("LONGTEXT", 2 ** 32 - 1)
+)
+BLOB_TYPES = (
+    ("BLOB", 2 ** 16 - 1),
+    ("MEDIUMBLOB", 2 ** 24 - 1),
+    ("LONGBLOB", 2 ** 32 - 1)
+)
+
+DECIMAL_MAX_PRECISION = 65
+DECIMAL_MAX_SCALE = 30
+
+# Type of a column without a single non-null value
+DEFAULT_TYPE = "VARCHAR(255)"
+
+# MySQL rejects a table whose columns may take more than this (error 1118), TEXT/BLOB only count their pointer
+MAX_ROW_BYTES = 65535
+# Bytes a row may take in the column of each type, per character for VARCHAR
+TYPE_BYTES = {
+    "TINYINT": 1, "SMALLINT": 2, "MEDIUMINT": 3, "INT": 4, "BIGINT": 8,
+    "BOOLEAN": 1, "DOUBLE": 8, "DATE": 3, "TIME": 3, "DATETIME": 5, "DATETIME(6)": 8,
+    "VARCHAR": 4, "DECIMAL": 30, "TEXT": 12, "BLOB": 12
+}
+
+
+def integer_type(low: int, high: int) -> str:
+    for type_str, type_min, type_max in INTEGER_TYPES:
+        if (type_min <= low and high <= type_max):
+            return type_str
+
+    return "DECIMAL(65,0)"
+
+
+def varchar_type(max_length: int) -> str:
+    if (max_length > TEXT_TYPES[0][1]):
+        return next((type_str for type_str, limit in TEXT_TYPES[1:] if max_length <= limit), TEXT_TYPES[-1][0])
+
+    # Round up to a power of two, the column survives slightly longer values later on
+    return f"VARCHAR({min(TEXT_TYPES[0][1], 1 << max(0, max_length - 1).bit_length())})"
+
+
+def decimal_type(values: pd.Series) -> str:
+    # NaN is a missing value, whatever the pandas version makes of it
+    values = values[~values.map(lambda value: value.is_nan())]
+
+    if (len(values) == 0):
+        return DEFAULT_TYPE
+
+    if (not values.map(lambda value: value.is_finite()).all()):
+        # No SQL numeric holds an infinity, stored as its text
+        return varchar_type(int(values.astype(str).str.len().max()))
+
+    exponents = values.map(lambda value: value.as_tuple().exponent)
+    digits = values.map(lambda value: len(value.as_tuple().digits))
+
+    scale = int(min(DECIMAL_MAX_SCALE, max(0, -exponents.min())))
+    integer_digits = int(max(1, (digits + exponents).max()))
+
+    return f"DECIMAL({min(DECIMAL_MAX_PRECISION, integer_digits + scale)},{scale})"
+
+
+def datetime_type(values: pd.Series) -> str:
+    if ((values.dt.normalize() == values).all()):
+        return "DATE"
+
+    if ((values.dt.microsecond != 0).any() or (values.dt.nanosecond != 0).any()):
+        return "DATETIME(6)"
+
+    return "DATETIME"
+
+
+def string_type(values: pd.Series) -> str:
+    lengths = values.str.len()
+    max_length = int(lengths.max())
+
+    # Python regex, the backreference in RE_DATETIME is not supported by Arrow
+    if (max_length <= 19 and lengths.min() >= 8):
+        texts = values.astype(object)
+
+        if (texts.str.match(RE_DATE.pattern).all()):
+            return "DATE"
+
+        if (texts.str.match(RE_DATETIME.pattern).all()):
+            return "DATETIME"
+
+    return varchar_type(max_length)
+
+
+def object_type(values: pd.Series) -> str:
+    kinds = set(values.map(type))
+
+    if (kinds <= {str}):
+        return string_type(values)
+
+    if (kinds <= {bool}):
+        return "BOOLEAN"
+
+    if (kinds <= {int}):
+        return integer_type(values.min(), values.max())
+
+    if (kinds <= {Decimal}):
+        return decimal_type(values)
+
+    if (kinds <= {bytes, bytearray}):
+        max_length = int(values.map(len).max())
+        return next((type_str for type_str, limit in BLOB_TYPES if max_length <= limit), BLOB_TYPES[-1][0])
+
+    if (all(issubclass(kind, datetime) for kind in kinds)):
+        return datetime_type(pd.to_datetime(values))
+
+    if (all(issubclass(kind, date) for kind in kinds)):
+        return "DATE"
+
+    if (kinds <= {time, timedelta}):
+        return "TIME"
+
+    # Mixed objects are stored as their text
+    return varchar_type(int(values.astype(str).str.len().max()))
+
+
+def infer_column_type(column: pd.Series) -> str:
+    """Tightest SQL type holding every non-null value of `column`"""
+
+    values = column.dropna()
+    dtype = values.dtype
+
+    if (len(values) == 0):
+        return DEFAULT_TYPE
+
+    if (pd.api.types.is_bool_dtype(dtype)):
+        return "BOOLEAN"
+
+    if (pd.api.types.is_integer_dtype(dtype)):
+        return integer_type(int(values.min()), int(values.max()))
+
+    if (pd.api.types.is_float_dtype(dtype)):
+        # Integers widened to float by missing values stay integers
+        if ((values % 1 == 0).all() and values.abs().max() < 2 ** 53):
+            return integer_type(int(values.min()), int(values.max()))
+
+        return "DOUBLE"
+
+    if (pd.api.types.is_datetime64_any_dtype(dtype)):
+        return datetime_type(values)
+
+    if (pd.api.types.is_timedelta64_dtype(dtype)):
+        return "TIME"
+
+    if (pd.api.types.is_string_dtype(dtype) and not pd.api.types.is_object_dtype(dtype)):
+        return string_type(values)
+
+    return object_type(values)
+
+
+def type_bytes(type_str: str) -> int:
+    """Bytes a row may take in a column of `type_str`, at most"""
+
+    name, _, size = type_str.partition("(")
+    name = name.replace(" UNSIGNED", "")
+
+    if (name == "VARCHAR"):
+        length = int(size.rstrip(")"))
+        # utf8mb4 plus the length prefix
+        return TYPE_BYTES["VARCHAR"] * length + (1 if length * TYPE_BYTES["VARCHAR"] < 256 else 2)
+
+    if (name.endswith("TEXT")):
+        return TYPE_BYTES["TEXT"]
+
+    if (name.endswith("BLOB")):
+        return TYPE_BYTES["BLOB"]
+
+    return TYPE_BYTES.get(type_str, TYPE_BYTES.get(name, 8))
+
+
+def fit_row(schema: List[Tuple[str, str]], max_row_bytes: int = MAX_ROW_BYTES) -> List[Tuple[str, str]]:
+    """Turn the widest VARCHAR columns into TEXT until a row fits into `max_row_bytes`"""
+
+    widths = [type_bytes(type_str) for _, type_str in schema]
+    schema = list(schema)
+
+    while (sum(widths) > max_row_bytes):
+        varchars = [i for i, (_, type_str) in enumerate(schema) if type_str.startswith("VARCHAR")]
+        if (not varchars):
+            break
+
+        widest = max(varchars, key=lambda i: widths[i])
+        schema[widest] = (schema[widest][0], "TEXT")
+        widths[widest] = TYPE_BYTES["TEXT"]
+
+    return schema
+
+
+def infer_schema(df: pd.DataFrame) -> List[Tuple[str, str]]:
+    """`(column, SQL type)` of every column of `df`, ready for `create_table_with_types`"""
+
+    return fit_row([(str(name), infer_column_type(df[name])) for name in df.columns])
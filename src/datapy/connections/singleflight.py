@@ -0,0 +1,102 @@
+'''
+@File    :   singleflight.py
+@Time    :   2025/05/08 20:41:16
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Coalesce concurrent identical calls into one
+'''
+
+
+import threading
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .deadline import Deadline, QueryTimeout
+
+
+class _Call():
+    def __init__(self) -> None:
+        self.done = False
+        self.condition = threading.Condition()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight():
+    """Only the first caller of a key runs the function, every caller arriving
+    while it is in flight waits for it and receives the same result.
+
+    Waiting is bounded by the waiter's own deadline, never by the leader's: a waiter whose deadline
+    passes raises its own `QueryTimeout`, and when the leader timed out the waiters run again
+    instead of receiving its error.
+    """
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__calls: Dict[Hashable, _Call] = {}
+
+    def __wait(self, call: _Call, deadline: Optional[Deadline]) -> None:
+        remove = deadline.on_cancel(lambda: self.__wake(call)) if deadline is not None else None
+
+        try:
+            with call.condition:
+                while (not call.done):
+                    if (deadline is not None):
+                        deadline.check()
+                        call.condition.wait(deadline.remaining())
+                    else:
+                        call.condition.wait()
+
+        finally:
+            if (remove is not None):
+                remove()
+
+    @staticmethod
+    def __wake(call: _Call) -> None:
+        with call.condition:
+            call.condition.notify_all()
+
+    def do(self, key: Hashable, func: Callable[[], Any], deadline: Optional[Deadline] = None) -> Tuple[Any, bool]:
+        """Returns `(result, shared)`, `shared` is True for the callers that did not run `func`."""
+
+        while True:
+            with self.__lock:
+                call = self.__calls.get(key)
+
+                if (call is not None):
+                    call.waiters += 1
+                    leader = False
+                else:
+                    call = self.__calls[key] = _Call()
+                    leader = True
+
+            if (leader):
+                break
+
+            self.__wait(call, deadline)
+
+            if (isinstance(call.error, QueryTimeout)):
+                # The leader's deadline, not ours, run it again
+                continue
+
+            if (call.error is not None):
+                raise call.error
+
+            return (call.result, True)
+
+        try:
+            call.result = func()
+
+        except BaseException as e:
+            call.error = e
+            raise
+
+        finally:
+            with self.__lock:
+                self.__calls.pop(key, None)
+
+            with call.condition:
+                call.done = True
+                call.condition.notify_all()
+
+        return (call.result, call.waiters > 0)
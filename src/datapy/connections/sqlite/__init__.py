@@ -0,0 +1,5 @@
+from .sqlite import SQLite
+
+__all__ = [
+    SQLite
+]
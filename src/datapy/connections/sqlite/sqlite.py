@@ -0,0 +1,714 @@
+'''
+@File    :   sqlite.py
+@Time    :   2025/05/18 15:26:44
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   SQLite interface implementation
+'''
+
+
+import glob
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Sequence, SupportsInt, Tuple, Union
+
+from ..deadline import Deadline, QueryTimeout
+from ..rowhash import row_hash, sample_hash
+from ..mysql.common import \
+    IDBCommon, DBWarnings, RetIndices, \
+    covert_to_sql_type, check_database_selected, check_data_field_type, check_rows_field_type, \
+    check_database_exists, check_table_exists
+
+
+class SQL_FORMATS(Enum):
+    CHECK_TABLE_EXISTS = "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+    LIST_TABLES = "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name",
+
+    CREATE_TABLE = "CREATE TABLE IF NOT EXISTS `{table_name}` ({columns})",
+    DROP_TABLE = "DROP TABLE IF EXISTS `{table_name}`",
+
+    INSERT = "INSERT INTO `{table_name}` ({columns}) VALUES ({values})",
+    INSERT_MANY = "INSERT INTO `{table_name}` ({columns}) VALUES {values}",
+    UPSERT_MANY = "INSERT INTO `{table_name}` ({columns}) VALUES {values} ON CONFLICT ({keys}) DO {updates}",
+    DELETE = "DELETE FROM `{table_name}` {condition}",
+    DELETE_MANY = "DELETE FROM `{table_name}` WHERE {keys} IN ({values})",
+    UPDATE = "UPDATE `{table_name}` SET {sets} {condition}",
+    SELECT = "SELECT * FROM `{table_name}` {condition}",
+
+    ROW_HASHES = "SELECT {keys}, datapy_row_hash({columns}) FROM `{table_name}`",
+    SAMPLE_PREDICATE = "datapy_sample_hash(%s, {columns}) < %s",
+    TABLE_INFO = "PRAGMA table_info(`{table_name}`)",
+    INDEX_LIST = "PRAGMA index_list(`{table_name}`)",
+    INDEX_INFO = "PRAGMA index_info(`{index_name}`)",
+    COUNT_ROWS = "SELECT COUNT(*) FROM `{table_name}`",
+
+    # The DDL of every table and its indexes, it changes with the schema
+    CATALOG_TABLES = "SELECT tbl_name, sql FROM sqlite_master \
+                     WHERE type IN ('table', 'index') AND tbl_name NOT LIKE 'sqlite_%' ORDER BY type DESC, name",
+
+
+def to_qmark(sql: str, data: Tuple) -> str:
+    # datapy builds MySQL `format` style placeholders, sqlite3 speaks `qmark`
+    if (not data):
+        return sql
+
+    return sql.replace("%s", "?").replace("%%", "%")
+
+
+class SQLite(IDBCommon):
+    """`IDBCommon` over the standard library `sqlite3`.
+
+    A dataset_group is a database file `<path>/<group>.db`, or with `path=":memory:"`
+    an in-process database kept for the lifetime of this object.
+    """
+    MEMORY = ":memory:"
+    # Bound parameters per statement, the SQLITE_MAX_VARIABLE_NUMBER of older builds
+    MAX_VARIABLES = 999
+
+    def __init__(self, path: str = MEMORY) -> None:
+        super(SQLite, self).__init__()
+
+        self.path = path
+        if (path != self.MEMORY):
+            os.makedirs(path, exist_ok=True)
+
+        # database_name -> connection, only in-memory databases stay open when not selected
+        self.__memory_dbs: Dict[str, sqlite3.Connection] = {}
+
+        self.db: Optional[sqlite3.Connection] = None
+        self.lock_exec = threading.RLock()
+
+        self._register_database_exists_func(self.__is_database_exists)
+        self._register_table_exists_func(self.__is_table_exists)
+
+    def __database_path(self, database_name: str) -> str:
+        return os.path.join(self.path, f"{database_name}.db")
+
+    def __connect(self, database: str) -> sqlite3.Connection:
+        db = sqlite3.connect(database, check_same_thread=False, isolation_level=None)
+
+        # SQLite has no MD5, `row_hashes` hashes in python exactly like the DataFrame side
+        db.create_function("datapy_row_hash", -1, row_hash, deterministic=True)
+        db.create_function("datapy_sample_hash", -1, sample_hash, deterministic=True)
+
+        return db
+
+    def __open(self, database_name: str) -> sqlite3.Connection:
+        if (self.path == self.MEMORY):
+            if (database_name not in self.__memory_dbs):
+                self.__memory_dbs[database_name] = self.__connect(self.MEMORY)
+
+            return self.__memory_dbs[database_name]
+
+        return self.__connect(self.__database_path(database_name))
+
+    def __is_database_exists(self, database_name: str) -> bool:
+        if (self.path == self.MEMORY):
+            return database_name in self.__memory_dbs
+
+        return os.path.exists(self.__database_path(database_name))
+
+    def __is_table_exists(self, table_name: str) -> bool:
+        results = self.execute(SQL_FORMATS.CHECK_TABLE_EXISTS.value[0], (table_name, ))[RetIndices.RESULT]
+
+        if (len(results) != 0):
+            return True
+
+        return False
+
+    def __close_current(self) -> None:
+        if (self.db is not None and self.path != self.MEMORY):
+            self.db.close()
+
+        self.db = None
+
+    @check_database_exists
+    def create_database(self, database_name: str) -> bool:
+        with self.lock_exec:
+            db = self.__open(database_name)
+            if (self.path != self.MEMORY):
+                db.close()
+
+        return True
+
+    @check_database_exists
+    def switch_database(self, database_name: str) -> bool:
+        with self.lock_exec:
+            if (self._curr_database_name == database_name and self.db is not None):
+                return True
+
+            self.__close_current()
+            self.db = self.__open(database_name)
+            self._curr_database_name = database_name
+
+        return True
+
+    @check_database_exists
+    def drop_database(self, database_name: str) -> bool:
+        with self.lock_exec:
+            if (self._curr_database_name == database_name):
+                self.__close_current()
+                self._curr_database_name = None
+
+            if (self.path == self.MEMORY):
+                self.__memory_dbs.pop(database_name).close()
+            else:
+                os.remove(self.__database_path(database_name))
+
+            self._forget_type_map(database_name)
+
+        return True
+
+    @check_database_selected
+    @check_table_exists
+    def create_table(self,
+                     table_name: str,
+                     column_infos: List[Tuple[str, Any]]) -> bool:
+
+        columns = []
+
+        for i, (name, value) in enumerate(column_infos):
+            type_str = covert_to_sql_type(value)
+            columns.append(f"{name} {type_str}")
+
+        return self.__create_table(table_name, columns)
+
+    @check_database_selected
+    @check_table_exists
+    def create_table_with_types(self,
+                                table_name: str,
+                                column_types: List[Tuple[str, str]],
+                                primary_key: Sequence[str] = ()) -> bool:
+
+        columns = [f"`{name}` {type_str}" for name, type_str in column_types]
+
+        if (len(primary_key) != 0):
+            columns.append("PRIMARY KEY (" + ",".join(f"`{name}`" for name in primary_key) + ")")
+
+        return self.__create_table(table_name, columns)
+
+    def __create_table(self, table_name: str, columns: List[str]) -> bool:
+        sql = SQL_FORMATS.CREATE_TABLE.value[0].format(
+            table_name=table_name,
+            columns=str(",".join(columns))
+        )
+
+        return self.execute(sql)[RetIndices.STATUS]
+
+    @check_database_selected
+    @check_table_exists
+    def drop_table(self, table_name: str) -> bool:
+        sql = SQL_FORMATS.DROP_TABLE.value[0].format(
+            table_name=table_name
+        )
+
+        return self.execute(sql)[RetIndices.STATUS]
+
+    @check_database_selected
+    @check_table_exists
+    @check_data_field_type
+    def insert(self,
+               table_name: str,
+               data: Dict[str, Any]) -> bool:
+
+        column_names = ",".join(list(data.keys()))
+        values = tuple(data.values())
+        holders = ",".join(["%s" for _ in range(len(values))])
+
+        sql = SQL_FORMATS.INSERT.value[0].format(
+            table_name=table_name,
+            columns=column_names,
+            values=holders
+        )
+
+        exec_ret = self.execute(sql, values)
+
+        if (not exec_ret[RetIndices.STATUS] and "datatype mismatch" in str(exec_ret[RetIndices.ERROR_MSG])):
+            warnings.warn(DBWarnings.TypeMismatchedWarning(exec_ret[RetIndices.ERROR_MSG]))
+
+        return exec_ret[RetIndices.STATUS]
+
+    def __insert_rows(self,
+                      sql_format: SQL_FORMATS,
+                      table_name: str,
+                      rows: Sequence[Dict[str, Any]],
+                      **kwargs) -> bool:
+
+        if (len(rows) == 0):
+            return True
+
+        columns = list(rows[0].keys())
+        if (any(row.keys() != rows[0].keys() for row in rows)):
+            raise ValueError("All rows of a multi-row insert must share the same columns")
+
+        holders = "(" + ",".join(["%s" for _ in range(len(columns))]) + ")"
+        per_statement = max(1, self.MAX_VARIABLES // len(columns))
+
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+
+            sql = sql_format.value[0].format(
+                table_name=table_name,
+                columns=",".join(columns),
+                values=",".join([holders] * len(chunk)),
+                **kwargs
+            )
+
+            exec_ret = self.execute(sql, tuple(value for row in chunk for value in row.values()))
+
+            if (not exec_ret[RetIndices.STATUS]):
+                if ("datatype mismatch" in str(exec_ret[RetIndices.ERROR_MSG])):
+                    warnings.warn(DBWarnings.TypeMismatchedWarning(exec_ret[RetIndices.ERROR_MSG]))
+
+                return False
+
+        return True
+
+    @check_database_selected
+    @check_table_exists
+    @check_rows_field_type
+    def insert_many(self,
+                    table_name: str,
+                    rows: Sequence[Dict[str, Any]]) -> bool:
+
+        return self.__insert_rows(SQL_FORMATS.INSERT_MANY, table_name, rows)
+
+    @check_database_selected
+    @check_table_exists
+    @check_rows_field_type
+    def upsert_many(self,
+                    table_name: str,
+                    rows: Sequence[Dict[str, Any]],
+                    key_columns: Sequence[str]) -> bool:
+
+        if (len(rows) == 0):
+            return True
+
+        updates = [column for column in rows[0].keys() if column not in key_columns]
+
+        return self.__insert_rows(
+            SQL_FORMATS.UPSERT_MANY, table_name, rows,
+            keys=",".join(f"`{column}`" for column in key_columns),
+            updates="UPDATE SET " + ",".join(f"`{column}`=excluded.`{column}`" for column in updates)
+            if (updates) else "NOTHING"
+        )
+
+    @check_database_selected
+    @check_table_exists
+    def delete_many(self,
+                    table_name: str,
+                    key_columns: Sequence[str],
+                    keys: Sequence[Tuple]) -> bool:
+
+        holder = "(" + ",".join(["%s" for _ in range(len(key_columns))]) + ")"
+        per_statement = max(1, self.MAX_VARIABLES // len(key_columns))
+
+        for start in range(0, len(keys), per_statement):
+            chunk = keys[start:start + per_statement]
+
+            sql = SQL_FORMATS.DELETE_MANY.value[0].format(
+                table_name=table_name,
+                keys="(" + ",".join(f"`{column}`" for column in key_columns) + ")",
+                values=",".join([holder] * len(chunk))
+            )
+
+            if (not self.execute(sql, tuple(value for key in chunk for value in key))[RetIndices.STATUS]):
+                return False
+
+        return True
+
+    @check_database_selected
+    @check_table_exists
+    def row_hashes(self,
+                   table_name: str,
+                   key_columns: Sequence[str],
+                   columns: Sequence[str]) -> List[Tuple]:
+
+        sql = SQL_FORMATS.ROW_HASHES.value[0].format(
+            table_name=table_name,
+            keys=",".join(f"`{column}`" for column in key_columns),
+            columns=",".join(f"`{column}`" for column in columns)
+        )
+
+        exec_ret = self.execute(sql)
+
+        if (not exec_ret[RetIndices.STATUS]):
+            raise ValueError(f"CODE: {exec_ret[RetIndices.ERROR_CODE]} | MSG: {exec_ret[RetIndices.ERROR_MSG]}")
+
+        return list(exec_ret[RetIndices.RESULT])
+
+    @check_database_selected
+    @check_table_exists
+    def delete(self,
+               table_name: str,
+               condition: str) -> bool:
+
+        sql = SQL_FORMATS.DELETE.value[0].format(
+            table_name=table_name,
+            condition=condition
+        )
+
+        return self.execute(sql)[RetIndices.STATUS]
+
+    @check_database_selected
+    @check_table_exists
+    def select(self,
+               table_name: str,
+               condition: Optional[str] = None) -> Tuple[Tuple, List]:
+
+        sql = SQL_FORMATS.SELECT.value[0].format(
+            table_name=table_name,
+            condition=condition or ""
+        )
+
+        exec_ret = self.execute(sql)
+
+        return (exec_ret[RetIndices.COLUMN_NAME], exec_ret[RetIndices.RESULT])
+
+    @check_database_selected
+    @check_table_exists
+    @check_data_field_type
+    def update(self,
+               table_name: str,
+               data: Dict[str, Any],
+               condition: str) -> bool:
+
+        sets = ",".join(
+            f"`{column}`={value}" for column, value in data.items()
+        )
+
+        sql = SQL_FORMATS.UPDATE.value[0].format(
+            table_name=table_name,
+            sets=sets,
+            condition=condition
+        )
+
+        return self.execute(sql)[RetIndices.STATUS]
+
+    def replication_lag(self) -> Optional[float]:
+        # An embedded database is never behind
+        return 0.0
+
+    @check_database_selected
+    def table_version(self, table_name: str) -> Optional[str]:
+        """SQLite tracks no change time per table, the database file (and its WAL) stands for every table in it.
+        None for in-memory databases.
+        """
+
+        if (self.path == self.MEMORY):
+            return None
+
+        path = self.__database_path(self._curr_database_name)
+        stats = [os.stat(file) for file in (path, f"{path}-wal") if os.path.exists(file)]
+
+        return "|".join(f"{stat.st_mtime_ns}:{stat.st_size}" for stat in stats)
+
+    @check_database_selected
+    def primary_key(self, table_name: str) -> List[str]:
+        # (cid, name, type, notnull, dflt_value, pk), pk is the 1-based position in the key
+        info = self.execute(SQL_FORMATS.TABLE_INFO.value[0].format(table_name=table_name))[RetIndices.RESULT]
+        columns = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5] > 0]
+
+        # Tables without a declared key are keyed by their rowid
+        return columns if (columns or not info) else ["rowid"]
+
+    def sample_predicate(self, key_columns: Sequence[str], seed: int, threshold: int) -> Tuple[str, Tuple]:
+        sql = SQL_FORMATS.SAMPLE_PREDICATE.value[0].format(columns=",".join(f"`{column}`" for column in key_columns))
+
+        return sql, (str(seed), threshold)
+
+    def cancel(self) -> None:
+        """Interrupt the statement running on the selected database, callable from any thread"""
+
+        db = self.db
+        if (db is not None):
+            db.interrupt()
+
+    def list_databases(self) -> List[str]:
+        if (self.path == self.MEMORY):
+            return sorted(self.__memory_dbs.keys())
+
+        return sorted(os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(self.path, "*.db")))
+
+    def list_tables(self, database_name: str) -> List[str]:
+        if (database_name != self._curr_database_name):
+            self.switch_database(database_name)
+
+        return [row[0] for row in self.execute(SQL_FORMATS.LIST_TABLES.value[0])[RetIndices.RESULT]]
+
+    def table_stats(self, database_name: str) -> Dict[str, Dict[str, Any]]:
+        """Exact row counts (SQLite keeps no statistics) and the database file time.
+        `version` is the DDL of the table and its indexes, so only a schema change describes it again.
+        """
+
+        if (database_name != self._curr_database_name and not self.switch_database(database_name)):
+            return {}
+
+        versions: Dict[str, List[str]] = {}
+        for table_name, sql in self.execute(SQL_FORMATS.CATALOG_TABLES.value[0])[RetIndices.RESULT]:
+            versions.setdefault(table_name, []).append(sql or "")
+
+        update_time = None
+        if (self.path != self.MEMORY):
+            update_time = datetime.fromtimestamp(os.path.getmtime(self.__database_path(database_name)))
+
+        page_count = self.execute("PRAGMA page_count")[RetIndices.RESULT][0][0]
+        page_size = self.execute("PRAGMA page_size")[RetIndices.RESULT][0][0]
+
+        rows = {
+            table_name: self.execute(
+                SQL_FORMATS.COUNT_ROWS.value[0].format(table_name=table_name)
+            )[RetIndices.RESULT][0][0]
+            for table_name in versions
+        }
+        total = sum(rows.values())
+
+        return {
+            table_name: {
+                "rows": rows[table_name],
+                # Pages are not attributed to tables, spread the file over all rows
+                "avg_row_length": page_count * page_size // total if total else 0,
+                "data_length": None,
+                "index_length": None,
+                "update_time": update_time,
+                "version": ";".join(sqls)
+            }
+            for table_name, sqls in versions.items()
+        }
+
+    def describe_tables(self, database_name: str, table_names: Sequence[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        tables: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        if (len(table_names) == 0):
+            return tables
+
+        if (database_name != self._curr_database_name):
+            self.switch_database(database_name)
+
+        for table_name in table_names:
+            # (cid, name, type, notnull, dflt_value, pk)
+            info = self.execute(SQL_FORMATS.TABLE_INFO.value[0].format(table_name=table_name))[RetIndices.RESULT]
+
+            columns = [{
+                "name": name,
+                "data_type": column_type.split("(")[0].strip().lower(),
+                "type": column_type,
+                "nullable": not notnull and not pk,
+                "default": default,
+                "key": "PRI" if pk else ""
+            } for _, name, column_type, notnull, default, pk in info]
+
+            indexes = []
+            # (seq, name, unique, origin, partial), origin "pk" is the index backing a PRIMARY KEY
+            for _, index_name, unique, origin, _ in self.execute(
+                SQL_FORMATS.INDEX_LIST.value[0].format(table_name=table_name)
+            )[RetIndices.RESULT]:
+                # (seqno, cid, name)
+                index_info = self.execute(SQL_FORMATS.INDEX_INFO.value[0].format(index_name=index_name))[RetIndices.RESULT]
+
+                indexes.append({
+                    "name": "PRIMARY" if origin == "pk" else index_name,
+                    "unique": bool(unique),
+                    "columns": [row[2] for row in sorted(index_info)],
+                    "cardinality": None
+                })
+
+            # An INTEGER PRIMARY KEY is the rowid itself, it has no index of its own
+            key_columns = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5] > 0]
+            if (key_columns and not any(index["name"] == "PRIMARY" for index in indexes)):
+                indexes.insert(0, {"name": "PRIMARY", "unique": True, "columns": key_columns, "cardinality": None})
+
+            tables[table_name] = {"columns": columns, "indexes": indexes}
+
+        return tables
+
+    @check_database_selected
+    def estimate(self, table_name: str, sql: str, data: Tuple = ()) -> Tuple[int, int]:
+        """SQLite keeps no row statistics, count the filtered rows (cheap next to materializing them)
+        and spread the database size over the total rows.
+        """
+
+        rows = self.execute(f"SELECT COUNT(*) FROM ({sql})", data)
+        if (not rows[RetIndices.STATUS]):
+            return (0, 0)
+
+        total = self.execute(f"SELECT COUNT(*) FROM `{table_name}`")[RetIndices.RESULT][0][0]
+        page_count = self.execute("PRAGMA page_count")[RetIndices.RESULT][0][0]
+        page_size = self.execute("PRAGMA page_size")[RetIndices.RESULT][0][0]
+
+        avg_row_length = page_count * page_size // total if total else 0
+
+        return (rows[RetIndices.RESULT][0][0], avg_row_length)
+
+    def execute(self, sql: str, data: Tuple = (), timeout: Union[None, float, Deadline] = None) -> Tuple:
+        """Run one statement. Past `timeout` (seconds or a `Deadline`) the connection is interrupted
+        and `QueryTimeout` is raised.
+        """
+        deadline = Deadline.of(timeout)
+        start = time.perf_counter()
+
+        with self._acquire(deadline):
+            acquired = time.perf_counter()
+
+            status = False
+            err_code = 0
+            err_msg = None
+            column_name = None
+            results: List = []
+
+            if (self.db is None):
+                raise sqlite3.ProgrammingError("Not switched to database.")
+
+            cursor = self.db.cursor()
+
+            # SQLite produces the rows while they are fetched, the deadline covers both
+            with self._watchdog(deadline) as fired:
+                try:
+                    cursor.execute(to_qmark(sql, data), data)
+                    executed = time.perf_counter()
+
+                    if (cursor.description is not None):
+                        column_name = list(zip(*cursor.description))[0]
+                        results = cursor.fetchall()
+
+                    status = True
+
+                except sqlite3.Error as e:
+                    executed = time.perf_counter()
+                    if (self.db.in_transaction):
+                        self.db.rollback()
+                    err_code, err_msg = getattr(e, "sqlite_errorcode", 1), str(e)
+                    column_name, results = None, []
+
+            cursor.close()
+
+            if (not status and fired.is_set()):
+                raise QueryTimeout(f"{deadline.describe()}: {err_msg}")
+
+            fetched = time.perf_counter()
+
+            if (self._execute_hook is not None):
+                self._execute_hook({
+                    "wait": acquired - start,
+                    "execute": executed - acquired,
+                    "fetch": fetched - executed
+                }, len(results))
+
+            if (status and self._slow_query_func is not None and fetched - acquired >= self._slow_query_threshold):
+                self.__report_slow_query(sql, data, fetched - acquired, len(results))
+
+            return (status, err_code, column_name, results, err_msg)
+
+    def execute_stream(self,
+                       sql: str,
+                       data: Tuple = (),
+                       batch_size: SupportsInt = 10000,
+                       timeout: Union[None, float, Deadline] = None
+                       ) -> Iterator[Tuple[Tuple, List]]:
+        """Yield `(description, rows)` batches, `description` is the DB-API `cursor.description`."""
+
+        deadline = Deadline.of(timeout)
+        start = time.perf_counter()
+
+        with self._acquire(deadline), self._watchdog(deadline) as fired:
+            acquired = time.perf_counter()
+
+            if (self.db is None):
+                raise sqlite3.ProgrammingError("Not switched to database.")
+
+            cursor = self.db.cursor()
+            fetched = 0
+            rows_total = 0
+
+            try:
+                cursor.execute(to_qmark(sql, data), data)
+                executed = time.perf_counter()
+
+                description = tuple(cursor.description or ())
+
+                while True:
+                    if (deadline is not None):
+                        deadline.check()
+
+                    batch_start = time.perf_counter()
+                    rows = cursor.fetchmany(int(batch_size))
+                    fetched += time.perf_counter() - batch_start
+
+                    if (not rows):
+                        break
+
+                    rows_total += len(rows)
+                    yield (description, rows)
+
+                if (self._execute_hook is not None):
+                    self._execute_hook({
+                        "wait": acquired - start,
+                        "execute": executed - acquired,
+                        "fetch": fetched
+                    }, rows_total)
+
+                duration = executed - acquired + fetched
+                if (self._slow_query_func is not None and duration >= self._slow_query_threshold):
+                    self.__report_slow_query(sql, data, duration, rows_total)
+
+            except sqlite3.OperationalError as e:
+                if (fired.is_set()):
+                    raise QueryTimeout(f"{deadline.describe()}: {e}") from e
+                raise
+
+            finally:
+                cursor.close()
+
+    def __report_slow_query(self, sql: str, data: Tuple, duration: float, rows: int) -> None:
+        explain = None
+
+        if (sql.lstrip()[:6].upper() == "SELECT"):
+            cursor = self.db.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {to_qmark(sql, data)}", data)
+                explain = [dict(zip(("id", "parent", "notused", "detail"), row)) for row in cursor.fetchall()]
+
+            except sqlite3.Error as e:
+                explain = f"EXPLAIN failed: {e}"
+
+            finally:
+                cursor.close()
+
+        try:
+            self._slow_query_func({
+                "database": self._curr_database_name,
+                "sql": sql,
+                "duration": duration,
+                "rows": rows,
+                "explain": explain
+            })
+
+        except Exception as e:      # pragma: no cover
+            warnings.warn(f"Slow query log failed: {e}")
+
+    def transaction(self):
+        class TransactionManager():
+            def __init__(self, outer: 'SQLite') -> None:
+                self.outer = outer
+
+            def __enter__(self) -> 'SQLite':
+                self.outer.lock_exec.acquire()
+                self.outer.db.execute("BEGIN")
+
+                return self.outer
+
+            def __exit__(self, exc_type, exc_val, exc_tb):
+                try:
+                    if exc_type is None:
+                        self.outer.db.commit()
+                    elif self.outer.db.in_transaction:
+                        self.outer.db.rollback()
+                finally:
+                    self.outer.lock_exec.release()
+
+        return TransactionManager(self)
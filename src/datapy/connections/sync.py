@@ -0,0 +1,97 @@
+'''
+@File    :   sync.py
+@Time    :   2025/05/29 21:40:53
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Plan the change set between a DataFrame and a table from row hashes
+'''
+
+
+import hashlib
+
+import pandas as pd
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .rowhash import HASH_COLUMN, NULL_TOKEN, SEPARATOR, normalize
+
+
+def column_texts(column: pd.Series) -> pd.Series:
+    """`normalize` of a whole column, NULLs already replaced by `NULL_TOKEN`"""
+
+    nulls = column.isna()
+
+    if (pd.api.types.is_bool_dtype(column.dtype)):
+        texts = column.map({True: "1", False: "0"})
+
+    elif (pd.api.types.is_integer_dtype(column.dtype)):
+        texts = column.astype(str)
+
+    else:
+        texts = column.astype(object).map(normalize)
+
+    return texts.astype(object).where(~nulls, NULL_TOKEN)
+
+
+def joined_texts(df: pd.DataFrame, columns: Sequence[str]) -> pd.Series:
+    texts = [column_texts(df[column]) for column in columns]
+
+    if (len(texts) == 1):
+        return texts[0]
+
+    return texts[0].str.cat(texts[1:], sep=SEPARATOR)
+
+
+def frame_hashes(df: pd.DataFrame, columns: Sequence[str]) -> pd.Series:
+    """`row_hash` of every row of `df` over `columns`"""
+
+    return pd.Series(
+        [hashlib.md5(text.encode("utf-8")).hexdigest() for text in joined_texts(df, columns)],
+        index=df.index,
+        dtype=object
+    )
+
+
+def frame_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows of `df` as dicts of plain python values, NaN/NaT as None"""
+
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+
+        if (pd.api.types.is_datetime64_any_dtype(column.dtype)):
+            values = pd.Series(list(column.dt.to_pydatetime()), index=df.index, dtype=object)
+        else:
+            values = column.astype(object)
+
+        columns[name] = values.where(column.notna(), None)
+
+    return pd.DataFrame(columns, index=df.index).to_dict("records")
+
+
+def plan_changes(df: pd.DataFrame,
+                 remote: pd.DataFrame,
+                 key_columns: Sequence[str]
+                 ) -> Tuple[pd.DataFrame, List[Tuple], Dict[str, int]]:
+    """Diff `df` against the `(key..., HASH_COLUMN)` rows fetched from the table
+
+    Returns:
+        Tuple[pd.DataFrame, List[Tuple], Dict[str, int]]:   Rows of `df` to upsert, keys to delete and \
+                                                            the inserted/updated/deleted/unchanged counts.
+    """
+
+    local_hashes = pd.Series(frame_hashes(df, list(df.columns)).values, index=joined_texts(df, key_columns).values)
+    remote_hashes = pd.Series(remote[HASH_COLUMN].values, index=joined_texts(remote, key_columns).values)
+
+    inserted = ~local_hashes.index.isin(remote_hashes.index)
+    changed = ~inserted & (remote_hashes.reindex(local_hashes.index).values != local_hashes.values)
+    deleted = ~remote_hashes.index.isin(local_hashes.index)
+
+    deletes = list(remote.loc[deleted, list(key_columns)].itertuples(index=False, name=None))
+
+    return df[inserted | changed], deletes, {
+        "inserted": int(inserted.sum()),
+        "updated": int(changed.sum()),
+        "deleted": len(deletes),
+        "unchanged": int((~inserted & ~changed).sum())
+    }
@@ -0,0 +1,205 @@
+'''
+@File    :   writer.py
+@Time    :   2025/05/27 20:55:41
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Buffered write-behind inserter
+'''
+
+
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+import weakref
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .mysql.common import IDBCommon
+
+
+class _Flush():
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class BufferedInserter():
+    """Collect rows of one table in memory and write them behind the producer's back.
+
+    A batch is flushed when it reaches `max_rows` rows or about `max_bytes` bytes, or
+    `flush_interval` seconds after its first row, as multi-row INSERTs in one transaction.
+    `put` blocks (backpressure) once `max_pending` rows are waiting. Failed batches are handed
+    to `on_error` and the last `max_failures` of them kept in `failures`, rows are never silently dropped.
+    Each batch switches the connection to `database_name` and back under one hold of `lock_exec`.
+    """
+    def __init__(self,
+                 db: IDBCommon,
+                 database_name: str,
+                 table_name: str,
+                 max_rows: int = 1000,
+                 max_bytes: int = 4 * 1024 * 1024,
+                 flush_interval: float = 1.0,
+                 max_pending: int = 100000,
+                 max_failures: int = 100,
+                 on_error: Optional[Callable[[List[Dict[str, Any]], BaseException], None]] = None
+                 ):
+
+        self.db = db
+        self.database_name = database_name
+        self.table_name = table_name
+
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+
+        self.failures: Deque[Dict[str, Any]] = deque(maxlen=max_failures)
+        self.rows_written = 0
+        self.batches_written = 0
+        self.batches_failed = 0
+
+        self.__queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.__closed = False
+        self.__thread = threading.Thread(target=self.__run, name=f"datapy-writer-{table_name}", daemon=True)
+        self.__thread.start()
+
+        # Durable flush on interpreter shutdown, without keeping the inserter alive
+        ref = weakref.ref(self)
+        self.__atexit = lambda: ref() is not None and ref().close()
+        atexit.register(self.__atexit)
+
+    def put(self, row: Dict[str, Any], timeout: Optional[float] = None) -> None:
+        """Queue one row, blocks while the buffer is full. Raises `queue.Full` after `timeout`."""
+
+        if (self.__closed):
+            raise RuntimeError(f"BufferedInserter of `{self.table_name}` is closed")
+
+        self.__queue.put(row, timeout=timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far, returns False on timeout. Raises once closed."""
+
+        if (self.__closed):
+            raise RuntimeError(f"BufferedInserter of `{self.table_name}` is closed")
+
+        request = _Flush()
+        self.__queue.put(request, timeout=timeout)
+
+        expires_at = None if timeout is None else time.monotonic() + timeout
+
+        # A flush queued behind `close()` is never answered, stop waiting once the thread is gone
+        while (not request.done.wait(0.1)):
+            if (not self.__thread.is_alive()):
+                raise RuntimeError(f"BufferedInserter of `{self.table_name}` is closed")
+
+            if (expires_at is not None and time.monotonic() >= expires_at):
+                return False
+
+        return True
+
+    def close(self) -> None:
+        if (self.__closed):
+            return
+
+        self.__closed = True
+        self.__queue.put(_STOP)
+        self.__thread.join()
+
+        atexit.unregister(self.__atexit)
+
+    def __enter__(self) -> 'BufferedInserter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def __row_size(row: Dict[str, Any]) -> int:
+        return sum(sys.getsizeof(value) for value in row.values())
+
+    def __run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        size = 0
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            try:
+                item = self.__queue.get(timeout=timeout)
+
+            except queue.Empty:
+                item = None
+
+            if (isinstance(item, dict)):
+                if (not batch):
+                    deadline = time.monotonic() + self.flush_interval
+
+                batch.append(item)
+                size += self.__row_size(item)
+
+                if (len(batch) < self.max_rows and size < self.max_bytes):
+                    continue
+
+            # Size/byte threshold, interval elapsed, flush request or stop
+            if (batch):
+                self.__write(batch)
+                batch, size, deadline = [], 0, None
+
+            if (isinstance(item, _Flush)):
+                item.done.set()
+
+            elif (item is _STOP):
+                return
+
+    def __write(self, batch: List[Dict[str, Any]]) -> None:
+        error: Optional[BaseException] = None
+
+        try:
+            # Hold the connection while switching, so the whole batch lands in `database_name`
+            # and the other users of the connection find it on their database again afterwards
+            with self.db.lock_exec:
+                previous = self.db._curr_database_name
+                self.db.switch_database(self.database_name)
+
+                try:
+                    with self.db.transaction():
+                        if (not self.db.insert_many(self.table_name, batch)):
+                            raise ValueError(f"Multi-row insert into `{self.table_name}` failed")
+
+                finally:
+                    if (previous is not None and previous != self.database_name):
+                        self.db.switch_database(previous)
+
+        except Exception as e:
+            error = e
+
+        if (error is None):
+            self.rows_written += len(batch)
+            self.batches_written += 1
+            return
+
+        self.batches_failed += 1
+        if (len(self.failures) == self.failures.maxlen):
+            logging.warning(f"Dropping the oldest of {self.failures.maxlen} failed batches kept for `{self.table_name}`")
+
+        self.failures.append({
+            "time": time.time(),
+            "table_name": self.table_name,
+            "rows": batch,
+            "error": error
+        })
+        logging.warning(f"Write-behind batch of {len(batch)} rows into `{self.table_name}` failed: {error}")
+
+        if (self.on_error is not None):
+            try:
+                self.on_error(batch, error)
+
+            except Exception as e:      # pragma: no cover
+                logging.warning(f"on_error callback failed: {e}")
@@ -0,0 +1,203 @@
+'''
+@File    :   exporter.py
+@Time    :   2025/05/06 21:12:40
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Stream datasets into files without building DataFrame
+'''
+
+
+import csv
+import logging
+import os
+import time
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .connections.converter import RecordBatchBuilder, pa, require_pyarrow
+
+
+# Row groups a Parquet file waits for before fixing the type of a column seen only NULL so far
+SCHEMA_ROW_GROUPS = 4
+
+
+class BatchWriter():
+    def __init__(self, path: str, description: Sequence[Tuple], declared: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.description = description
+        self.columns = [column[0] for column in description]
+        self.rows = 0
+
+    def write(self, rows: Sequence[Tuple]) -> None:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        raise NotImplementedError()
+
+
+class CSVBatchWriter(BatchWriter):
+    def __init__(self, path: str, description: Sequence[Tuple], declared: Optional[Dict[str, str]] = None):
+        super(CSVBatchWriter, self).__init__(path, description, declared)
+
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+
+    def write(self, rows: Sequence[Tuple]) -> None:
+        self.writer.writerows(rows)
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetBatchWriter(BatchWriter):
+    """The file schema comes from the cursor description, then from the `declared` column types of the table.
+    A column typed by neither is typed by its first non-null value, the file is opened once every column
+    has a type or after `SCHEMA_ROW_GROUPS` row groups, whichever comes first.
+    """
+    def __init__(self, path: str, description: Sequence[Tuple], declared: Optional[Dict[str, str]] = None):
+        super(ParquetBatchWriter, self).__init__(path, description, declared)
+
+        require_pyarrow()
+        import pyarrow.parquet
+
+        self.pq = pyarrow.parquet
+        self.builder = RecordBatchBuilder(description, declared)
+        self.writer = None
+        self.pending: List['pa.RecordBatch'] = []
+
+    def write(self, rows: Sequence[Tuple]) -> None:
+        # One row group per call
+        self.pending.append(self.builder.build(rows))
+        self.rows += len(rows)
+
+        if (self.writer is None and None in self.builder.types and len(self.pending) < SCHEMA_ROW_GROUPS):
+            return
+
+        self.__drain()
+
+    def __open(self) -> None:
+        unknown = [name for name, type_ in zip(self.builder.names, self.builder.types) if type_ is None]
+
+        if (unknown):
+            # Neither typed nor seen with a value, there is nothing left to learn the type from
+            logging.warning(f"Columns {unknown} of `{self.path}` have no type and no value yet, written as string")
+
+        self.writer = self.pq.ParquetWriter(self.path, pa.schema([
+            (name, type_ if type_ is not None else pa.string())
+            for name, type_ in zip(self.builder.names, self.builder.types)
+        ]))
+
+    def __drain(self) -> None:
+        if (self.writer is None):
+            self.__open()
+
+        for batch in self.pending:
+            if (batch.schema.equals(self.writer.schema)):
+                self.writer.write_batch(batch)
+            else:
+                # Columns that were all NULL or inferred differently in this batch
+                self.writer.write_table(pa.Table.from_batches([batch]).cast(self.writer.schema))
+
+        self.pending = []
+
+    def close(self) -> None:
+        # Also leaves a valid empty file behind when nothing was written
+        self.__drain()
+        self.writer.close()
+
+
+WRITERS = {
+    "csv": CSVBatchWriter,
+    "parquet": ParquetBatchWriter
+}
+
+
+def shard_path(path: str, index: int) -> str:
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-{index:05d}{ext}"
+
+
+def export_stream(batches: Iterator[Tuple[Tuple, List]],
+                  path: str,
+                  format: str = "parquet",
+                  row_group_size: int = 100000,
+                  shard_rows: Optional[int] = None,
+                  logger: Optional[logging.Logger] = None,
+                  declared: Optional[Dict[str, str]] = None
+                  ) -> Dict[str, Any]:
+    """Write `(description, rows)` batches into row group sized chunks.
+
+    Memory stays bounded by a few row groups no matter how large the table is. With `shard_rows`,
+    a new file is started every `shard_rows` rows and named `<stem>-00000<ext>`, `<stem>-00001<ext>`, ...
+    `declared` maps columns to their SQL type for the Parquet schema where the description has none.
+    """
+
+    if (format not in WRITERS):
+        raise ValueError(f"Unsupported export format: {format}")
+
+    if (shard_rows is not None and shard_rows < row_group_size):
+        row_group_size = shard_rows
+
+    writer_cls = WRITERS[format]
+    writer: Optional[BatchWriter] = None
+    files: List[str] = []
+    description: Sequence[Tuple] = ()
+    buffer: List[Tuple] = []
+    total = 0
+
+    def open_writer() -> BatchWriter:
+        file_path = shard_path(path, len(files)) if shard_rows is not None else path
+        files.append(file_path)
+        return writer_cls(file_path, description, declared)
+
+    def flush(final: bool = False) -> None:
+        nonlocal writer, buffer
+
+        while len(buffer) >= row_group_size or (final and buffer):
+            if (writer is None):
+                writer = open_writer()
+
+            size = row_group_size if shard_rows is None else min(row_group_size, shard_rows - writer.rows)
+            writer.write(buffer[:size])
+            buffer = buffer[size:]
+
+            if (shard_rows is not None and writer.rows >= shard_rows):
+                writer.close()
+                writer = None
+
+    start = time.perf_counter()
+
+    try:
+        for batch_description, rows in batches:
+            description = batch_description
+            buffer.extend(rows)
+            total += len(rows)
+
+            flush()
+
+        flush(final=True)
+
+        if (writer is None and not files):
+            # Keep an empty result visible as an empty file
+            writer = open_writer()
+
+    finally:
+        if (writer is not None):
+            writer.close()
+
+    seconds = time.perf_counter() - start
+
+    report = {
+        "rows": total,
+        "files": files,
+        "seconds": seconds,
+        "rows_per_sec": total / seconds if seconds > 0 else float(total)
+    }
+
+    (logger or logging).info(
+        f"Exported {total} rows into {len(files)} file(s) in {seconds:.3f}s ({report['rows_per_sec']:.0f} rows/sec)"
+    )
+
+    return report
@@ -0,0 +1,265 @@
+'''
+@File    :   instrument.py
+@Time    :   2025/05/10 16:03:52
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Per-query instrumentation hooks and sinks
+'''
+
+
+import logging
+import threading
+import time
+
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+
+# Phases reported by the hooks:
+#   wait     - waiting for the connection (`lock_exec`) or for room in the memory budget
+#   execute  - `cursor.execute`, server time plus network transfer and row decoding of a buffered cursor
+#   fetch    - `fetchall`/`fetchmany`
+#   convert  - building the DataFrame
+#   total    - the whole dataset_item in `DataConnecter.get`
+PHASES = ("wait", "execute", "fetch", "convert", "total")
+
+
+class Span():
+    def __init__(self, dataset_group: Optional[str], dataset_item: Optional[str]) -> None:
+        self.dataset_group = dataset_group
+        self.dataset_item = dataset_item
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.rows = 0
+        self.bytes = 0
+        self.cache: Optional[str] = None
+        self.shared = False
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] += seconds
+
+    def to_event(self) -> Dict[str, Any]:
+        return {
+            "dataset_group": self.dataset_group,
+            "dataset_item": self.dataset_item,
+            "phases": dict(self.phases),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "cache": self.cache,
+            "shared": self.shared
+        }
+
+
+class Sink():
+    def emit(self, event: Dict[str, Any]) -> None:
+        raise NotImplementedError()
+
+
+class LoggingSink(Sink):
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> None:
+        self.logger = logger or logging.getLogger("datapy")
+        self.level = level
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        phases = " ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in event["phases"].items())
+        self.logger.log(
+            self.level,
+            f"{event['dataset_group']}.{event['dataset_item']} rows={event['rows']} bytes={event['bytes']} "
+            f"cache={event['cache']} shared={event['shared']} {phases}"
+        )
+
+
+class CallbackSink(Sink):
+    def __init__(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        self.callback = callback
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        self.callback(event)
+
+
+class CounterSink(Sink):
+    """Prometheus style monotonic counters, `render` outputs the text exposition format."""
+
+    def __init__(self, prefix: str = "datapy") -> None:
+        self.prefix = prefix
+        self.__lock = threading.Lock()
+        self.counters: Dict[str, Dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+
+    def __inc(self, name: str, labels: tuple, value: float) -> None:
+        self.counters[f"{self.prefix}_{name}"][labels] += value
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        item = (("dataset_item", str(event["dataset_item"])), )
+
+        with self.__lock:
+            self.__inc("queries_total", item, 1)
+            self.__inc("rows_total", item, event["rows"])
+            self.__inc("bytes_total", item, event["bytes"])
+
+            if (event["cache"] is not None):
+                self.__inc(f"cache_{event['cache']}_total", item, 1)
+
+            for phase, seconds in event["phases"].items():
+                self.__inc("phase_seconds_total", item + (("phase", phase), ), seconds)
+
+    def render(self) -> str:
+        lines = []
+
+        with self.__lock:
+            for name, series in self.counters.items():
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    label_str = ",".join(f'{key}="{val}"' for key, val in labels)
+                    lines.append(f"{name}{{{label_str}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+class StatsSink(Sink):
+    """Keep the latest `window` events per dataset_item and aggregate them into percentiles."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self.window = window
+        self.__lock = threading.Lock()
+        self.events: Dict[str, Deque[Dict[str, Any]]] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self.__lock:
+            self.events[f"{event['dataset_group']}.{event['dataset_item']}"].append(event)
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.events.clear()
+
+    @staticmethod
+    def percentile(values: List[float], q: float) -> float:
+        if (not values):
+            return 0.0
+
+        values = sorted(values)
+        return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self.__lock:
+            snapshot = {key: list(events) for key, events in self.events.items()}
+
+        results = {}
+
+        for key, events in snapshot.items():
+            item = {
+                "count": len(events),
+                "rows": sum(event["rows"] for event in events),
+                "bytes": sum(event["bytes"] for event in events),
+                "cache_hits": sum(1 for event in events if event["cache"] == "hit"),
+                "cache_misses": sum(1 for event in events if event["cache"] == "miss"),
+                "cache_partials": sum(1 for event in events if event["cache"] == "partial"),
+                "shared": sum(1 for event in events if event["shared"])
+            }
+
+            for phase in PHASES:
+                values = [event["phases"][phase] for event in events if phase in event["phases"]]
+                for q in (50, 90, 99):
+                    item[f"{phase}_p{q}"] = self.percentile(values, q)
+
+            results[key] = item
+
+        return results
+
+
+_local = threading.local()
+_stats = StatsSink()
+_sinks: List[Sink] = [_stats]
+
+
+def add_sink(sink: Sink) -> Sink:
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: Sink) -> None:
+    _sinks.remove(sink)
+
+
+def current_span() -> Optional[Span]:
+    return getattr(_local, "span", None)
+
+
+@contextmanager
+def span(dataset_group: Optional[str], dataset_item: Optional[str]) -> Iterator[Span]:
+    outer = current_span()
+    curr = Span(dataset_group, dataset_item)
+    _local.span = curr
+
+    start = time.perf_counter()
+
+    try:
+        yield curr
+
+    finally:
+        curr.add("total", time.perf_counter() - start)
+        _local.span = outer
+
+        event = curr.to_event()
+        for sink in list(_sinks):
+            try:
+                sink.emit(event)
+
+            except Exception as e:      # pragma: no cover
+                logging.warning(f"Instrumentation sink {sink!r} failed: {e}")
+
+
+@contextmanager
+def attach(curr: Optional[Span]) -> Iterator[None]:
+    """Make `curr` the span of this thread too, e.g. of a worker fetching on behalf of the caller"""
+
+    outer = current_span()
+    _local.span = curr
+
+    try:
+        yield
+
+    finally:
+        _local.span = outer
+
+
+def record(phase: str, seconds: float) -> None:
+    curr = current_span()
+    if (curr is not None):
+        curr.add(phase, seconds)
+
+
+def timed(phase: str) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+
+            try:
+                return func(*args, **kwargs)
+
+            finally:
+                record(phase, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def on_execute(phases: Dict[str, float], rows: int) -> None:
+    """Hook registered into `MySQL.execute`, credits the phases to the span of the calling thread."""
+
+    curr = current_span()
+    if (curr is None):
+        return
+
+    for phase, seconds in phases.items():
+        curr.add(phase, seconds)
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    return _stats.summary()
+
+
+def reset_stats() -> None:
+    _stats.reset()
@@ -1,10 +1,12 @@
 from .builder import ASTBasicNode as DataCondition
 from .builder import Field as DataField
 from .builder import SelectBuilder as DataSelecter
+from .builder import KeysetPaginator as DataPaginator
 
 
 __all__ = [
     "DataCondition",
     "DataField",
-    "DataSelecter"
+    "DataSelecter",
+    "DataPaginator"
 ]
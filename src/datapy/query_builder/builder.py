@@ -9,12 +9,13 @@ Features:
 - Natural ConditionNode building using Python operators
 - Safe parameterization
 - Pagination and sorting
+- Keyset (seek) pagination
 - Operator overloading for AND/OR/NOT
 """
 
 
 from abc import ABC, abstractmethod
-from typing import Any, List, Tuple, Sequence
+from typing import Any, List, Optional, Tuple, Sequence
 
 
 class Field():
@@ -114,6 +115,21 @@ class OPBetweenNode(ASTBasicNode):
         return f"{self.field.name} BETWEEN %s AND %s", self.val_range
 
 
+class OPRawNode(ASTBasicNode):
+    """A backend specific predicate, compiled as given"""
+
+    def __init__(self,
+                 sql: str,
+                 params: Tuple[Any, ...] = ()
+                 ):
+
+        self.sql = sql
+        self.params = tuple(params)
+
+    def compile(self) -> Tuple[str, Tuple[Any]]:
+        return f"({self.sql})", self.params
+
+
 class OPLogicalNode(ASTBasicNode):
     def __init__(self,
                  operator: str,
@@ -166,6 +182,7 @@ class SelectBuilder():
         self._order_by = []
         self._limit = None
         self._offset = None
+        self._max_execution_time = None
 
     def select(self, *fields: str) -> 'SelectBuilder':
         self._select.extend(fields)
@@ -191,6 +208,14 @@ class SelectBuilder():
         self._offset = start
         return self
 
+    def max_execution_time(self, milliseconds: Optional[int]) -> 'SelectBuilder':
+        # MySQL 5.7.8+ aborts the SELECT on the server, other servers read the hint as a comment
+        self._max_execution_time = milliseconds
+        return self
+
+    def paginate(self, key: str, page_size: int) -> 'KeysetPaginator':
+        return KeysetPaginator(self, key, page_size)
+
     def build(self) -> Tuple[str, Tuple[Any]]:
         # Validate required components
         if not self._from_table:
@@ -198,6 +223,8 @@ class SelectBuilder():
 
         # Build SELECT clause
         select_clause = "SELECT " + (
+            f"/*+ MAX_EXECUTION_TIME({int(self._max_execution_time)}) */ " if self._max_execution_time is not None else ""
+        ) + (
             ", ".join(self._select) if self._select else "*"
         )
 
@@ -224,3 +251,39 @@ class SelectBuilder():
             params.append(self._offset)
 
         return " ".join(sql), tuple(params)
+
+
+class KeysetPaginator():
+    """Seek pagination over an ordered unique key.
+
+    Every page is built as `WHERE <condition> AND key > last_seen ORDER BY key LIMIT n`,
+    so the server never scans and discards the preceding rows like `OFFSET` does.
+    """
+    def __init__(self,
+                 builder: SelectBuilder,
+                 key: str,
+                 page_size: int
+                 ):
+
+        if (page_size <= 0):
+            raise ValueError("page_size must be positive")
+
+        if (builder._limit is not None or builder._offset is not None):
+            raise ValueError("Keyset pagination cannot be combined with LIMIT/OFFSET")
+
+        self.builder = builder
+        self.key = Field(key)
+        self.page_size = page_size
+
+    def build(self, last_seen: Optional[Any] = None) -> Tuple[str, Tuple[Any]]:
+        page = SelectBuilder().select(*self.builder._select).from_table(self.builder._from_table)
+
+        condition = self.builder._where
+        if (last_seen is not None):
+            seek = OPComparisonNode(self.key, '>', last_seen)
+            condition = seek if condition is None else condition & seek
+
+        if (condition is not None):
+            page.where(condition)
+
+        return page.order_by(self.key.name).limit(self.page_size).build()
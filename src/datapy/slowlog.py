@@ -0,0 +1,143 @@
+'''
+@File    :   slowlog.py
+@Time    :   2025/05/12 22:18:05
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Slow query log with EXPLAIN capture
+'''
+
+
+import glob
+import json
+import logging
+import os
+import re
+import time
+
+from collections import defaultdict
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List
+
+from . import instrument
+
+
+RE_QUOTED = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+RE_NUMBER = re.compile(r"(?<![\w`])-?\d+(?:\.\d+)?(?![\w`])")
+RE_WHERE = re.compile(r"\bWHERE\s+(.*?)(?:\s+ORDER\s+BY\b|\s+LIMIT\b|\s+GROUP\s+BY\b|$)", re.IGNORECASE)
+RE_FROM = re.compile(r"\bFROM\s+`?([\w$]+)`?", re.IGNORECASE)
+
+
+def fingerprint(sql: str) -> str:
+    """Collapse whitespace and replace inline literals, queries built by `SelectBuilder`
+    already are templates and only get normalized.
+    """
+    sql = RE_QUOTED.sub("?", sql)
+    sql = RE_NUMBER.sub("?", sql)
+    return " ".join(sql.split()).replace("%s", "?")
+
+
+class SlowQueryLog():
+    def __init__(self,
+                 path: str,
+                 max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5
+                 ):
+
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # A private logger so records never leak into the application's handlers
+        self.logger = logging.getLogger(f"datapy.slowlog.{os.path.abspath(path)}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+
+        if (not self.logger.handlers):
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        self.write(record)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        sql_fingerprint = fingerprint(record["sql"])
+
+        span = instrument.current_span()
+        dataset_item = span.dataset_item if span is not None else None
+        if (dataset_item is None):
+            match = RE_FROM.search(record["sql"])
+            dataset_item = match.group(1) if match else None
+
+        where = RE_WHERE.search(sql_fingerprint)
+
+        explain = record.get("explain")
+        try:
+            explain = json.loads(explain) if isinstance(explain, str) else explain
+
+        except ValueError:
+            # Keep the raw text, e.g. the message of a failed EXPLAIN
+            pass
+
+        self.logger.info(json.dumps({
+            "time": time.time(),
+            "database": record.get("database"),
+            "dataset_item": dataset_item,
+            "fingerprint": sql_fingerprint,
+            "condition": where.group(1) if where else None,
+            "duration": record["duration"],
+            "rows": record["rows"],
+            "explain": explain
+        }, default=str))
+
+    def records(self) -> List[Dict[str, Any]]:
+        results = []
+
+        for path in sorted(glob.glob(f"{glob.escape(self.path)}*")):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if (line):
+                        results.append(json.loads(line))
+
+        return results
+
+    def summary(self, top: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Rank the worst dataset_items and conditions by total slow time."""
+
+        groups: Dict[str, Dict[tuple, Dict[str, Any]]] = {
+            "dataset_items": defaultdict(lambda: {"count": 0, "duration": 0.0, "max_duration": 0.0, "rows": 0}),
+            "conditions": defaultdict(lambda: {"count": 0, "duration": 0.0, "max_duration": 0.0, "rows": 0})
+        }
+
+        for record in self.records():
+            keys = {
+                "dataset_items": (record["database"], record["dataset_item"]),
+                "conditions": (record["database"], record["dataset_item"], record["condition"])
+            }
+
+            for name, key in keys.items():
+                entry = groups[name][key]
+                entry["count"] += 1
+                entry["duration"] += record["duration"]
+                entry["max_duration"] = max(entry["max_duration"], record["duration"])
+                entry["rows"] += record["rows"]
+
+                # Keep the plan of the slowest run, it is the one worth reading
+                if (entry["max_duration"] == record["duration"]):
+                    entry["fingerprint"] = record["fingerprint"]
+                    entry["explain"] = record["explain"]
+
+        results = {}
+
+        for name, entries in groups.items():
+            ranked = []
+            for key, entry in entries.items():
+                item = dict(zip(("database", "dataset_item", "condition"), key))
+                item.update(entry)
+                item["avg_duration"] = entry["duration"] / entry["count"]
+                ranked.append(item)
+
+            ranked.sort(key=lambda item: item["duration"], reverse=True)
+            results[name] = ranked[:top]
+
+        return results
@@ -0,0 +1,71 @@
+'''
+@File    :   conftest.py
+@Time    :   2025/06/24 20:10:32
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Shared SQLite fixtures, no server needed
+'''
+
+
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+try:
+    import datapy   # noqa: F401
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from datapy.connections import DataConnecter
+
+
+ROWS = 5000
+
+
+def run_bounded(func, timeout: float = 10.0):
+    """Run `func` on a thread, fail instead of hanging the suite when it deadlocks"""
+
+    result = {}
+
+    def target():
+        try:
+            result["value"] = func()
+
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+    if (thread.is_alive()):
+        pytest.fail(f"Did not return within {timeout}s")
+
+    if ("error" in result):
+        raise result["error"]
+
+    return result.get("value")
+
+
+@pytest.fixture
+def sqlite_dir(tmp_path):
+    """`<tmp>/shop.db` with `orders(id, day, amount, note)`, `note` is NULL in the first half"""
+
+    db = sqlite3.connect(str(tmp_path / "shop.db"))
+    db.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, day TEXT, amount REAL, note TEXT)")
+    db.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?, ?)",
+        [(i, f"2025-01-{i % 28 + 1:02d}", i * 0.5, None if i < ROWS // 2 else f"n{i}") for i in range(ROWS)]
+    )
+    db.commit()
+    db.close()
+
+    return tmp_path
+
+
+@pytest.fixture
+def conn(sqlite_dir):
+    return DataConnecter(url=f"sqlite:///{sqlite_dir}", cache_dir=str(sqlite_dir / "cache"))
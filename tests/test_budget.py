@@ -0,0 +1,110 @@
+'''
+@File    :   test_budget.py
+@Time    :   2025/06/25 22:02:11
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Memory budget shared by fetches and cached frames
+'''
+
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from datapy.connections import DataConnecter
+from datapy.connections.budget import MemoryBudget, frame_bytes
+from datapy.connections.deadline import Deadline, QueryTimeout
+
+from conftest import ROWS, run_bounded
+
+
+def test_reservation_waits_for_room():
+    budget = MemoryBudget(100)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with budget.reserve(80):
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder, daemon=True)
+    thread.start()
+    entered.wait(5)
+
+    waited = {}
+
+    def waiter():
+        start = time.monotonic()
+        with budget.reserve(50):
+            waited["seconds"] = time.monotonic() - start
+            waited["reserved"] = budget.stats()["reserved"]
+
+    threading.Timer(0.2, release.set).start()
+    run_bounded(waiter)
+    thread.join(5)
+
+    assert waited["seconds"] >= 0.15
+    assert waited["reserved"] == 50
+    assert budget.stats()["reserved"] == 0
+
+
+def test_reservation_respects_the_deadline():
+    budget = MemoryBudget(100)
+
+    with budget.reserve(100):
+        with pytest.raises(QueryTimeout):
+            run_bounded(lambda: budget.reserve(10, Deadline(0.1)).__enter__())
+
+    stats = budget.stats()
+    assert (stats["reserved"], stats["waiting"]) == (0, 0)
+
+
+def test_cached_frames_are_evicted_for_reservations_only_when_they_fit():
+    df = pd.DataFrame({"a": range(100)})
+    size = frame_bytes(df)
+    budget = MemoryBudget(size * 3)
+
+    assert budget.put("x", df)
+    assert budget.put("y", df)
+
+    with budget.reserve(size * 2):
+        # Only as much as the reservation needs, least recently used first
+        assert budget.get("x") is None
+        assert budget.get("y") is not None
+
+    # Not next to a running fetch that leaves no room
+    with budget.reserve(size * 3):
+        assert not budget.put("z", df)
+
+
+def test_concurrent_gets_share_one_budget(sqlite_dir):
+    budget = MemoryBudget(64 * 1024 * 1024)
+    conns = [
+        DataConnecter(url=f"sqlite:///{sqlite_dir}", cache_dir=str(sqlite_dir / "cache"), memory_budget=budget)
+        for _ in range(2)
+    ]
+    results = []
+
+    def fetch(conn):
+        results.append(len(conn.get("shop", ["orders"])["orders"]))
+
+    threads = [threading.Thread(target=fetch, args=(conn, ), daemon=True) for conn in conns for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert results == [ROWS] * 6
+    assert budget.stats()["reserved"] == 0
+
+
+def test_over_budget_raise(sqlite_dir):
+    conn = DataConnecter(
+        url=f"sqlite:///{sqlite_dir}", cache_dir=str(sqlite_dir / "cache"), memory_budget=1024, over_budget="raise"
+    )
+
+    with pytest.raises(MemoryError):
+        conn.get("shop", ["orders"])
@@ -0,0 +1,72 @@
+'''
+@File    :   test_cacher.py
+@Time    :   2025/06/25 20:12:36
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Local cache accounting
+'''
+
+
+import os
+
+import pandas as pd
+
+from datapy.cache import Cacher
+from datapy.cache.cacher import SPILL
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"a": range(rows), "b": [f"v{i}" for i in range(rows)]})
+
+
+def test_spills_count_against_max_bytes(tmp_path):
+    cacher = Cacher(str(tmp_path), codec="none", max_bytes=200000)
+
+    cacher.put("old", frame(1000))
+    spilled = cacher.spill(["a", "b"])
+    for _ in range(10):
+        spilled.append(frame(1000))
+
+    entry = cacher.manifest.lookup(spilled.key)
+    assert entry["codec"] == SPILL
+    assert entry["size"] > 0
+
+    # The spill in use is never evicted, the older entry makes room for it
+    assert cacher.get("old") is None
+    assert len(spilled.to_pandas()) == 10000
+
+    spilled.drop()
+    assert cacher.manifest.lookup(spilled.key) is None
+    assert not os.path.exists(spilled.spill_dir)
+
+
+def test_abandoned_spills_are_collected(tmp_path):
+    cacher = Cacher(str(tmp_path), codec="none")
+
+    spilled = cacher.spill(["a", "b"])
+    spilled.append(frame(100))
+    spill_dir = spilled.spill_dir
+
+    del spilled
+    assert not os.path.exists(spill_dir)
+
+    # Left behind by a crashed process, not pinned here
+    other = Cacher(str(tmp_path), codec="none")
+    orphan = other.spill(["a", "b"])
+    orphan.append(frame(100))
+    orphan._SpilledFrame__finalizer.detach()
+
+    assert cacher.gc(0)["removed"] == 1
+    assert not os.path.exists(orphan.spill_dir)
+
+
+def test_running_total(tmp_path):
+    cacher = Cacher(str(tmp_path), codec="none", max_bytes=10 ** 9)
+
+    for i in range(5):
+        cacher.put(f"k{i}", frame(100))
+    cacher.put("k0", frame(10))
+    cacher.delete("k1")
+
+    assert cacher.gc()["bytes"] == cacher.manifest.total()
+    assert cacher._Cacher__total == cacher.manifest.total()
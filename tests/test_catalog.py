@@ -0,0 +1,31 @@
+'''
+@File    :   test_catalog.py
+@Time    :   2025/06/25 21:37:20
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Locally kept schema catalog
+'''
+
+
+import shutil
+
+import pandas as pd
+
+from datapy.connections import DataConnecter
+
+
+def test_refresh_after_a_change_reads_the_primary(sqlite_dir, tmp_path_factory):
+    # A replica that has not caught up with anything done below
+    replica_dir = tmp_path_factory.mktemp("replica")
+    shutil.copy(sqlite_dir / "shop.db", replica_dir / "shop.db")
+
+    conn = DataConnecter(
+        url=f"sqlite:///{sqlite_dir}", cache_dir=str(sqlite_dir / "cache"), replicas=[f"sqlite:///{replica_dir}"]
+    )
+    assert conn.show_items("shop")["Dataset_Item"].tolist() == ["orders"]
+
+    conn.db.switch_database("shop")
+    conn.create_table_from_dataframe(pd.DataFrame({"id": [1, 2]}), "shop", "refunds")
+
+    assert conn.show_items("shop")["Dataset_Item"].tolist() == ["orders", "refunds"]
+    assert conn.db._curr_database_name == "shop"
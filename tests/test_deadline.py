@@ -0,0 +1,58 @@
+'''
+@File    :   test_deadline.py
+@Time    :   2025/06/25 10:41:16
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Deadlines and cancellation on SQLite
+'''
+
+
+import threading
+
+import pytest
+
+from datapy.connections.deadline import Deadline, QueryTimeout
+from datapy.connections.mysql.common import RetIndices
+
+from conftest import ROWS, run_bounded
+
+
+# Never ends on its own
+ENDLESS = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+def count_orders(conn):
+    return conn.db.execute("SELECT COUNT(*) FROM orders")[RetIndices.RESULT][0][0]
+
+
+def test_query_over_deadline(conn):
+    conn.db.switch_database("shop")
+
+    with pytest.raises(QueryTimeout, match="exceeded"):
+        run_bounded(lambda: conn.db.execute(ENDLESS, timeout=0.2))
+
+    assert count_orders(conn) == ROWS
+
+
+def test_cancelled_query(conn):
+    conn.db.switch_database("shop")
+    deadline = Deadline(60)
+    threading.Timer(0.2, deadline.cancel).start()
+
+    with pytest.raises(QueryTimeout, match="Cancelled"):
+        run_bounded(lambda: conn.db.execute(ENDLESS, timeout=deadline))
+
+    assert count_orders(conn) == ROWS
+
+
+def test_stream_over_deadline(conn):
+    conn.db.switch_database("shop")
+
+    def consume():
+        for _ in conn.db.execute_stream(ENDLESS, timeout=0.2):
+            pass
+
+    with pytest.raises(QueryTimeout):
+        run_bounded(consume)
+
+    assert len(run_bounded(lambda: conn.get("shop", ["orders"], timeout=5)["orders"])) == ROWS
@@ -0,0 +1,58 @@
+'''
+@File    :   test_exporter.py
+@Time    :   2025/06/24 22:58:14
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Streaming export into Parquet
+'''
+
+
+import pytest
+
+from datapy.exporter import export_stream
+
+from conftest import ROWS
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_null_first_row_group_keeps_declared_type(conn, tmp_path):
+    # `note` is NULL in every row of the first row groups
+    columns = conn.describe("shop", "orders")["columns"]
+    report = export_stream(
+        conn.stream("shop", "orders", batch_size=500), str(tmp_path / "orders.parquet"),
+        row_group_size=500, declared={column["name"]: column["type"] for column in columns}
+    )
+
+    table = pq.read_table(report["files"][0])
+
+    assert table.num_rows == ROWS
+    assert table.schema.field("note").type == pa.string()
+    assert table.schema.field("id").type == pa.int64()
+    assert table.column("note")[ROWS - 1].as_py() == f"n{ROWS - 1}"
+
+
+def test_description_types_fix_the_schema(tmp_path):
+    # A DOUBLE (5) column NULL in the first row group, as MySQL describes it
+    description = (("id", 8, None, 20, 20, 0, False), ("score", 5, None, 22, 22, 31, True))
+    batches = iter([(description, [(1, None), (2, None)]), (description, [(3, 0.5)])])
+
+    report = export_stream(batches, str(tmp_path / "scores.parquet"), row_group_size=2)
+    table = pq.read_table(report["files"][0])
+
+    assert table.schema.field("score").type == pa.float64()
+    assert table.column("score").to_pylist() == [None, None, 0.5]
+
+
+def test_decimal_from_description(tmp_path):
+    from decimal import Decimal
+
+    description = (("amount", 246, None, 12, 12, 2, True),)
+    batches = iter([(description, [(None,)]), (description, [(Decimal("1234567890.25"),)])])
+
+    report = export_stream(batches, str(tmp_path / "amounts.parquet"), row_group_size=1)
+    table = pq.read_table(report["files"][0])
+
+    assert table.schema.field("amount").type == pa.decimal128(12, 2)
+    assert table.column("amount").to_pylist() == [None, Decimal("1234567890.25")]
@@ -0,0 +1,79 @@
+'''
+@File    :   test_instrument.py
+@Time    :   2025/06/25 13:05:44
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Per-query spans and stats
+'''
+
+
+import pytest
+
+from datapy import instrument
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    instrument.reset_stats()
+    yield
+    instrument.reset_stats()
+
+
+def test_percentiles():
+    sink = instrument.StatsSink()
+
+    for i in range(1, 101):
+        sink.emit({
+            "dataset_group": "shop", "dataset_item": "orders", "phases": {"execute": i / 1000, "fetch": 0.5},
+            "rows": 10, "bytes": 80, "cache": "hit" if i % 4 == 0 else "miss", "shared": i == 1
+        })
+
+    item = sink.summary()["shop.orders"]
+
+    assert (item["count"], item["rows"], item["bytes"]) == (100, 1000, 8000)
+    assert (item["cache_hits"], item["cache_misses"], item["cache_partials"], item["shared"]) == (25, 75, 0, 1)
+    assert (item["execute_p50"], item["execute_p90"], item["execute_p99"]) == (0.051, 0.09, 0.099)
+    assert item["fetch_p99"] == 0.5
+    # Phases never recorded stay at zero
+    assert item["convert_p50"] == 0.0
+
+
+def test_window_keeps_latest():
+    sink = instrument.StatsSink(window=10)
+
+    for i in range(100):
+        sink.emit({
+            "dataset_group": "shop", "dataset_item": "orders", "phases": {"execute": float(i)},
+            "rows": 1, "bytes": 0, "cache": None, "shared": False
+        })
+
+    item = sink.summary()["shop.orders"]
+
+    assert item["count"] == 10
+    assert 90.0 < item["execute_p50"] < 99.0
+    assert item["execute_p99"] == 99.0
+
+
+def test_spans_reach_stats():
+    for seconds in (0.1, 0.2, 0.3):
+        with instrument.span("shop", "orders") as span:
+            # Credited like the execute hook of a backend does
+            instrument.on_execute({"wait": 0.0, "execute": seconds, "fetch": seconds / 10}, 5)
+            span.rows = 5
+
+    item = instrument.stats()["shop.orders"]
+
+    assert item["count"] == 3
+    assert item["rows"] == 15
+    assert (item["execute_p50"], item["execute_p99"]) == (0.2, 0.3)
+    assert item["total_p50"] > 0
+
+
+def test_get_is_recorded(conn):
+    conn.get("shop", ["orders"])
+
+    item = instrument.stats()["shop.orders"]
+
+    assert item["count"] == 1
+    assert item["execute_p50"] > 0
+    assert item["convert_p50"] > 0
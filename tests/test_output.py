@@ -0,0 +1,55 @@
+'''
+@File    :   test_output.py
+@Time    :   2025/06/25 14:02:26
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Arrow and polars outputs
+'''
+
+
+import pytest
+
+from datapy.query_builder import DataField
+
+from conftest import ROWS
+
+
+def test_arrow(conn):
+    pa = pytest.importorskip("pyarrow")
+
+    table = conn.get("shop", ["orders"], output="arrow")["orders"]
+
+    assert isinstance(table, pa.Table)
+    assert table.num_rows == ROWS
+    assert table.column_names == ["id", "day", "amount", "note"]
+    assert table.schema.field("id").type == pa.int64()
+    assert table.schema.field("amount").type == pa.float64()
+    # NULL in the first half of the rows
+    assert table.schema.field("note").type == pa.string()
+    assert table.column("note").null_count == ROWS // 2
+
+
+def test_polars(conn):
+    pl = pytest.importorskip("polars")
+    pytest.importorskip("pyarrow")
+
+    df = conn.get("shop", ["orders"], {"orders": DataField("id") < 10}, output="polars")["orders"]
+
+    assert isinstance(df, pl.DataFrame)
+    assert df.shape == (10, 4)
+    assert df["id"].to_list() == list(range(10))
+
+
+def test_pandas_arrow(conn):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+
+    df = conn.get("shop", ["orders"], output="pandas_arrow")["orders"]
+
+    assert len(df) == ROWS
+    assert isinstance(df["id"].dtype, pd.ArrowDtype)
+
+
+def test_unknown_output(conn):
+    with pytest.raises(ValueError, match="Unsupported output"):
+        conn.get("shop", ["orders"], output="numpy")
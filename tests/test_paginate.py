@@ -0,0 +1,40 @@
+'''
+@File    :   test_paginate.py
+@Time    :   2025/06/25 09:12:37
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Keyset pagination
+'''
+
+
+import sqlite3
+
+from datapy.connections.mysql.common import RetIndices
+from datapy.query_builder import DataField
+
+from conftest import ROWS
+
+
+def test_pages_cover_every_row(conn):
+    pages = list(conn.paginate("shop", "orders", "id", 1000, DataField("id") >= 10))
+
+    assert [len(page) for page in pages] == [1000] * 4 + [ROWS - 10 - 4000]
+    assert pages[-1]["id"].iloc[-1] == ROWS - 1
+
+
+def test_other_query_between_pages(conn, sqlite_dir):
+    db = sqlite3.connect(str(sqlite_dir / "audit.db"))
+    db.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, msg TEXT)")
+    db.commit()
+    db.close()
+
+    ids = []
+
+    for page in conn.paginate("shop", "orders", "id", 1000):
+        ids.extend(page["id"])
+
+        # Leaves the shared connection on another database
+        conn.db.switch_database("audit")
+        assert conn.db.execute("SELECT COUNT(*) FROM logs")[RetIndices.RESULT][0][0] == 0
+
+    assert ids == list(range(ROWS))
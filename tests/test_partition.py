@@ -0,0 +1,100 @@
+'''
+@File    :   test_partition.py
+@Time    :   2025/06/24 23:46:02
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Time-bucketed cache
+'''
+
+
+import sqlite3
+
+import pytest
+
+from datetime import datetime
+
+from datapy.query_builder import DataField
+
+
+@pytest.fixture
+def events(conn, sqlite_dir):
+    """`events(id, at)` with one row every hour of January 1st to 5th 2025, partitioned per day"""
+
+    db = sqlite3.connect(str(sqlite_dir / "shop.db"))
+    db.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, at TEXT)")
+    db.executemany(
+        "INSERT INTO events VALUES (?, ?)",
+        [(i, f"2025-01-{i // 24 + 1:02d} {i % 24:02d}:00:00") for i in range(5 * 24)]
+    )
+    db.commit()
+    db.close()
+
+    conn.partition("shop", "events", "at", "day")
+
+    return conn
+
+
+def fetched_buckets(conn, monkeypatch):
+    """Start of every range fetched from the database"""
+
+    execute_stream = conn.db.execute_stream
+    starts = []
+
+    def record(sql, data=(), *args, **kwargs):
+        starts.append(data[0])
+        return execute_stream(sql, data, *args, **kwargs)
+
+    monkeypatch.setattr(conn.db, "execute_stream", record)
+
+    return starts
+
+
+def insert(sqlite_dir, row):
+    db = sqlite3.connect(str(sqlite_dir / "shop.db"))
+    db.execute("INSERT INTO events VALUES (?, ?)", row)
+    db.commit()
+    db.close()
+
+
+def days(first, last):
+    return {"events": DataField("at").between(datetime(2025, 1, first), datetime(2025, 1, last, 23, 59, 59))}
+
+
+def test_late_row_in_a_closed_bucket_is_seen(events, sqlite_dir):
+    assert len(events.get("shop", ["events"], days(1, 3))["events"]) == 3 * 24
+    assert len(events.get("shop", ["events"], days(1, 3))["events"]) == 3 * 24
+
+    insert(sqlite_dir, (100000, "2025-01-02 12:30:00"))
+
+    assert len(events.get("shop", ["events"], days(1, 3))["events"]) == 3 * 24 + 1
+
+
+def test_insert_only_refetches_its_bucket(events, sqlite_dir, monkeypatch):
+    events.get("shop", ["events"], days(1, 3))
+
+    starts = fetched_buckets(events, monkeypatch)
+    insert(sqlite_dir, (100000, "2025-01-03 12:30:00"))
+
+    assert len(events.get("shop", ["events"], days(1, 3))["events"]) == 3 * 24 + 1
+    assert starts == [datetime(2025, 1, 3)]
+
+
+def test_moving_window_fetches_one_bucket(events, monkeypatch):
+    events.get("shop", ["events"], days(1, 3))
+
+    starts = fetched_buckets(events, monkeypatch)
+    df = events.get("shop", ["events"], days(2, 4))["events"]
+
+    assert len(df) == 3 * 24
+    assert starts == [datetime(2025, 1, 4)]
+
+
+def test_unsettled_bucket_is_not_cached(events, monkeypatch):
+    # Buckets of January 2025 are over for far less than a century
+    events.partition("shop", "events", "at", "day", settle=100 * 365 * 86400)
+    events.get("shop", ["events"], days(1, 2))
+
+    starts = fetched_buckets(events, monkeypatch)
+    events.get("shop", ["events"], days(1, 2))
+
+    assert starts == [datetime(2025, 1, 1)]
@@ -0,0 +1,88 @@
+'''
+@File    :   test_pipeline.py
+@Time    :   2025/06/24 20:18:47
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Batch by batch pandas fetch
+'''
+
+
+import sqlite3
+import threading
+
+import pandas as pd
+import pytest
+
+from datapy.connections.connecter import rows2df
+from datapy.connections.pipeline import AdaptiveBatchSize, FetchPipeline
+from datapy.query_builder import DataField
+
+from conftest import ROWS, run_bounded
+
+
+def test_matches_read_sql(conn, sqlite_dir):
+    df = conn.get("shop", ["orders"])["orders"]
+
+    expected = pd.read_sql("SELECT * FROM orders", sqlite3.connect(str(sqlite_dir / "shop.db")))
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_dtypes_unified_across_batches(conn):
+    conn.db.switch_database("shop")
+
+    # `note` is all NULL in the first batches only
+    pipeline = FetchPipeline(conn.db, rows2df, AdaptiveBatchSize(initial=500, minimum=500, maximum=500))
+    df = pipeline.run("SELECT * FROM orders")
+
+    assert len(df) == ROWS
+    assert df["note"].iloc[-1] == f"n{ROWS - 1}"
+    assert df["id"].dtype == "int64"
+
+
+def test_empty_result_keeps_columns(conn):
+    df = conn.get("shop", ["orders"], {"orders": DataField("id") < 0})["orders"]
+
+    assert len(df) == 0
+    assert list(df.columns) == ["id", "day", "amount", "note"]
+
+
+def test_get_inside_transaction(conn):
+    # The caller holds `lock_exec` for the whole transaction
+    def fetch():
+        conn.db.switch_database("shop")
+
+        with conn.transaction():
+            return conn.get("shop", ["orders"])["orders"]
+
+    assert len(run_bounded(fetch)) == ROWS
+
+
+def test_reader_thread_only_outside_lock(conn, monkeypatch):
+    conn.db.switch_database("shop")
+    execute_stream = conn.db.execute_stream
+    readers = []
+
+    def record(*args, **kwargs):
+        readers.append(threading.current_thread().name)
+        return execute_stream(*args, **kwargs)
+
+    monkeypatch.setattr(conn.db, "execute_stream", record)
+
+    assert len(FetchPipeline(conn.db, rows2df).run("SELECT * FROM orders")) == ROWS
+
+    with conn.transaction():
+        assert len(FetchPipeline(conn.db, rows2df).run("SELECT * FROM orders")) == ROWS
+
+    assert readers == ["datapy-fetch", threading.current_thread().name]
+
+
+def test_failed_conversion_releases_connection(conn):
+    conn.db.switch_database("shop")
+
+    def convert(rows, columns):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        FetchPipeline(conn.db, convert).run("SELECT * FROM orders")
+
+    assert len(run_bounded(lambda: conn.get("shop", ["orders"])["orders"])) == ROWS
@@ -0,0 +1,40 @@
+'''
+@File    :   test_rollup.py
+@Time    :   2025/06/25 21:03:48
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Incremental rollups past a watermark
+'''
+
+
+import sqlite3
+
+
+def insert(sqlite_dir, rows):
+    db = sqlite3.connect(str(sqlite_dir / "shop.db"))
+    db.executemany("INSERT INTO events VALUES (?, ?, ?)", rows)
+    db.commit()
+    db.close()
+
+
+def test_rows_committed_late_at_the_watermark(conn, sqlite_dir):
+    db = sqlite3.connect(str(sqlite_dir / "shop.db"))
+    db.execute("CREATE TABLE events (ts TEXT, k TEXT, v INTEGER)")
+    db.commit()
+    db.close()
+
+    insert(sqlite_dir, [("2025-01-01 00:00:00", "a", 1), ("2025-01-01 00:00:01", "a", 2)])
+
+    conn.rollup("per_k", "shop", "events", ["k"], {"total": ("v", "sum"), "n": ("v", "count")}, "ts")
+    assert conn.refresh_rollup("per_k")["rows"] == 2
+
+    # Same time as the watermark, one of them identical to a row already merged
+    insert(sqlite_dir, [("2025-01-01 00:00:01", "a", 4), ("2025-01-01 00:00:01", "a", 2)])
+    assert conn.refresh_rollup("per_k")["rows"] == 2
+
+    # Nothing new, the boundary rows are not merged twice
+    assert conn.refresh_rollup("per_k")["rows"] == 0
+
+    result = conn.query_rollup("per_k")
+    assert result["total"].tolist() == [9]
+    assert result["n"].tolist() == [4]
@@ -0,0 +1,62 @@
+'''
+@File    :   test_router.py
+@Time    :   2025/06/24 22:05:37
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Replica routing, lag checks and latency
+'''
+
+
+import threading
+
+from datapy.connections.router import ReplicaRouter
+
+from conftest import run_bounded
+
+
+class FakeReplica():
+    def __init__(self, lag=0.0, block=None):
+        self.lag = lag
+        self.block = block
+
+    def replication_lag(self):
+        if (self.block is not None):
+            self.block.wait(5)
+
+        return self.lag
+
+
+def test_lag_check_does_not_hold_the_lock():
+    release = threading.Event()
+    slow, fast = FakeReplica(block=release), FakeReplica()
+    router = ReplicaRouter(object(), [slow, fast], max_lag=1.0)
+
+    checking = threading.Thread(target=router.reader, daemon=True)
+    checking.start()
+
+    # Status and observe stay available while `slow` hangs in its lag check
+    run_bounded(router.status, timeout=2)
+    run_bounded(lambda: router.observe(fast, 0.01), timeout=2)
+
+    release.set()
+    checking.join(5)
+    assert [route["lag"] for route in router.status()] == [0.0, 0.0]
+
+
+def test_lagging_replica_is_skipped():
+    primary, lagging = object(), FakeReplica(lag=60.0)
+    router = ReplicaRouter(primary, [lagging], max_lag=1.0)
+
+    assert router.reader() is primary
+
+
+def test_latency_is_the_execute_phase():
+    replica = FakeReplica()
+    router = ReplicaRouter(object(), [replica])
+    seen = []
+
+    hook = router.execute_hook(replica, lambda phases, rows: seen.append(rows))
+    hook({"wait": 3.0, "execute": 0.02, "fetch": 5.0}, 100)
+
+    assert router.status()[0]["latency"] == 0.02
+    assert seen == [100]
@@ -0,0 +1,42 @@
+'''
+@File    :   test_sampling.py
+@Time    :   2025/06/24 23:20:41
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Server-side sampled fetches
+'''
+
+
+from datapy.connections.sampling import key_range
+from datapy.query_builder import DataField
+
+from conftest import ROWS
+
+
+def test_auto_is_hash(conn):
+    df = conn.get("shop", ["orders"], sample=0.2, seed=7)["orders"]
+
+    assert df.attrs["sample"]["method"] == "hash"
+    assert 0.1 * ROWS < len(df) < 0.3 * ROWS
+    # Same seed, same rows
+    assert conn.get("shop", ["orders"], sample=0.2, seed=7)["orders"]["id"].tolist() == df["id"].tolist()
+
+
+def test_range_is_bounded_by_the_condition(conn):
+    condition = {"orders": DataField("id") >= ROWS - 100}
+    df = conn.get("shop", ["orders"], condition, sample=0.5, seed=3, sample_method="range")["orders"]
+
+    sample = df.attrs["sample"]
+    assert sample["method"] == "range"
+    assert sample["fraction"] is None
+    assert 0 < sample["key_fraction"] <= 1
+    # Blocks cut from the 100 matching keys, not from the whole table
+    assert 20 <= len(df) <= 80
+    assert (df["id"] >= ROWS - 100).all()
+
+
+def test_key_range_under_the_condition(conn):
+    conn.db.switch_database("shop")
+
+    assert key_range(conn.db, "orders", "id") == (0, ROWS - 1)
+    assert key_range(conn.db, "orders", "id", DataField("id") >= ROWS - 100) == (ROWS - 100, ROWS - 1)
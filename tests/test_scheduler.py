@@ -0,0 +1,32 @@
+'''
+@File    :   test_scheduler.py
+@Time    :   2025/06/25 10:03:51
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Cache warming jobs
+'''
+
+
+import pytest
+
+from datapy.connections import DataConnecter
+from datapy.scheduler import Scheduler, WarmJob
+
+from conftest import ROWS
+
+
+def test_requires_result_cache(conn):
+    with pytest.raises(ValueError, match="result_cache"):
+        Scheduler(conn, [WarmJob.from_dict({"name": "orders", "group": "shop", "items": ["orders"]})])
+
+
+def test_run_once_warms(sqlite_dir):
+    conn = DataConnecter(url=f"sqlite:///{sqlite_dir}", cache_dir=str(sqlite_dir / "cache"), result_cache=True)
+    scheduler = Scheduler(conn, [WarmJob.from_dict({"name": "orders", "group": "shop", "items": ["orders"]})])
+
+    try:
+        assert scheduler.run_once() == [{"job": "orders", "rows": ROWS, "seconds": pytest.approx(0, abs=10)}]
+        assert scheduler.status()["orders"]["runs"] == 1
+
+    finally:
+        scheduler.stop()
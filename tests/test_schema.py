@@ -0,0 +1,31 @@
+'''
+@File    :   test_schema.py
+@Time    :   2025/06/24 22:31:50
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Schema inference
+'''
+
+
+from decimal import Decimal
+
+import pandas as pd
+
+from datapy.connections.schema import MAX_ROW_BYTES, infer_schema, type_bytes
+
+
+def test_decimal_nan_is_missing():
+    column = pd.Series([Decimal("NaN"), Decimal("12.25")], dtype=object)
+
+    assert infer_schema(pd.DataFrame({"a": column})) == [("a", "DECIMAL(4,2)")]
+
+
+def test_wide_rows_fall_back_to_text():
+    df = pd.DataFrame({name: ["x" * (5000 + i)] for i, name in enumerate("abcd")})
+    df["id"] = [1]
+
+    schema = infer_schema(df)
+
+    assert sum(type_bytes(type_str) for _, type_str in schema) <= MAX_ROW_BYTES
+    assert dict(schema)["id"] == "TINYINT"
+    assert sum(type_str == "TEXT" for _, type_str in schema) == 3
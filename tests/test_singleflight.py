@@ -0,0 +1,139 @@
+'''
+@File    :   test_singleflight.py
+@Time    :   2025/06/24 21:02:15
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Coalesced calls under per-call deadlines
+'''
+
+
+import threading
+import time
+
+import pytest
+
+from datapy.connections.deadline import Deadline, QueryTimeout
+from datapy.connections.singleflight import SingleFlight
+
+from conftest import run_bounded
+
+
+def start_leader(flight, func, deadline=None):
+    """Run `func` as the leader of key "k" on a thread, returns once it is in flight"""
+
+    entered = threading.Event()
+    outcome = {}
+
+    def body():
+        entered.set()
+        return func()
+
+    def target():
+        try:
+            outcome["value"] = flight.do("k", body, deadline)
+
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    entered.wait(5)
+
+    return thread, outcome
+
+
+def test_followers_share_the_result():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    thread, outcome = start_leader(flight, lambda: release.wait(5) and "rows")
+    threading.Timer(0.1, release.set).start()
+
+    assert run_bounded(lambda: flight.do("k", lambda: "other")) == ("rows", True)
+    thread.join(5)
+    assert outcome["value"] == ("rows", True)
+
+
+def test_follower_times_out_on_its_own_deadline():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    thread, _ = start_leader(flight, lambda: release.wait(5))
+
+    start = time.monotonic()
+    with pytest.raises(QueryTimeout):
+        run_bounded(lambda: flight.do("k", lambda: None, Deadline(0.2)))
+
+    assert time.monotonic() - start < 2
+    release.set()
+    thread.join(5)
+
+
+def test_follower_cancel_wakes_it():
+    flight = SingleFlight()
+    release = threading.Event()
+    deadline = Deadline(30)
+
+    thread, _ = start_leader(flight, lambda: release.wait(5))
+    threading.Timer(0.1, deadline.cancel).start()
+
+    with pytest.raises(QueryTimeout):
+        run_bounded(lambda: flight.do("k", lambda: None, deadline))
+
+    release.set()
+    thread.join(5)
+
+
+def test_leader_timeout_is_not_handed_to_followers():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def leader():
+        release.wait(5)
+        raise QueryTimeout("Deadline of 0.1s exceeded")
+
+    thread, outcome = start_leader(flight, leader)
+    threading.Timer(0.1, release.set).start()
+
+    # Runs again for the follower, which has no deadline of its own
+    assert run_bounded(lambda: flight.do("k", lambda: "rows")) == ("rows", False)
+    thread.join(5)
+    assert isinstance(outcome["error"], QueryTimeout)
+
+
+def test_other_errors_are_shared():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def leader():
+        release.wait(5)
+        raise ValueError("bad query")
+
+    thread, _ = start_leader(flight, leader)
+    threading.Timer(0.1, release.set).start()
+
+    with pytest.raises(ValueError):
+        run_bounded(lambda: flight.do("k", lambda: "rows"))
+
+    thread.join(5)
+
+
+def test_get_with_deadline_next_to_a_slow_identical_get(conn, monkeypatch):
+    fetch = conn._fetch
+    release = threading.Event()
+
+    def slow_fetch(*args, **kwargs):
+        release.wait(5)
+        return fetch(*args, **kwargs)
+
+    monkeypatch.setattr(conn, "_fetch", slow_fetch)
+
+    thread = threading.Thread(target=lambda: conn.get("shop", ["orders"]), daemon=True)
+    thread.start()
+    time.sleep(0.1)
+
+    with pytest.raises(QueryTimeout):
+        run_bounded(lambda: conn.get("shop", ["orders"], timeout=0.2))
+
+    release.set()
+    thread.join(5)
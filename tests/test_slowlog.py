@@ -0,0 +1,59 @@
+'''
+@File    :   test_slowlog.py
+@Time    :   2025/06/25 13:31:08
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Slow query log ranking
+'''
+
+
+from datapy.connections import DataConnecter
+from datapy.query_builder import DataField
+from datapy.slowlog import SlowQueryLog, fingerprint
+
+
+def write(log, sql, duration, rows=1):
+    log.write({"database": "shop", "sql": sql, "duration": duration, "rows": rows, "explain": '{"plan": "%s"}' % duration})
+
+
+def test_fingerprint():
+    assert fingerprint("SELECT *  FROM t WHERE a = 'x' AND b > 12.5") == "SELECT * FROM t WHERE a = ? AND b > ?"
+    assert fingerprint("SELECT * FROM `t` WHERE `a` = %s") == "SELECT * FROM `t` WHERE `a` = ?"
+
+
+def test_ranking(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.log"))
+
+    # orders: 3 runs, 0.9s in total, customers: 1 run of 0.8s
+    write(log, "SELECT * FROM orders WHERE id = 1", 0.2)
+    write(log, "SELECT * FROM orders WHERE id = 2", 0.4)
+    write(log, "SELECT * FROM orders WHERE day = '2025-01-01'", 0.3)
+    write(log, "SELECT * FROM customers", 0.8, rows=100)
+
+    summary = log.summary()
+
+    items = [(item["dataset_item"], item["count"], round(item["duration"], 6)) for item in summary["dataset_items"]]
+    assert items == [("orders", 3, 0.9), ("customers", 1, 0.8)]
+
+    orders = summary["dataset_items"][0]
+    assert orders["max_duration"] == 0.4
+    assert round(orders["avg_duration"], 6) == 0.3
+    # The plan of the slowest run
+    assert orders["explain"] == {"plan": "0.4"}
+
+    conditions = [(item["condition"], round(item["duration"], 6)) for item in summary["conditions"]]
+    assert conditions == [(None, 0.8), ("id = ?", 0.6), ("day = ?", 0.3)]
+
+    assert len(log.summary(top=1)["conditions"]) == 1
+
+
+def test_slow_queries_are_logged(sqlite_dir):
+    conn = DataConnecter(
+        url=f"sqlite:///{sqlite_dir}", cache_dir=str(sqlite_dir / "cache"), slow_query_threshold=0.0
+    )
+    conn.get("shop", ["orders"], {"orders": DataField("id") < 10})
+
+    items = {item["dataset_item"]: item for item in conn.slow_log.summary()["dataset_items"]}
+
+    assert items["orders"]["count"] >= 1
+    assert items["orders"]["rows"] >= 10
@@ -0,0 +1,83 @@
+'''
+@File    :   test_sqlite.py
+@Time    :   2025/06/25 11:18:05
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   SQLite backend contract
+'''
+
+
+import sqlite3
+
+import pytest
+
+from datapy.connections.sqlite import SQLite
+
+from conftest import ROWS
+
+
+@pytest.fixture
+def db(sqlite_dir):
+    conn = sqlite3.connect(str(sqlite_dir / "shop.db"))
+    conn.execute("CREATE TABLE items (sku TEXT NOT NULL, qty INTEGER DEFAULT 0, PRIMARY KEY (sku))")
+    conn.execute("CREATE INDEX orders_day ON orders (day)")
+    conn.commit()
+    conn.close()
+
+    return SQLite(str(sqlite_dir))
+
+
+def test_switch_database(db):
+    assert db.switch_database("shop")
+    assert db._curr_database_name == "shop"
+
+    # A missing database only warns and keeps the current one
+    assert not db.switch_database("missing")
+    assert db._curr_database_name == "shop"
+    assert db.list_databases() == ["shop"]
+
+
+def test_list_tables(db):
+    assert sorted(db.list_tables("shop")) == ["items", "orders"]
+    assert db._curr_database_name == "shop"
+
+
+def test_describe_tables(db):
+    tables = db.describe_tables("shop", ["orders", "items"])
+
+    orders = tables["orders"]
+    assert [column["name"] for column in orders["columns"]] == ["id", "day", "amount", "note"]
+    assert orders["columns"][0]["key"] == "PRI" and not orders["columns"][0]["nullable"]
+    assert orders["columns"][2]["data_type"] == "real"
+    assert [(index["name"], index["columns"]) for index in orders["indexes"]] == [
+        ("PRIMARY", ["id"]), ("orders_day", ["day"])
+    ]
+
+    items = tables["items"]
+    assert items["columns"][1]["default"] == "0"
+    assert [(index["name"], index["unique"], index["columns"]) for index in items["indexes"]] == [
+        ("PRIMARY", True, ["sku"])
+    ]
+
+    assert db.describe_tables("shop", []) == {}
+
+
+def test_table_stats(db):
+    stats = db.table_stats("shop")
+
+    assert stats["orders"]["rows"] == ROWS
+    assert stats["items"]["rows"] == 0
+    assert stats["orders"]["avg_row_length"] > 0
+    assert "orders_day" in stats["orders"]["version"]
+
+    assert db.table_stats("missing") == {}
+
+
+def test_estimate(db):
+    db.switch_database("shop")
+
+    rows, avg_row_length = db.estimate("orders", "SELECT * FROM orders WHERE id < %s", (100, ))
+    assert rows == 100
+    assert avg_row_length > 0
+
+    assert db.estimate("orders", "SELECT * FROM no_such_table") == (0, 0)
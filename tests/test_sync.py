@@ -0,0 +1,48 @@
+'''
+@File    :   test_sync.py
+@Time    :   2025/06/25 11:52:40
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   DataFrame to table sync on SQLite
+'''
+
+
+import pandas as pd
+
+from conftest import ROWS
+
+
+def orders(conn):
+    return conn.get("shop", ["orders"])["orders"].sort_values("id", ignore_index=True)
+
+
+def test_round_trip(conn):
+    df = orders(conn)
+
+    df = df[df["id"] >= 10].reset_index(drop=True)
+    df.loc[df["id"] < 15, "amount"] = -1.0
+    added = pd.DataFrame({
+        "id": [ROWS, ROWS + 1, ROWS + 2], "day": ["2025-02-01"] * 3, "amount": [1.0] * 3, "note": [None] * 3
+    })
+    df = pd.concat([df, added], ignore_index=True)
+
+    assert conn.sync(df, "shop", "orders", "id") == {"inserted": 3, "updated": 5, "deleted": 10, "unchanged": ROWS - 15}
+
+    synced = orders(conn)
+    assert len(synced) == len(df)
+    assert list(synced["id"]) == list(df["id"])
+    assert (synced.loc[synced["id"] < 15, "amount"] == -1.0).all()
+    assert synced["note"].isna().sum() == df["note"].isna().sum()
+
+    # What was written hashes like the DataFrame, nothing is left to do
+    assert conn.sync(df, "shop", "orders", "id") == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": len(df)}
+
+
+def test_without_delete(conn):
+    df = orders(conn)
+    df = df[df["id"] >= 10].reset_index(drop=True)
+
+    assert conn.sync(df, "shop", "orders", "id", delete=False) == {
+        "inserted": 0, "updated": 0, "deleted": 0, "unchanged": ROWS - 10
+    }
+    assert len(orders(conn)) == ROWS
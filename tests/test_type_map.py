@@ -0,0 +1,72 @@
+'''
+@File    :   test_type_map.py
+@Time    :   2025/06/25 12:27:19
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Copy-on-write column type map
+'''
+
+
+import sqlite3
+
+import pytest
+
+from datapy.connections.mysql.common import RetIndices, TableValidator
+from datapy.connections.sqlite import SQLite
+
+
+@pytest.fixture
+def db(sqlite_dir):
+    conn = sqlite3.connect(str(sqlite_dir / "audit.db"))
+    conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, msg TEXT, level INTEGER)")
+    conn.commit()
+    conn.close()
+
+    db = SQLite(str(sqlite_dir))
+    db.switch_database("audit")
+
+    return db
+
+
+def test_validator():
+    validator = TableValidator((("id", int), ("msg", str), ("tags", [str])))
+
+    assert validator.covers({"id": 1, "msg": "m"})
+    assert not validator.covers({"id": 1, "level": 2})
+
+    assert validator.validate({"id": 1, "msg": None, "tags": ["a"]}) == []
+    assert validator.validate({"id": "1", "tags": [2]}) == [
+        {"pos": "id", "datatype": "str", "expection": "int"},
+        {"pos": "tags.0", "datatype": "int", "expection": "str"}
+    ]
+
+
+def test_learning_leaves_the_shared_snapshot(db, sqlite_dir):
+    assert db.insert("logs", {"id": 1, "msg": "m1"})
+
+    snapshot = db._type_map_for_tables
+    learnt = snapshot["audit"]["logs"]
+
+    assert db.insert("logs", {"id": 2, "msg": "m2", "level": 3})
+
+    # Readers holding the old snapshot keep seeing it unchanged
+    assert db._type_map_for_tables is not snapshot
+    assert snapshot["audit"]["logs"] is learnt
+    assert set(learnt.types) == {"id", "msg"}
+    assert set(db._table_validator("logs").types) == {"id", "msg", "level"}
+
+    # Every connection learns on its own
+    other = SQLite(str(sqlite_dir))
+    other.switch_database("audit")
+    assert other._table_validator("logs") is None
+
+
+def test_invalid_type_is_rejected(db):
+    assert db.insert("logs", {"id": 1, "msg": "m1", "level": 1})
+    snapshot = db._type_map_for_tables
+
+    assert not db.insert("logs", {"id": 2, "msg": "m2", "level": "high"})
+    assert not db.insert_many("logs", [{"id": 3, "msg": "m3", "level": 1}, {"id": 4, "msg": 4, "level": 1}])
+
+    assert db._type_map_for_tables is snapshot
+    assert db.execute("SELECT id FROM logs")[RetIndices.RESULT] == [(1, )]
@@ -0,0 +1,100 @@
+'''
+@File    :   test_writer.py
+@Time    :   2025/06/24 21:40:09
+@Author  :   MuliMuri
+@Version :   1.0
+@Desc    :   Write-behind inserter on SQLite
+'''
+
+
+import sqlite3
+
+import pytest
+
+from datapy import getter
+from datapy.connections.mysql.common import RetIndices
+
+from conftest import ROWS, run_bounded
+
+
+def create_logs(sqlite_dir):
+    db = sqlite3.connect(str(sqlite_dir / "audit.db"))
+    db.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, msg TEXT)")
+    db.commit()
+    db.close()
+
+
+def count(path, table):
+    db = sqlite3.connect(str(path))
+
+    try:
+        return db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    finally:
+        db.close()
+
+
+def test_rows_are_written(conn, sqlite_dir):
+    create_logs(sqlite_dir)
+
+    with conn.inserter("audit", "logs", max_rows=7) as inserter:
+        for i in range(50):
+            inserter.put({"id": i, "msg": f"m{i}"})
+
+        assert run_bounded(inserter.flush)
+
+    assert inserter.rows_written == 50
+    assert count(sqlite_dir / "audit.db", "logs") == 50
+
+
+def test_connection_stays_on_its_database(conn, sqlite_dir):
+    create_logs(sqlite_dir)
+    conn.db.switch_database("shop")
+
+    with conn.inserter("audit", "logs") as inserter:
+        inserter.put({"id": 1, "msg": "m1"})
+        assert run_bounded(inserter.flush)
+
+    assert conn.db._curr_database_name == "shop"
+    assert conn.db.execute("SELECT COUNT(*) FROM orders")[RetIndices.RESULT][0][0] == ROWS
+
+
+def test_flush_after_close_raises(conn, sqlite_dir):
+    create_logs(sqlite_dir)
+
+    inserter = conn.inserter("audit", "logs")
+    inserter.close()
+
+    with pytest.raises(RuntimeError):
+        run_bounded(inserter.flush)
+
+
+def test_failures_are_capped(conn, sqlite_dir):
+    create_logs(sqlite_dir)
+    errors = []
+
+    with conn.inserter("audit", "logs", max_rows=1, max_failures=3, on_error=lambda rows, e: errors.append(e)) as inserter:
+        for _ in range(10):
+            # Same primary key every time, only the first batch succeeds
+            inserter.put({"id": 1, "msg": "dup"})
+
+        assert run_bounded(inserter.flush)
+
+    assert inserter.rows_written == 1
+    assert inserter.batches_failed == 9
+    assert len(errors) == 9
+    assert len(inserter.failures) == 3
+
+
+def test_module_inserter_keeps_max_failures(conn, sqlite_dir, monkeypatch):
+    create_logs(sqlite_dir)
+    monkeypatch.setattr(getter.DataGetter, "conn", conn)
+
+    with getter.inserter("audit", "logs", max_rows=1, max_failures=2) as inserter:
+        for _ in range(5):
+            inserter.put({"id": 1, "msg": "dup"})
+
+        assert run_bounded(inserter.flush)
+
+    assert inserter.batches_failed == 4
+    assert len(inserter.failures) == 2